@@ -61,10 +61,7 @@ class DetonateFirstAction(Action):
             await client.send_detonate(x, y, self.unit_id)
 
     def _get_bomb_to_detonate(self, client) -> Union[int, int] or None:
-        entities = client.state.get("entities")
-        bombs = list(filter(lambda entity: entity.get(
-            "unit_id") == self.unit_id and entity.get("type") == "b", entities))
-        bomb = next(iter(bombs or []), None)
+        bomb = next(iter(client.state.get("entities").unit_bombs(self.unit_id)), None)
         if bomb is not None:
             return [bomb.get("x"), bomb.get("y")]
         else:
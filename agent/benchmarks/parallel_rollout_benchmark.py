@@ -0,0 +1,45 @@
+"""
+RolloutExecutor throughput: playouts/second of the root action evaluation from a saved game state, in process
+and with a worker pool.
+
+Run from the agent folder:
+    python -m benchmarks.parallel_rollout_benchmark [path/to/state.json] [workers]
+"""
+import json
+import os
+import sys
+import time
+
+from parsing.extended_game_state import ExtendedGameState
+from simulation.rollout_executor import RolloutExecutor
+
+state_path = "../sample_state.json"
+playouts = 2000
+depth = 10
+seed = 42
+
+
+def measure(executor: RolloutExecutor, state: ExtendedGameState) -> float:
+    """:return: playouts/s"""
+    executor.evaluate(state.gs, state.my_unit_ids, state.enemy_unit_ids, executor.workers, depth, seed)  # warm up
+    start = time.perf_counter()
+    values = executor.evaluate(state.gs, state.my_unit_ids, state.enemy_unit_ids, playouts, depth, seed)
+    elapsed = time.perf_counter() - start
+    best = max(range(len(values)), key=lambda i: values[i].mean())
+    print(f"  {len(values)} root actions, best #{best} mean {values[best].mean():.1f}")
+    return playouts / elapsed
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else state_path
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    with open(path, 'r') as json_file:
+        state = ExtendedGameState(json.load(json_file))
+
+    for n in sorted({1, workers}):
+        with RolloutExecutor(n) as executor:
+            print(f"{n} worker(s), {playouts} playouts x {depth} ticks: {measure(executor, state):.0f} playouts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Danger map construction microbenchmark: Parser on the late game ticks of replays, where boards are full of bombs,
+against the ReferenceParser with the per entity scalar writes and get_neighbours loops they replaced.
+parsing/tests/test_parser_maps.py checks that both build the same maps.
+
+Run from the agent folder:
+    python -m benchmarks.parser_benchmark [replay dir or file ...]
+"""
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.replay_benchmark import replay_paths
+from game_state import GameState
+from parsing.parser import Parser
+from parsing.tests.test_parser_maps import ReferenceParser, late_game_tick
+
+repeats = 20
+
+
+def late_game_states(path):
+    """:return: (tick, game state dict) of every late game tick of the replay"""
+    with open(path) as f:
+        replay = json.load(f)["payload"]
+    game_state = GameState("")
+    game_state.on_game_state(replay["initial_state"])
+    loop = asyncio.new_event_loop()
+    states = []
+    for tick in replay["history"]:
+        loop.run_until_complete(game_state.on_game_tick(tick))
+        if tick["tick"] >= late_game_tick:
+            state = dict(game_state.state, entities=list(game_state.state["entities"]))
+            states.append((tick["tick"], json.loads(json.dumps(state))))
+    loop.close()
+    return states
+
+
+def stage_time(parser: Parser, danger_map: np.ndarray) -> float:
+    """seconds add_enclosed_bomb_danger takes on a copy of danger_map"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        parser.danger_map = danger_map.copy()
+        parser.add_enclosed_bomb_danger()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(args):
+    totals = {"parse": [0., 0.], "add_enclosed_bomb_danger": [0., 0.]}
+    ticks = 0
+    for path in replay_paths(args):
+        for tick, state in late_game_states(path):
+            for agent_id in state["agents"]:
+                ticks += 1
+                start = time.perf_counter()
+                parser = Parser(tick, state, agent_id)
+                totals["parse"][0] += time.perf_counter() - start
+                start = time.perf_counter()
+                reference = ReferenceParser(tick, state, agent_id)
+                totals["parse"][1] += time.perf_counter() - start
+
+                danger_map = reference.danger_map.copy()  # any map works for timing the stage
+                totals["add_enclosed_bomb_danger"][0] += stage_time(parser, danger_map)
+                totals["add_enclosed_bomb_danger"][1] += stage_time(reference, danger_map)
+
+    for name, (elapsed, reference_elapsed) in totals.items():
+        print(f"{name}: {elapsed / ticks * 1e6:.1f}us per tick, before {reference_elapsed / ticks * 1e6:.1f}us, "
+              f"x{reference_elapsed / elapsed:.2f}")
+    print(f"{ticks} ticks")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
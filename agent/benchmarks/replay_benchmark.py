@@ -0,0 +1,102 @@
+"""
+RulePolicy throughput on a corpus of engine replays, without a server.
+Every tick of every replay is applied with GameState.on_game_tick and fed to RulePolicy.execute_actions
+once for each agent. Actions are dropped instead of being sent. Ticks the policy raises on are printed with
+their traceback at the end and make the exit status 1.
+
+Run from the agent folder:
+    python -m benchmarks.replay_benchmark [replay dir or file ...] [--profile]
+"""
+import asyncio
+import glob
+import json
+import os
+import resource
+import sys
+import time
+import traceback
+from collections import OrderedDict
+
+import numpy as np
+
+from game_state import GameState
+from rule.rule_policy import RulePolicy
+from utils.profiler import profiler
+
+replay_dir = "../agents"
+
+
+class DroppingLoop:
+    """stands in for the event loop the policy sends actions with"""
+
+    def create_task(self, coro):
+        coro.close()
+
+
+def replay_paths(args):
+    paths = []
+    for arg in args or [replay_dir]:
+        if os.path.isdir(arg):
+            paths.extend(sorted(glob.glob(os.path.join(arg, "*.json"))))
+        else:
+            paths.append(arg)
+    return paths
+
+
+def run_replay(replay_json: str, agent_id: str, loop, latencies: list, failures: OrderedDict):
+    """
+    :param failures: policy exceptions by formatted traceback -> list of (replay tick, agent id), filled in
+    """
+    payload = json.loads(replay_json).get("payload")
+    client = GameState("")
+    client.on_game_state(payload.get("initial_state"))
+    client.state["connection"] = {"agent_id": agent_id}
+    policy = RulePolicy()
+    policy.init(client)
+    policy.state.loop = DroppingLoop()
+    for tick in payload.get("history"):
+        start = time.perf_counter()
+        loop.run_until_complete(client.on_game_tick(tick))
+        try:
+            policy.execute_actions(tick.get("tick"), client.state)
+        except Exception:  # a policy crash, reported with its traceback instead of ending the run
+            failures.setdefault(traceback.format_exc(), []).append((tick.get("tick"), agent_id))
+        latencies.append(time.perf_counter() - start)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--profile"]
+    paths = replay_paths(args)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    profiler.reset()
+
+    latencies = []
+    failures = OrderedDict()
+    start = time.perf_counter()
+    for path in paths:
+        with open(path, 'r') as json_file:
+            replay_json = json_file.read()
+        agent_ids = json.loads(replay_json).get("payload").get("initial_state").get("agents").keys()
+        for agent_id in agent_ids:  # every run parses a fresh copy, the client mutates events it applies
+            run_replay(replay_json, agent_id, loop, latencies, failures)
+    elapsed = time.perf_counter() - start
+    loop.close()
+
+    ticks = len(latencies)
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    errors = sum(len(ticks_failed) for ticks_failed in failures.values())
+    print(f"{len(paths)} replays, {ticks} ticks ({errors} failed): {ticks / elapsed:.0f} ticks/s")
+    print(f"tick latency p50 {p50:.2f}ms p90 {p90:.2f}ms p99 {p99:.2f}ms max {max(latencies) * 1000:.2f}ms")
+    print(f"peak RSS {peak_rss_mb:.0f}MB")
+    if "--profile" in sys.argv:
+        print(profiler.summary())
+    for formatted, ticks_failed in failures.items():
+        tick, agent_id = ticks_failed[0]
+        print(f"policy failed on {len(ticks_failed)} ticks, first on tick {tick} of agent {agent_id}:\n{formatted}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    exit(main())
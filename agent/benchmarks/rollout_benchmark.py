@@ -0,0 +1,68 @@
+"""
+Forward model throughput: steps/second of 30-tick rollouts from a saved game state.
+
+Run from the agent folder:
+    python -m benchmarks.rollout_benchmark [path/to/state.json]
+"""
+import json
+import random
+import sys
+import time
+
+from actions import Action, BombAction, MoveAction
+from parsing.gamestate import ParsedGameState, WALL, BOMB
+from simulation.forward_model import ForwardModel, get_target_pos
+
+state_path = "../sample_state.json"
+rollout_ticks = 30
+rollouts = 200
+seed = 42
+
+
+def random_action(gs: ParsedGameState, unit_id: str, rng: random.Random) -> Action:
+    roll = rng.random()
+    if roll < 0.1:
+        return BombAction(unit_id)
+    if roll < 0.2:
+        return Action(unit_id)
+    moves = []
+    pos = gs.unit_pos(gs.unit_index[unit_id])
+    for move in MoveAction.ALL:
+        action = MoveAction(unit_id, move)
+        target = get_target_pos(action, pos)
+        if gs.in_bounds(target) and gs.cell_type[target] != WALL and gs.cell_type[target] != BOMB:
+            moves.append(action)
+    return rng.choice(moves) if moves else Action(unit_id)
+
+
+def rollout(root: ParsedGameState, forward: ForwardModel, rng: random.Random) -> (ParsedGameState, float):
+    """:return: final state and seconds spent in ForwardModel.step"""
+    gs = root
+    step_time = 0
+    for _ in range(rollout_ticks):
+        forward.clear()
+        for unit_id in gs.unit_ids:
+            forward.enque_action(random_action(gs, unit_id, rng))
+        start = time.perf_counter()
+        gs = forward.step(gs)
+        step_time += time.perf_counter() - start
+    return gs, step_time
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else state_path
+    with open(path, 'r') as json_file:
+        root = ParsedGameState(json.load(json_file))
+    forward = ForwardModel()
+    rng = random.Random(seed)
+
+    elapsed = 0
+    for _ in range(rollouts):
+        elapsed += rollout(root, forward, rng)[1]
+
+    steps = rollouts * rollout_ticks
+    print(f"{rollouts} rollouts x {rollout_ticks} ticks: {elapsed:.3f}s in step, {steps / elapsed:.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Search core microbenchmark: AStar and LeastCostSearch on the grids of search/tests/test_shortest_path.py and on
+random boards, against the Dict[Point, ...] searches they replaced. Paths and costs have to be identical,
+test_matches_dict_based_search checks the same on fewer cases.
+
+Run from the agent folder:
+    python -m benchmarks.search_benchmark
+"""
+import time
+
+import numpy as np
+
+from search.astar import AStar
+from search.least_cost_search import LeastCostSearch
+from search.tests.test_shortest_path import cases, reference_astar, reference_least_cost
+
+seed = 42
+repeats = 20
+
+
+def timed(run):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = run()
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(seed)
+    totals = {"astar": [0, 0], "least_cost": [0, 0]}
+    mismatches = 0
+    for grid, start, end in cases(rng):
+        horizon = max(grid.shape) * 2
+        budget = grid.size // 2
+        exclude = {end}
+        for name, run, reference in (
+                ("astar", lambda: AStar(grid, start, end).run(), lambda: reference_astar(grid, start, end)),
+                ("least_cost", lambda: LeastCostSearch(grid, start, exclude, budget).run(horizon),
+                 lambda: reference_least_cost(grid, start, horizon, budget, exclude))):
+            result, elapsed = timed(run)
+            expected, reference_elapsed = timed(reference)
+            totals[name][0] += elapsed
+            totals[name][1] += reference_elapsed
+            if result != expected:
+                mismatches += 1
+                print(f"{name} differs on {grid.shape} {start} -> {end}: {result} != {expected}")
+
+    for name, (elapsed, reference_elapsed) in totals.items():
+        print(f"{name}: {elapsed * 1000:.1f}ms, dict based {reference_elapsed * 1000:.1f}ms, "
+              f"x{reference_elapsed / elapsed:.2f}")
+    print(f"{mismatches} mismatches")
+    return mismatches
+
+
+if __name__ == "__main__":
+    exit(1 if main() else 0)
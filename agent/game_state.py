@@ -1,5 +1,9 @@
+import itertools
 import json
-from typing import List
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import List, Iterable
 
 import websockets
 from websockets.client import WebSocketClientProtocol
@@ -19,16 +23,96 @@ def _get_new_unit_coordinates(coordinates, move_action) -> List[int]:
         return [x-1, y]
 
 
+class EntityIndex(Sequence):
+    """
+    state["entities"] as a coordinate keyed index with per type and per unit bomb indices.
+    Iterates like the entity list it replaces, in arrival order, while adding or removing an entity is O(1).
+    """
+
+    def __init__(self, entities: Iterable[dict] = ()):
+        self._seq = itertools.count()
+        self._entities = dict()  # seq -> entity, in arrival order
+        self._cells = defaultdict(list)  # (x, y) -> [seq]
+        self._types = defaultdict(dict)  # type -> {seq: entity}
+        self._unit_bombs = defaultdict(dict)  # owner unit id -> {seq: bomb entity}
+        self._ordered = None  # list view for positional access, dropped on every change
+        for entity in entities:
+            self.append(entity)
+
+    def append(self, entity: dict):
+        seq = next(self._seq)
+        self._ordered = None
+        self._entities[seq] = entity
+        self._cells[entity.get("x"), entity.get("y")].append(seq)
+        e_type = entity.get("type")
+        self._types[e_type][seq] = entity
+        if e_type == "b":
+            self._unit_bombs[entity.get("unit_id")][seq] = entity
+
+    def remove_at(self, x: int, y: int):
+        """removes every entity on the cell"""
+        if (x, y) in self._cells:
+            self._ordered = None
+        for seq in self._cells.pop((x, y), ()):
+            entity = self._entities.pop(seq)
+            e_type = entity.get("type")
+            del self._types[e_type][seq]
+            if e_type == "b":
+                del self._unit_bombs[entity.get("unit_id")][seq]
+
+    def at(self, x: int, y: int) -> List[dict]:
+        return [self._entities[seq] for seq in self._cells.get((x, y), ())]
+
+    def of_type(self, *e_types: str) -> List[dict]:
+        if len(e_types) == 1:
+            return list(self._types[e_types[0]].values())
+        items = itertools.chain.from_iterable(self._types[e_type].items() for e_type in e_types)
+        return [entity for _, entity in sorted(items, key=lambda item: item[0])]
+
+    def unit_bombs(self, unit_id: str) -> List[dict]:
+        return list(self._unit_bombs[unit_id].values())
+
+    def __iter__(self):
+        return iter(self._entities.values())
+
+    def __len__(self):
+        return len(self._entities)
+
+    def __getitem__(self, index):
+        if self._ordered is None:
+            self._ordered = list(self._entities.values())
+        return self._ordered[index]
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class GameState:
     def __init__(self, connection_string: str):
         self._connection_string = connection_string
         self.state = None
+        self.tick = None
+        self.tick_started_at = None  # time.perf_counter() when the current tick arrived
         self._tick_callback = None
+        self._game_end_callback = None
+        self._event_listeners = []
         self.replay = None
 
     def set_game_tick_callback(self, generate_agent_action_callback):
         self._tick_callback = generate_agent_action_callback
 
+    def set_game_end_callback(self, game_end_callback):
+        self._game_end_callback = game_end_callback
+
+    def add_event_listener(self, listener):
+        """
+        listener.on_game_state(state) is called on new game, listener.on_tick_events(events) after every tick
+        is applied to the state and before the tick callback
+        """
+        self._event_listeners.append(listener)
+        if self.state is not None:
+            listener.on_game_state(self.state)
+
     async def connect(self):
         self.connection = await websockets.connect(self._connection_string, ping_interval=None)
         if self.connection.open:
@@ -81,13 +165,20 @@ class GameState:
             payload = data.get("payload")
             winning_agent_id = payload.get("winning_agent_id")
             print(f"Game over. Winner: Agent {winning_agent_id}")
+            if self._game_end_callback is not None:
+                self._game_end_callback(payload)
         else:
             print(f"unknown packet \"{data_type}\": {data}")
 
     def on_game_state(self, game_state):
+        game_state["entities"] = EntityIndex(game_state.get("entities"))
         self.state = game_state
+        for listener in self._event_listeners:
+            listener.on_game_state(game_state)
 
     async def on_game_tick(self, game_tick):
+        self.tick_started_at = time.perf_counter()
+        self.tick = game_tick.get("tick")
         events = game_tick.get("events")
         for event in events:
             event_type = event.get("type")
@@ -107,6 +198,8 @@ class GameState:
                 self.on_unit_action(unit_action)
             else:
                 print(f"unknown event type {event_type}: {event}")
+        for listener in self._event_listeners:
+            listener.on_tick_events(events)
         if self._tick_callback is not None:
             tick_number = game_tick.get("tick")
             await self._tick_callback(tick_number, self.state)
@@ -117,25 +210,15 @@ class GameState:
 
     def _on_entity_expired(self, spawn_event):
         expire_payload = spawn_event.get("data")
-
-        def filter_entity_fn(entity):
-            [x, y] = expire_payload
-            entity_x = entity.get("x")
-            entity_y = entity.get("y")
-            should_remove = entity_x == x and entity_y == y
-            return should_remove == False
-
-        self.state["entities"] = list(filter(
-            filter_entity_fn, self.state["entities"]))
+        [x, y] = expire_payload
+        self.state["entities"].remove_at(x, y)
 
     def _on_unit_state(self, unit_state):
         unit_id = unit_state.get("unit_id")
         self.state["unit_state"][unit_id] = unit_state
 
     def _on_entity_state(self, x, y, updated_entity):
-        for entity in self.state.get("entities"):
-            if entity.get("x") == x and entity.get("y") == y:
-                self.state["entities"].remove(entity)
+        self.state["entities"].remove_at(x, y)
         self.state["entities"].append(updated_entity)
 
     def on_unit_action(self, action_packet):
@@ -34,22 +34,26 @@ class BombCluster:
         )
 
 
-@dataclass(frozen=False)
-class BombExplosionMapEntry:
-    bomb: Bomb
-    cluster: BombCluster
-
-    def merge_with(self, other: BombExplosionMapEntry, cluster_to_bombs):
-        other_cluster = other.cluster
-        my_cluster = self.cluster
-        new_cluster = self.cluster.merge_with(other.cluster)
-        new_cluster_entries = []
-        for other_cluster_entry in cluster_to_bombs[other_cluster]:
-            other_cluster_entry.cluster = new_cluster
-            new_cluster_entries.append(other_cluster_entry)
-        for cluster_entry in cluster_to_bombs[my_cluster]:
-            cluster_entry.cluster = new_cluster
-            new_cluster_entries.append(cluster_entry)
-        cluster_to_bombs[other_cluster].clear()
-        cluster_to_bombs[my_cluster].clear()
-        cluster_to_bombs[new_cluster] = new_cluster_entries
+class DisjointSet:
+    """Union-find over bomb indices, used to group bombs into chain reaction clusters"""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        i = self.find(i)
+        j = self.find(j)
+        if i == j:
+            return
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.size[i] += self.size[j]
@@ -0,0 +1,65 @@
+import numpy as np
+
+from parsing.settings import explosion_danger
+from simulation.forward_model import blast_expiry_ticks
+
+
+class DangerVolume:
+    """
+    Danger of every cell at every tick from now, shape (horizon, w, h), t = 0 is the current tick.
+    The static danger_map charges a bomb's reach the same whatever its timer, here a cell is lethal only while it
+    burns: explosions until they expire, bomb clusters for blast_expiry_ticks from their ticks_till_explode on and
+    endgame fire from the tick it reaches the cell. Armed enemy clusters can be detonated any time, so their
+    cells keep the cluster danger until they explode.
+    """
+
+    def __init__(self, parser, ticks_until_fire: np.ndarray, horizon: int):
+        """
+        :param ticks_until_fire: ticks until endgame fire lands on every cell, see EndgameFireTimeline
+        """
+        w, h = parser.w, parser.h
+        self.horizon = horizon
+        self.lethal = np.zeros((horizon, w, h), dtype=bool)
+        self.danger = np.zeros((horizon, w, h))
+        # danger the volume accounts for and cost maps built on parser.danger_map have to drop
+        self.static_danger = np.copy(parser.bomb_danger_map)
+
+        explosions = np.zeros((w, h), dtype=bool)
+        for entity in parser.entities:
+            if entity.get("type") != "x":
+                continue
+            coordinates = entity.get("x"), entity.get("y")
+            explosions[coordinates] = True
+            expires = entity.get("expires")
+            until = horizon if expires is None else max(0, min(expires - parser.tick_number, horizon))
+            self.lethal[:until, coordinates[0], coordinates[1]] = True
+        self.static_danger[explosions] += explosion_danger
+
+        for cluster_map, clusters in ((parser.all_bomb_explosion_map_my, parser.clusters_my),
+                                      (parser.all_bomb_explosion_map_enemy, parser.clusters_enemy)):
+            for cluster_id, cluster in enumerate(clusters):
+                reach = (cluster_map == cluster_id).any(axis=0)
+                explodes = max(0, cluster.ticks_till_explode)
+                self.lethal[explodes:explodes + blast_expiry_ticks, reach] = True
+                if cluster.is_enemy and cluster.is_armed:
+                    before = self.danger[:explodes, reach]
+                    self.danger[:explodes, reach] = np.maximum(before, cluster.danger)
+
+        self.lethal |= ticks_until_fire[np.newaxis] <= np.arange(horizon)[:, np.newaxis, np.newaxis]
+
+        self.danger[self.lethal] = explosion_danger
+
+    def detonate(self, footprint: np.ndarray):
+        """
+        :param footprint: bool map of a blast the strategies detonate this tick, it goes off on the next one
+        """
+        self.danger[:1 + blast_expiry_ticks, footprint] = explosion_danger
+        self.lethal[:1 + blast_expiry_ticks, footprint] = True
+
+    def costs(self, grid: np.ndarray) -> np.ndarray:
+        """
+        :param grid: cost map built on parser.danger_map, like the state map
+        :return: grid at every tick, with the danger of bombs and explosions taken from the volume
+        """
+        return (grid - self.static_danger)[np.newaxis] + self.danger
+
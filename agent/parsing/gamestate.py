@@ -1,6 +1,7 @@
-from collections import defaultdict
 from dataclasses import dataclass
+from typing import Optional, Set, Dict
 import numpy as np
+from parsing.zobrist import zobrist_key, zobrist_keys, zobrist_hash, TICK_COMPONENT
 from utils.game_utils import point
 from utils.game_utils import Point
 
@@ -25,8 +26,8 @@ def parse_unit(json) -> UnitState:
         point(json),
         json["hp"],
         json["blast_diameter"],
-        json["invulnerable"],
-        json["stunned"]
+        json.get("invulnerable", 0),
+        json.get("stunned", 0)
     )
 
 
@@ -70,60 +71,244 @@ class BombState():
         return f"B(exp={self.expires}, r={self.blast_r})"
 
 
+# cell types of ParsedGameState.cell_type
+EMPTY = 0
+WALL = 1
+BOMB = 2
+EXPLOSION = 3
+BLAST_POWERUP = 4
+FREEZE_POWERUP = 5
+
+NO_EXPIRY = -1
+INDESTRUCTIBLE = -1
+NO_OWNER = -1
+
+# columns of ParsedGameState.unit_table
+X = 0
+Y = 1
+HP = 2
+BLAST_R = 3
+INVULNERABLE = 4
+STUNNED = 5
+
+_planes = ("cell_type", "wall_hp", "expires", "blast_r", "bomb_owner", "created")
+# containers that successors share with their parent until the first write
+_cow_fields = _planes + ("unit_table",)
+# zobrist components: planes are 0..5, unit table columns start at _unit_component
+_plane_component = {field: i for i, field in enumerate(_planes)}
+_unit_component = 8
+
+_powerup_types = {"bp": BLAST_POWERUP, "fp": FREEZE_POWERUP}
+_powerup_names = {BLAST_POWERUP: "bp", FREEZE_POWERUP: "fp"}
+
+
 # partial info that is required for forward model
 class ParsedGameState:
+    """
+    Board as typed planes indexed by [x, y] plus a unit table with one row per unit.
+    Wall hp is INDESTRUCTIBLE for metal blocks, expires is NO_EXPIRY for endgame fire,
+    bomb_owner is a unit_table row.
+    zobrist is the Zobrist hash of planes and units, kept up to date by the mutators. Code that changes
+    planes or units has to go through them.
+    """
 
     def __init__(self, json) -> None:
-        self.units = set(map(parse_unit, json["unit_state"].values()))
         w = json.get("world").get("width")
         h = json.get("world").get("height")
         self.w = w
         self.h = h
-        self.map = np.empty((w, h), dtype=object)
-        self.expiry_dict = defaultdict(list)
-        self.units_map = dict()
-        self.units_to_bombs = defaultdict(list)
-        for unit in self.units:
-            self.units_map[unit.unit_id] = unit
         self.tick = json["tick"]
+
+        units = list(map(parse_unit, json["unit_state"].values()))
+        self.unit_ids = tuple(unit.unit_id for unit in units)
+        self.agent_ids = tuple(unit.agent_id for unit in units)
+        self.unit_index = {unit_id: row for row, unit_id in enumerate(self.unit_ids)}
+        self.unit_table = np.array(
+            [(u.pos.x, u.pos.y, u.hp, u.blast_r, u.invulnerable or 0, u.stunned or 0) for u in units],
+            dtype=np.int16
+        ).reshape((len(units), 6))
+
+        self.cell_type = np.zeros((w, h), dtype=np.int8)
+        self.wall_hp = np.zeros((w, h), dtype=np.int16)
+        self.expires = np.full((w, h), NO_EXPIRY, dtype=np.int16)
+        self.blast_r = np.zeros((w, h), dtype=np.int8)
+        self.bomb_owner = np.full((w, h), NO_OWNER, dtype=np.int8)
+        self.created = np.zeros((w, h), dtype=np.int16)
+
         for entity in json["entities"]:
             e_type = entity["type"]
-            coords = Point(entity["x"], entity["y"])
-            new_entity = None
+            coords = entity["x"], entity["y"]
             if e_type == "b":
-                new_entity = BombState(
-                    coords,
-                    entity["blast_diameter"],
-                    entity.get(owner_unit_id),
-                    entity["created"],
-                    entity["expires"]
-                )
-                self.units_to_bombs[entity.get(owner_unit_id)].append(new_entity)
-            elif e_type == "fp" or e_type == "bp":
-                new_entity = Powerup(
-                    coords,
-                    entity["type"],
-                    entity["expires"]
-                )
+                self.cell_type[coords] = BOMB
+                self.blast_r[coords] = entity["blast_diameter"]
+                self.bomb_owner[coords] = self.unit_index.get(entity.get(owner_unit_id), NO_OWNER)
+                self.created[coords] = entity["created"]
+            elif e_type in _powerup_types:
+                self.cell_type[coords] = _powerup_types[e_type]
             elif e_type == "m" or e_type == "w" or e_type == "o":
-                new_entity = Wall(
-                    coords,
-                    entity.get("hp")
-                )
+                self.cell_type[coords] = WALL
+                hp = entity.get("hp")
+                self.wall_hp[coords] = INDESTRUCTIBLE if hp is None else hp
             elif e_type == "x":
-                new_entity = Explosion(
-                    coords,
-                    entity.get("expires", 10000)
-                )
+                self.cell_type[coords] = EXPLOSION
+            else:
+                continue
             if "expires" in entity:
-                self.expiry_dict[entity["expires"]].append(coords)
-            self.map[coords] = new_entity
+                self.expires[coords] = entity["expires"]
+        self._owned = set(_cow_fields)
+        self.zobrist = self.full_zobrist()
+
+    def full_zobrist(self) -> int:
+        """zobrist computed from scratch"""
+        result = 0
+        for field in _planes:
+            result ^= zobrist_hash(_plane_component[field], getattr(self, field))
+        for column in range(self.unit_table.shape[1]):
+            result ^= zobrist_hash(_unit_component + column, self.unit_table[:, column])
+        return result
+
+    def key(self) -> int:
+        """hash of the whole state including the tick, for transposition tables"""
+        return self.zobrist ^ zobrist_key(TICK_COMPONENT, 0, self.tick)
+
+    def successor(self) -> 'ParsedGameState':
+        """
+        Copy-on-write child state. Planes and the unit table are shared with the parent
+        and copied on the first write through the mutators below.
+        """
+        child = ParsedGameState.__new__(ParsedGameState)
+        child.__dict__.update(self.__dict__)
+        child._owned = set()
+        self._owned = set()  # parent must not mutate arrays the child sees
+        return child
+
+    def __getstate__(self):
+        """pickled without sharing info, the unpickled copy owns all its arrays"""
+        state = self.__dict__.copy()
+        del state["_owned"]
+        del state["unit_index"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.unit_index = {unit_id: row for row, unit_id in enumerate(self.unit_ids)}
+        self._owned = set(_cow_fields)
+
+    def _own(self, field: str):
+        if field in self._owned:
+            return
+        setattr(self, field, np.copy(getattr(self, field)))
+        self._owned.add(field)
+
+    def in_bounds(self, pos: Point) -> bool:
+        return 0 <= pos[0] < self.w and 0 <= pos[1] < self.h
+
+    def set_cell(self, pos: Point, cell_type: int, wall_hp: int = 0, expires: int = NO_EXPIRY,
+                 blast_r: int = 0, bomb_owner: int = NO_OWNER, created: int = 0):
+        flat = pos[0] * self.h + pos[1]
+        for field, value in zip(_planes, (cell_type, wall_hp, expires, blast_r, bomb_owner, created)):
+            old = getattr(self, field)[pos]
+            if old != value:
+                self._own(field)
+                getattr(self, field)[pos] = value
+                component = _plane_component[field]
+                self.zobrist ^= zobrist_key(component, flat, old) ^ zobrist_key(component, flat, value)
+
+    def set_cells(self, mask: np.ndarray, cell_type: int, expires: int = NO_EXPIRY):
+        """bulk set_cell for non-wall, non-bomb entities"""
+        for field, value in zip(_planes, (cell_type, 0, expires, 0, NO_OWNER, 0)):
+            changed = np.flatnonzero(mask & (getattr(self, field) != value))
+            if changed.size:
+                self._own(field)
+                plane = getattr(self, field).ravel()  # view, planes are C contiguous
+                keys = zobrist_keys(_plane_component[field], changed, plane[changed])
+                plane[changed] = value
+                keys ^= zobrist_keys(_plane_component[field], changed, plane[changed])
+                self.zobrist ^= int(np.bitwise_xor.reduce(keys))
+
+    def clear_cell(self, pos: Point):
+        self.set_cell(pos, EMPTY)
+
+    def set_unit(self, row: int, column: int, value: int):
+        old = self.unit_table[row, column]
+        if old == value:
+            return
+        self._own("unit_table")
+        self.unit_table[row, column] = value
+        self.zobrist ^= zobrist_key(_unit_component + column, row, old) ^ \
+            zobrist_key(_unit_component + column, row, self.unit_table[row, column])
+
+    def move_unit(self, row: int, pos: Point):
+        self.set_unit(row, X, pos[0])
+        self.set_unit(row, Y, pos[1])
+
+    def unit_pos(self, row: int) -> Point:
+        return Point(*self.unit_table[row, :2].tolist())
+
+    def cells_under_units(self, plane: np.ndarray) -> np.ndarray:
+        return plane[self.unit_table[:, X], self.unit_table[:, Y]]
+
+    def unit_rows_at(self, pos: Point) -> np.ndarray:
+        return np.flatnonzero((self.unit_table[:, X] == pos[0]) & (self.unit_table[:, Y] == pos[1]))
+
+    def bomb_count(self, row: int) -> int:
+        return int(np.count_nonzero((self.cell_type == BOMB) & (self.bomb_owner == row)))
+
+    def expiring(self, tick: int) -> np.ndarray:
+        return self.expires == tick
+
+    def diff_mask(self, other: 'ParsedGameState') -> np.ndarray:
+        """cells where any plane differs from other"""
+        mask = np.zeros((self.w, self.h), dtype=bool)
+        for field in _planes:
+            mask |= getattr(self, field) != getattr(other, field)
+        return mask
+
+    def unit_state(self, row: int) -> UnitState:
+        x, y, hp, blast, invulnerable, stunned = map(int, self.unit_table[row])
+        return UnitState(self.unit_ids[row], self.agent_ids[row], Point(x, y), hp, blast, invulnerable, stunned)
+
+    @property
+    def units(self) -> Set[UnitState]:
+        return set(map(self.unit_state, range(len(self.unit_ids))))
+
+    @property
+    def units_map(self) -> Dict[str, UnitState]:
+        return {unit_id: self.unit_state(row) for row, unit_id in enumerate(self.unit_ids)}
+
+    def entity_at(self, pos: Point) -> Optional[object]:
+        """dataclass view of a cell, for debugging"""
+        pos = Point(*pos)
+        cell_type = self.cell_type[pos]
+        expires = int(self.expires[pos])
+        if cell_type == WALL:
+            hp = int(self.wall_hp[pos])
+            return Wall(pos, None if hp == INDESTRUCTIBLE else hp)
+        if cell_type == BOMB:
+            owner = int(self.bomb_owner[pos])
+            return BombState(pos, int(self.blast_r[pos]), None if owner == NO_OWNER else self.unit_ids[owner],
+                             int(self.created[pos]), expires)
+        if cell_type == EXPLOSION:
+            return Explosion(pos, expires)
+        if cell_type in _powerup_names:
+            return Powerup(pos, _powerup_names[cell_type], expires)
+        return None
+
+    @property
+    def map(self) -> np.ndarray:
+        """object array of dataclass views, for debugging"""
+        result = np.empty((self.w, self.h), dtype=object)
+        for x, y in zip(*np.nonzero(self.cell_type)):
+            result[x, y] = self.entity_at(Point(int(x), int(y)))
+        return result
 
     def __eq__(self, __o: object) -> bool:
-        return isinstance(__o, ParsedGameState) and self.units == __o.units and np.array_equal(self.map, __o.map)
+        return isinstance(__o, ParsedGameState) and self.zobrist == __o.zobrist and self.tick == __o.tick and \
+               self.unit_ids == __o.unit_ids and np.array_equal(self.unit_table, __o.unit_table) and \
+               not self.diff_mask(__o).any()
 
     def __hash__(self) -> int:
-        return hash((self.units, self.map))
+        return self.key()
 
     def __str__(self) -> str:
         return "GameState(" + str(self.map) + ")"
@@ -0,0 +1,135 @@
+import math
+
+import numpy as np
+
+from parsing.gamestate import ParsedGameState
+from parsing.parser import Parser
+from parsing.settings import explosion_danger
+from utils.grid import cross_counts
+
+
+class IncrementalParser(Parser):
+    """
+    Parser fed by GameState tick events instead of rebuilding everything from the raw entity list.
+    Entity planes (walls, walkability, explosions, occupation crosses) are kept up to date in place, only the cells
+    touched by events are recomputed. Units and bombs are few and get parsed every tick, bomb chains are reused while
+    bombs and blast blockers stay the same.
+    Register with GameState.add_event_listener(), parse(tick_number, game_state) then gives what Parser() would.
+    """
+
+    def __init__(self, pov_agent_id=None):
+        self.pov_agent_id = pov_agent_id
+        self.synced = False
+        self.game_state = None
+        self._gs = None
+        self._chains_key = None
+        self._chains = None
+
+    # ====== events =====
+
+    def on_game_state(self, game_state):
+        w = game_state.get("world").get("width")
+        h = game_state.get("world").get("height")
+        self.entity_index = game_state.get("entities")  # GameState's EntityIndex, already updated on events
+        self.entity_walkable_map = np.zeros((w, h))
+        self.entity_wall_map = np.zeros((w, h))
+        self.entity_has_wall = np.zeros((w, h), dtype=bool)
+        self.entity_crosses = np.zeros((w, h), dtype=np.int32)
+        self.entity_occupation_count = np.zeros((w, h), dtype=np.int32)
+        self.explosion_map = np.zeros((w, h), dtype=bool)
+        self.endgame_fire_count = np.zeros((w, h), dtype=np.int32)
+        self._chains_key = None
+        self._chains = None
+        self.refresh_cells({(entity.get("x"), entity.get("y")) for entity in self.entity_index})
+        self.synced = True
+
+    def on_tick_events(self, events):
+        if not self.synced:
+            return
+        touched = set()
+        for event in events:
+            event_type = event.get("type")
+            if event_type == "entity_spawned":
+                entity = event.get("data")
+                touched.add((entity.get("x"), entity.get("y")))
+            elif event_type == "entity_expired":
+                touched.add(tuple(event.get("data")))
+            elif event_type == "entity_state":
+                touched.add(tuple(event.get("coordinates")))
+        self.refresh_cells(touched)
+
+    def refresh_cells(self, cells):
+        crosses = self.entity_crosses
+        changed = False
+        for pos in cells:
+            walkable = 0
+            wall = 0
+            has_wall = False
+            n_crosses = 0
+            explosion = False
+            endgame_fires = 0
+            for entity in self.entity_index.at(*pos):
+                e_type = entity.get("type")
+                if e_type == "fp" or e_type == "bp":
+                    continue
+                n_crosses += 1
+                if e_type != "x":
+                    walkable = math.inf
+                if e_type == "x":
+                    explosion = True
+                    if "expires" not in entity:
+                        endgame_fires += 1
+                if e_type == "m":
+                    wall = math.inf
+                    has_wall = True
+                if e_type == "w" or e_type == "o":
+                    wall = entity.get("hp")
+                    has_wall = True
+            self.entity_walkable_map[pos] = walkable
+            self.entity_wall_map[pos] = wall
+            self.entity_has_wall[pos] = has_wall
+            self.explosion_map[pos] = explosion
+            self.endgame_fire_count[pos] = endgame_fires
+            if crosses[pos] != n_crosses:
+                crosses[pos] = n_crosses
+                changed = True
+        if changed:
+            self.entity_occupation_count = cross_counts(crosses)
+
+    # ====== parsing =====
+
+    @property
+    def gs(self) -> ParsedGameState:
+        """forward model state is only built when somebody asks for it"""
+        if self._gs is None:
+            self._gs = ParsedGameState(self.game_state)
+            self._gs.tick = self.tick_number
+        return self._gs
+
+    def parse(self, tick_number, game_state, pov_agent_id=None):
+        self.game_state = game_state
+        self._gs = None
+        super().parse(tick_number, game_state, self.pov_agent_id if pov_agent_id is None else pov_agent_id)
+
+    def parse_entities(self, entities):
+        self.entities = entities
+        self.power_ups.extend(self.entity_index.of_type("fp", "bp"))
+        for entity in self.entity_index.of_type("b"):
+            self.parse_bomb(entity, (entity.get("x"), entity.get("y")))
+        np.maximum(self.walkable_map, self.entity_walkable_map, out=self.walkable_map)
+        self.wall_map[self.entity_has_wall] = self.entity_wall_map[self.entity_has_wall]
+        self.danger_map[self.explosion_map] = explosion_danger
+        self.endgame_fires = int(self.endgame_fire_count.sum())
+        self.endgame_fires_map[self.endgame_fire_count != 0] = 1
+        self.cell_occupation_count += self.entity_occupation_count
+
+    def bomb_chains(self):
+        key = (
+            tuple((bomb.pos, bomb.blast_diameter, bomb.owner_unit_id in self.my_unit_ids) for bomb in self.bombs),
+            (self.blast_blockers & (self.dead_units_map == 0)).tobytes()
+        )
+        if key != self._chains_key:
+            self._chains_key = key
+            self._chains = super().bomb_chains()
+        return self._chains
+
@@ -1,10 +1,12 @@
-from copy import deepcopy
+from functools import reduce
 
-from parsing.bombs import Bomb, BombCluster, BombExplosionMapEntry
+from parsing.bombs import Bomb, BombCluster, DisjointSet
 from parsing.settings import *
-from utils.grid import draw_cross
+from utils.blast import get_blast_kernel, blast_arm_order
+from utils.grid import draw_cross, cross_counts, occupation_danger
 from utils.game_utils import *
 from parsing.gamestate import ParsedGameState, owner_unit_id
+from parsing.reach_index import ReachIndex
 
 
 class Parser:
@@ -12,19 +14,29 @@ class Parser:
     def __init__(self, tick_number, game_state, pov_agent_id=None):
         self.gs = ParsedGameState(game_state)
         self.gs.tick = tick_number
-        w = self.gs.w
-        h = self.gs.h
+        self.parse(tick_number, game_state, pov_agent_id)
+
+    def parse(self, tick_number, game_state, pov_agent_id=None):
+        w = game_state.get("world").get("width")
+        h = game_state.get("world").get("height")
         self.w = w
         self.h = h
+        self.tick_number = tick_number
         self.center = Point(w // 2, h // 2)
         self.walkable_map = np.zeros((w, h))
-        self.cell_occupation_danger_map = np.zeros((w, h))
-        self.all_bomb_explosion_map_my = np.zeros((w, h), dtype=object)
-        self.all_bomb_explosion_map_enemy = np.zeros((w, h), dtype=object)
+        # number of close_cell_danger crosses covering every cell, see occupation_danger()
+        self.cell_occupation_count = np.zeros((w, h), dtype=np.int32)
+        self.cell_occupation_danger_map = None
+        # cluster ids reaching every cell, shape (depth, w, h), -1 for none. ids index clusters_my/clusters_enemy
+        self.all_bomb_explosion_map_my = np.full((1, w, h), -1, dtype=np.int32)
+        self.all_bomb_explosion_map_enemy = np.full((1, w, h), -1, dtype=np.int32)
+        self.clusters_my = []
+        self.clusters_enemy = []
         self.has_bomb_map = np.zeros((w, h))
         self.danger_map = np.zeros((w, h))
         self.power_ups = []
         self.bombs = []
+        self.bomb_clusters = []
         self.my_bombs = []
         self.my_armed_bombs = []
         self.enemy_bombs = []
@@ -37,10 +49,10 @@ class Parser:
         self.units_map = np.zeros((w, h), dtype=object)
         self.dead_units_map = np.zeros((w, h), dtype=object)
         self.unit_id_to_unit = dict()
-        self.cluster_to_bombs_my = dict()
-        self.cluster_to_bombs_enemy = dict()
         self.wall_map = np.zeros_like(self.walkable_map)
         self.free_from_endgame_fire = 0
+        self.blast_kernel = get_blast_kernel(w, h)
+        self.reach_index = None
 
         # ====== process units =====
 
@@ -68,13 +80,24 @@ class Parser:
         self.my_units.sort(key=lambda u: u.hp, reverse=True)
         # ====== process entities =====
 
-        entities = game_state.get("entities")
-        self.entities = entities
+        self.cell_occupation_count[:, 0] = 1
+        self.cell_occupation_count[0, :] = 1
+        self.cell_occupation_count[:, h - 1] = 1
+        self.cell_occupation_count[w - 1, :] = 1
+
+        self.parse_entities(game_state.get("entities"))
+        self.cell_occupation_danger_map = occupation_danger(self.cell_occupation_count)
+
+        self.free_from_endgame_fire = self.w * self.h - self.endgame_fires
+        self.blast_blockers = self.wall_map != 0
+
+        self.add_enemy_suicide_bomb_danger()
+        self.add_enclosed_bomb_danger()
+        self.process_bombs()
+        self.add_enemy_bombs_danger()
 
-        self.cell_occupation_danger_map[:, 0] = close_cell_danger
-        self.cell_occupation_danger_map[0, :] = close_cell_danger
-        self.cell_occupation_danger_map[:, h - 1] = close_cell_danger
-        self.cell_occupation_danger_map[w - 1, :] = close_cell_danger
+    def parse_entities(self, entities):
+        self.entities = entities
 
         # a: ammunition
         # b: Bomb
@@ -84,42 +107,52 @@ class Parser:
         # m: Metal Block
         # o: Ore Block
         # w: Wooden Block
+        cells = []  # flat index of every entity but power ups
+        blocking = []
+        explosions = []
+        endgame_fires = []
+        metal = []
+        blocks = []
+        block_hps = []
+        h = self.h
         for entity in entities:
             e_type = entity.get("type")
             if e_type == "fp" or e_type == "bp":
                 self.power_ups.append(entity)
                 continue
-            coordinates = entity.get("x"), entity.get("y")
-            if e_type != "x":
-                self.walkable_map[coordinates] = math.inf
-            draw_cross(self.cell_occupation_danger_map, coordinates[0], coordinates[1], rad=2,
-                       value=close_cell_danger)
-            if e_type == "b":
-                self.parse_bomb(entity, coordinates)
+            x, y = entity.get("x"), entity.get("y")
+            cell = x * h + y
+            cells.append(cell)
             if e_type == "x":
+                explosions.append(cell)
                 if "expires" not in entity:
-                    self.endgame_fires += 1
-                    self.endgame_fires_map[coordinates] = 1
-                self.danger_map[coordinates] = explosion_danger
-            if e_type == "m":
-                self.wall_map[coordinates] = math.inf
-            if e_type == "w" or e_type == "o":
-                self.wall_map[coordinates] = entity.get("hp")
-
-        self.free_from_endgame_fire = self.w * self.h - self.endgame_fires
-
-        self.add_enemy_suicide_bomb_danger()
-        self.add_enclosed_bomb_danger()
-        self.process_bombs()
-        self.add_enemy_bombs_danger()
+                    endgame_fires.append(cell)
+                continue
+            blocking.append(cell)
+            if e_type == "b":
+                self.parse_bomb(entity, (x, y))
+            elif e_type == "m":
+                metal.append(cell)
+            elif e_type == "w" or e_type == "o":
+                blocks.append(cell)
+                block_hps.append(entity.get("hp"))
+
+        self.walkable_map.flat[blocking] = math.inf
+        self.danger_map.flat[explosions] = explosion_danger
+        self.endgame_fires = len(endgame_fires)
+        self.endgame_fires_map.flat[endgame_fires] = 1
+        self.wall_map.flat[metal] = math.inf
+        self.wall_map.flat[blocks] = block_hps
+        crosses = np.bincount(cells, minlength=self.w * h).reshape((self.w, h))
+        self.cell_occupation_count += cross_counts(crosses)
 
     def parse_bomb(self, entity, coordinates):
         bomb_placed_tick = entity.get("created")
         bomb_will_explode_tick = entity.get("expires")
         owner_id = entity.get(owner_unit_id)
         owner = self.unit_id_to_unit.get(owner_id, None)
-        is_owner_stunned = owner and owner.stunned_last_tick and owner.stunned_last_tick >= self.gs.tick
-        is_armed = self.gs.tick - bomb_placed_tick > bomb_arming_ticks and owner and not is_owner_stunned
+        is_owner_stunned = owner and owner.stunned_last_tick and owner.stunned_last_tick >= self.tick_number
+        is_armed = self.tick_number - bomb_placed_tick > bomb_arming_ticks and owner and not is_owner_stunned
 
         bomb = Bomb(
             Point(*coordinates),
@@ -135,15 +168,15 @@ class Parser:
 
         if not is_armed:
             owner_will_be_stunned_next_tick = owner and owner.stunned_last_tick and\
-                                              owner.stunned_last_tick >= self.gs.tick + 1
-            will_be_armed_next_tick = self.gs.tick + 1 - bomb_placed_tick > bomb_arming_ticks and not\
+                                              owner.stunned_last_tick >= self.tick_number + 1
+            will_be_armed_next_tick = self.tick_number + 1 - bomb_placed_tick > bomb_arming_ticks and not\
                 owner_will_be_stunned_next_tick
             if not will_be_armed_next_tick:
                 base_danger *= unarmed_bomb_danger_modifier_my if is_my_bomb else unarmed_bomb_danger_modifier_enemy
 
         end_danger = 0
-        if self.gs.tick >= bomb_will_explode_tick - bomb_end_danger_ticks:
-            end_danger = bomb_end_danger_max * (1 - (bomb_will_explode_tick - self.gs.tick - 1) /
+        if self.tick_number >= bomb_will_explode_tick - bomb_end_danger_ticks:
+            end_danger = bomb_end_danger_max * (1 - (bomb_will_explode_tick - self.tick_number - 1) /
                                                 bomb_end_danger_ticks)
         bomb_danger = base_danger + end_danger
 
@@ -153,16 +186,11 @@ class Parser:
             is_armed,
             is_my=is_my_bomb,
             is_enemy=not is_my_bomb,
-            ticks_till_explode=bomb_will_explode_tick - self.gs.tick,
+            ticks_till_explode=bomb_will_explode_tick - self.tick_number,
             my_bomb_that_can_trigger=bomb if is_my_bomb and is_armed else None
         )
-        map_entry = BombExplosionMapEntry(bomb, cluster)
-        enemy_entry = deepcopy(map_entry)
-        self.all_bomb_explosion_map_my[bomb.pos] = [map_entry]
-        self.all_bomb_explosion_map_enemy[bomb.pos] = [enemy_entry]
+        self.bomb_clusters.append(cluster)
         self.has_bomb_map[bomb.pos] = 1
-        self.cluster_to_bombs_my[cluster] = [map_entry]
-        self.cluster_to_bombs_enemy[cluster] = [enemy_entry]
 
         if is_my_bomb:
             self.my_bombs.append(bomb)
@@ -172,19 +200,25 @@ class Parser:
             self.enemy_bombs.append(bomb)
 
     def add_enclosed_bomb_danger(self):
+        """
+        Cells next to a bomb that are closed in get enclosed_bomb_danger. Nearly closed ones get
+        possibly_enclosed_bomb_danger for every free neighbour an enemy could close them from. Once per bomb
+        """
+        if not self.bombs:
+            return
+        neighbours = get_neighbour_table(self.w, self.h).points
+        occupation = self.cell_occupation_danger_map
+        enemy_cells = {unit.pos for unit in self.enemy_units if self.units_map[unit.pos] is unit}
         for bomb in self.bombs:
-            for neighbour in get_neighbours(self.danger_map, bomb.pos):
-                if self.cell_occupation_danger_map[neighbour] >= 4 * close_cell_danger:
+            for neighbour in neighbours[bomb.pos.x][bomb.pos.y]:
+                if occupation[neighbour] >= 4 * close_cell_danger:
                     self.danger_map[neighbour] += enclosed_bomb_danger
                     continue
-                if self.cell_occupation_danger_map[neighbour] >= 3 * close_cell_danger - 0.001:
-                    for neigbours_neighbour in get_neighbours(self.danger_map, neighbour):
-                        if not self.walkable_map[neigbours_neighbour]:
-                            for n_n_neigbour in get_neighbours(self.danger_map, neigbours_neighbour):
-                                if self.units_map[n_n_neigbour] and \
-                                        self.units_map[n_n_neigbour].id in self.enemy_unit_ids:
-                                    self.danger_map[neighbour] += possibly_enclosed_bomb_danger
-                                    break
+                if occupation[neighbour] >= 3 * close_cell_danger - 0.001:
+                    for closing_cell in neighbours[neighbour.x][neighbour.y]:
+                        if not self.walkable_map[closing_cell] and \
+                                not enemy_cells.isdisjoint(neighbours[closing_cell.x][closing_cell.y]):
+                            self.danger_map[neighbour] += possibly_enclosed_bomb_danger
 
     def add_enemy_suicide_bomb_danger(self):
         for enemy in self.enemy_units:
@@ -198,65 +232,96 @@ class Parser:
                                                                   blast_r(enemy.blast_diameter))
 
     def add_enemy_bombs_danger(self):
-        for x, y in np.ndindex(self.all_bomb_explosion_map_enemy.shape):
-            enemy_entries = self.all_bomb_explosion_map_enemy[x, y]
-            my_entries = self.all_bomb_explosion_map_my[x, y]
-            max_danger = 0
-            if enemy_entries:
-                for map_entry in enemy_entries:
-                    max_danger = max(max_danger, map_entry.cluster.danger)
-            if my_entries:
-                for map_entry in my_entries:
-                    max_danger = max(max_danger, map_entry.cluster.danger)
-            if max_danger != 0:
-                draw_cross(self.cell_occupation_danger_map, x, y, rad=2, value=close_cell_danger)
-            self.danger_map[x, y] += max_danger
+        max_danger = np.maximum(self.cluster_danger_map(self.all_bomb_explosion_map_enemy, self.clusters_enemy),
+                                self.cluster_danger_map(self.all_bomb_explosion_map_my, self.clusters_my))
+        self.cell_occupation_count += cross_counts(max_danger != 0)
+        self.cell_occupation_danger_map = occupation_danger(self.cell_occupation_count)
+        self.danger_map += max_danger
+        self.bomb_danger_map = max_danger
+
+    @staticmethod
+    def cluster_danger_map(cluster_map, clusters):
+        """max danger of the clusters reaching every cell"""
+        dangers = np.array([cluster.danger for cluster in clusters] + [0.])  # id -1 picks the trailing 0
+        return np.maximum(dangers[cluster_map].max(axis=0), 0)
 
     def process_bombs(self):
-        self.process_bombs_helper(self.all_bomb_explosion_map_my, self.my_bombs, self.cluster_to_bombs_my)
-        self.process_bombs_helper(self.all_bomb_explosion_map_enemy, self.enemy_bombs, self.cluster_to_bombs_enemy)
-
-    def process_bombs_helper(self, all_bomb_explosion_map, bombs, cluster_to_bombs):
-        arr = all_bomb_explosion_map
-        for bomb in bombs:
-            x, y = bomb.pos
-            rad = blast_r(bomb.blast_diameter)
-            entry = all_bomb_explosion_map[bomb.pos][0]
-            # now intersection entries are not max of both
-            for i in range(1, rad):
-                if x + i >= arr.shape[0]:
-                    break
-                if self.process_bomb(x + i, y, entry, arr, cluster_to_bombs):
-                    break
-            for i in range(1, rad):
-                if x - i < 0:
-                    break
-                if self.process_bomb(x - i, y, entry, arr, cluster_to_bombs):
-                    break
-            for i in range(1, rad):
-                if y + i >= arr.shape[1]:
-                    break
-                if self.process_bomb(x, y + i, entry, arr, cluster_to_bombs):
-                    break
-            for i in range(1, rad):
-                if y - i < 0:
-                    break
-                if self.process_bomb(x, y - i, entry, arr, cluster_to_bombs):
-                    break
-
-    def process_bomb(self, x, y, entry, all_bomb_explosion_map, cluster_to_bombs) -> bool:
-        """returns true if stampled across other bomb or wall and cycle should end"""
-        other = all_bomb_explosion_map[x, y]
-
-        if other and self.has_bomb_map[x, y]:
-            entry.merge_with(other[0], cluster_to_bombs)
-            return False  # it seems in latest versions bombs go through  other bombs
-        if self.wall_map[x, y] != 0 and not self.dead_units_map[x, y]:  # explosions pass through dead units
-            return True
-        if not all_bomb_explosion_map[x, y]:
-            all_bomb_explosion_map[x, y] = []
-        all_bomb_explosion_map[x, y].append(entry)
-        return False
+        if not self.bombs:
+            return
+        (my_members, self.all_bomb_explosion_map_my), (enemy_members, self.all_bomb_explosion_map_enemy) = \
+            self.bomb_chains()
+        self.clusters_my = self.reduce_clusters(my_members)
+        self.clusters_enemy = self.reduce_clusters(enemy_members)
+
+    def bomb_chains(self):
+        """
+        :return: chain_bombs() for my and for enemy bombs spreading
+        """
+        blockers = self.blast_blockers & (self.dead_units_map == 0)  # explosions pass through dead units
+        footprints = self.blast_kernel.footprints(blockers, [bomb.pos for bomb in self.bombs],
+                                                  [blast_r(bomb.blast_diameter) for bomb in self.bombs],
+                                                  include_center=False)
+        is_my = np.array([bomb.owner_unit_id in self.my_unit_ids for bomb in self.bombs])
+        return self.chain_bombs(footprints, is_my), self.chain_bombs(footprints, ~is_my)
+
+    def chain_bombs(self, footprints, spreading):
+        """
+        Groups bombs into chain reaction clusters. Only spreading bombs set off the bombs in their blast,
+        it seems in latest versions bombs go through other bombs.
+        :return: bomb indices of every cluster in reduce order and cluster id map of shape (depth, w, h)
+        """
+        n = len(self.bombs)
+        has_bomb = self.has_bomb_map != 0
+        bomb_index = {bomb.pos: i for i, bomb in enumerate(self.bombs)}
+        bomb_sets = DisjointSet(n)
+        # bombs of every root in the order merge_with used to fold them, when clusters were merged bomb by bomb
+        # in the order arms reach them. The first bomb gives the start and the first armed one of mine the trigger
+        merge_order = {i: [i] for i in range(n)}
+        for i in np.flatnonzero(spreading):
+            reached_bombs = list(map(Point, *np.nonzero(footprints[i] & has_bomb)))
+            for other_pos in sorted(reached_bombs, key=lambda p: blast_arm_order(self.bombs[i].pos, p)):
+                root, other_root = bomb_sets.find(i), bomb_sets.find(bomb_index[other_pos])
+                if root == other_root:
+                    continue
+                order = merge_order.pop(root) + merge_order.pop(other_root)
+                bomb_sets.union(root, other_root)
+                merge_order[bomb_sets.find(root)] = order
+
+        root_to_id = dict()
+        members = []
+        for i in range(n):
+            root = bomb_sets.find(i)
+            if root not in root_to_id:
+                root_to_id[root] = len(members)
+                members.append(merge_order[root])
+        cluster_of_bomb = np.array([root_to_id[bomb_sets.find(i)] for i in range(n)])
+
+        # cells reached by a cluster: its bombs and blasts of its spreading bombs
+        cells = self.w * self.h
+        coverage = np.zeros((n, cells), dtype=bool)
+        coverage[spreading] = (footprints[spreading] & ~has_bomb).reshape((-1, cells))
+        coverage[np.arange(n), [bomb.pos.x * self.h + bomb.pos.y for bomb in self.bombs]] = True
+        # clusters of a cell are ordered by the first of their bombs reaching it
+        first_bomb = np.full((len(members), cells), n)
+        bomb_rows, covered_cells = np.nonzero(coverage)
+        np.minimum.at(first_bomb, (cluster_of_bomb[bomb_rows], covered_cells), bomb_rows)
+        depth = max(int((first_bomb < n).sum(axis=0).max()), 1)
+        order = np.argsort(first_bomb, axis=0, kind="stable")[:depth]
+        reached = np.take_along_axis(first_bomb, order, axis=0) < n
+        cluster_map = np.where(reached, order, -1).astype(np.int32)
+        return members, cluster_map.reshape((depth, self.w, self.h))
+
+    def reduce_clusters(self, members):
+        """attributes of every cluster reduced once over its bombs"""
+        return [reduce(BombCluster.merge_with, (self.bomb_clusters[i] for i in bombs)) for bombs in members]
+
+    def my_cluster_ids_at(self, pos) -> np.ndarray:
+        ids = self.all_bomb_explosion_map_my[:, pos[0], pos[1]]
+        return ids[ids >= 0]
+
+    def enemy_cluster_ids_at(self, pos) -> np.ndarray:
+        ids = self.all_bomb_explosion_map_enemy[:, pos[0], pos[1]]
+        return ids[ids >= 0]
 
     def parse_unit(self, unit_id, target_list, target_ids_list):
         unit = self.units.get(unit_id)
@@ -265,8 +330,7 @@ class Parser:
             self.wall_map[pos] = math.inf
             self.walkable_map[pos] = math.inf
             self.dead_units_map[pos] = unit
-            draw_cross(self.cell_occupation_danger_map, pos.x, pos.y, rad=2,
-                       value=close_cell_danger)
+            draw_cross(self.cell_occupation_count, pos.x, pos.y, rad=2, value=1)
         else:
             target_ids_list.append(unit_id)
             res = Unit(
@@ -281,47 +345,21 @@ class Parser:
             target_list.append(res)
             self.unit_id_to_unit[unit_id] = res
 
+    def get_reach_index(self) -> ReachIndex:
+        """built on first use, dropped when danger_map is raised in place"""
+        if self.reach_index is None:
+            self.reach_index = ReachIndex(self)
+        return self.reach_index
+
     def raise_danger_for_potential_explosion(self, arr, pos, danger, rad):
-        def raise_danger(x, y):
-            if x < 0 or x >= self.w or y < 0 or y >= self.h:
-                return True
-            if self.wall_map[x, y] != 0:
-                return True
-            arr[x, y] = max(arr[x, y], danger)
-            return False
-
-        raise_danger(*pos)
-        x, y = pos
-        for i in range(1, rad):
-            if raise_danger(x + i, y):
-                break
-        for i in range(1, rad):
-            if raise_danger(x - i, y):
-                break
-        for i in range(1, rad):
-            if raise_danger(x, y - i):
-                break
-        for i in range(1, rad):
-            if raise_danger(x, y + i):
-                break
-
-    def calculate_not_free_map(self, unit):
-        blast_rad = blast_r(unit.blast_diameter)
-        rad = blast_rad + 1
-
-        def free_checker(x, y):
-            if self.walkable_map[x, y] or self.danger_map[x, y]:
-                return False
-            other = self.units_map[x, y]
-            if other and other.id != unit.id and other.id in self.my_unit_ids:
-                return False
-
-            from utils.grid import check_free
-            return check_free(self, Point(x, y), rad, blast_rad, unit.id)
-
-        check_map = np.zeros_like(self.walkable_map)
-        for x, y in np.ndindex(self.all_bomb_explosion_map.shape):
-            check_map[x, y] = not free_checker(x, y)
-        return check_map
+        footprint = self.blast_kernel.footprint(self.blast_blockers, pos, rad)
+        arr[footprint] = np.maximum(arr[footprint], danger)
+        return footprint
+
+    def calculate_not_free_map(self, unit) -> np.ndarray:
+        """
+        :return: bool map of cells where unit can't place a bomb with a way out of its blast, see check_free
+        """
+        return self.get_reach_index().not_free_map(unit)
 
 
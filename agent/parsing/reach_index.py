@@ -0,0 +1,140 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from parsing.settings import close_cell_danger
+from utils.blast import arm_directions
+from utils.game_utils import Point, Unit, blast_r
+
+
+class ReachIndex:
+    """
+    Per tick answers of the bomb placement checks: which enemies a bomb reaches and utils.grid.check_free.
+    Enemy proximity is two cell sets and the parser maps are read as nested lists, so a check walks the blast arms
+    with lookups only, and every answer is kept for the rest of the tick. escape_map answers check_free for the
+    whole board at once. The index reads danger_map, so it has to be dropped when danger_map is raised in place,
+    see RulePolicyState.maps_changed.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.w, self.h = parser.w, parser.h
+        self.enemy_near: Set[Tuple[int, int]] = set()  # at most one step from an enemy
+        self.enemy_adjacent: Set[Tuple[int, int]] = set()  # exactly one step from an enemy
+        for enemy in parser.enemy_units:
+            x, y = enemy.pos
+            self.enemy_near.add((x, y))
+            for dx, dy in arm_directions:
+                self.enemy_adjacent.add((x + dx, y + dy))
+        self.enemy_near |= self.enemy_adjacent
+        self.clear = (parser.walkable_map == 0) & (parser.danger_map == 0)
+        self.open_cells = (self.clear & (parser.units_map == 0)).tolist()
+        self.quiet = (parser.cell_occupation_danger_map <= close_cell_danger).tolist()
+        self.blockers = parser.blast_blockers.tolist()
+        self._open_cells: Dict[Optional[str], List[List[bool]]] = {None: self.open_cells}
+        self._enemies_hit: Dict[Tuple[Point, int], List[Unit]] = dict()
+        self._free: Dict[Tuple[Point, int, int, Optional[str]], bool] = dict()
+        self._escape: Dict[Tuple[int, int, Optional[str]], np.ndarray] = dict()
+        self._not_free: Dict[Tuple[int, str], np.ndarray] = dict()
+
+    def enemies_hit(self, pos: Point, rad: int) -> List[Unit]:
+        """:return: enemies a bomb of radius rad on pos reaches, in parser.enemy_units order"""
+        key = (pos, rad)
+        enemies = self._enemies_hit.get(key)
+        if enemies is None:
+            enemies = []
+            if not self.blockers[pos[0]][pos[1]]:
+                reached = {(pos[0], pos[1])}
+                for dx, dy in arm_directions:
+                    for i in range(1, rad):
+                        x, y = pos[0] + dx * i, pos[1] + dy * i
+                        if not (0 <= x < self.w and 0 <= y < self.h) or self.blockers[x][y]:
+                            break
+                        reached.add((x, y))
+                enemies = [enemy for enemy in self.parser.enemy_units if enemy.pos in reached]
+            self._enemies_hit[key] = enemies
+        return enemies
+
+    def check_free(self, p: Point, rad: int, bomb_rad: int, ignore_unit_id: str = None) -> bool:
+        """same as utils.grid.check_free(parser, p, rad, bomb_rad, ignore_unit_id)"""
+        key = (p, rad, bomb_rad, ignore_unit_id)
+        free = self._free.get(key)
+        if free is None:
+            free = self._walk_free(p, rad, bomb_rad, self.get_open_cells(ignore_unit_id))
+            self._free[key] = free
+        return free
+
+    def get_open_cells(self, ignore_unit_id: Optional[str]) -> List[List[bool]]:
+        """:return: cells without walls, danger and units other than ignore_unit_id"""
+        if ignore_unit_id not in self._open_cells:
+            open_cells = self.open_cells
+            ignored = self.parser.unit_id_to_unit.get(ignore_unit_id)
+            if ignored is not None and self.parser.units_map[ignored.pos] is ignored and self.clear[ignored.pos]:
+                open_cells = [list(column) for column in open_cells]
+                open_cells[ignored.pos.x][ignored.pos.y] = True
+            self._open_cells[ignore_unit_id] = open_cells
+        return self._open_cells[ignore_unit_id]
+
+    def _walk_free(self, p: Point, rad: int, bomb_rad: int, open_cells: List[List[bool]]) -> bool:
+        w, h = self.w, self.h
+        enemy_near = self.enemy_near
+        for dx, dy in arm_directions:
+            for i in range(1, rad):
+                x, y = p[0] + dx * i, p[1] + dy * i
+                if not (0 <= x < w and 0 <= y < h) or not open_cells[x][y] or (x, y) in enemy_near:
+                    break
+                if i >= bomb_rad or self.quiet[x][y]:
+                    return True
+                for sx, sy in ((x, y + 1), (x, y - 1)) if dy == 0 else ((x + 1, y), (x - 1, y)):
+                    if 0 <= sx < w and 0 <= sy < h and open_cells[sx][sy] and (sx, sy) not in self.enemy_adjacent:
+                        return True
+        return False
+
+    def escape_map(self, rad: int, bomb_rad: int, ignore_unit_id: str = None) -> np.ndarray:
+        """:return: check_free(p, rad, bomb_rad, ignore_unit_id) of every cell p"""
+        key = (rad, bomb_rad, ignore_unit_id)
+        if key not in self._escape:
+            self._escape[key] = self._compute_escape_map(rad, bomb_rad, ignore_unit_id)
+        return self._escape[key]
+
+    def not_free_map(self, unit: Unit) -> np.ndarray:
+        """
+        :return: cells where unit can't place a bomb: walls, danger, my other units, or no free arm to run to.
+        Kept per blast radius and unit, the unit itself doesn't block its way out
+        """
+        blast_rad = blast_r(unit.blast_diameter)
+        key = (blast_rad, unit.id)
+        if key not in self._not_free:
+            free = self.clear & self.escape_map(blast_rad + 1, blast_rad, unit.id)
+            for other in self.parser.my_units:
+                if other.id != unit.id and self.parser.units_map[other.pos] is other:
+                    free[other.pos] = False
+            self._not_free[key] = ~free
+        return self._not_free[key]
+
+    def _compute_escape_map(self, rad: int, bomb_rad: int, ignore_unit_id: Optional[str]) -> np.ndarray:
+        w, h = self.w, self.h
+        open_cells = np.array(self.get_open_cells(ignore_unit_id), dtype=bool)
+        enemy_near = np.zeros((w, h), dtype=bool)
+        enemy_adjacent = np.zeros((w, h), dtype=bool)
+        for cells, plane in ((self.enemy_near, enemy_near), (self.enemy_adjacent, enemy_adjacent)):
+            for x, y in cells:
+                if 0 <= x < w and 0 <= y < h:
+                    plane[x, y] = True
+        passable = open_cells & ~enemy_near  # the walk of an arm goes on
+        padded = np.zeros((w + 2, h + 2), dtype=bool)
+        padded[1:-1, 1:-1] = open_cells & ~enemy_adjacent  # a side wall to hide behind
+        side_walls = np.stack([padded[1:-1, 2:] | padded[1:-1, :-2],  # arms along x look at y +- 1
+                               padded[2:, 1:-1] | padded[:-2, 1:-1]])  # arms along y look at x +- 1
+
+        kernel = self.parser.blast_kernel
+        length = min(max(rad - 1, 0), kernel.max_steps)
+        steps = kernel.rays[:, :, :length]  # (cell, arm, step i - 1), off board is the sentinel w * h
+        passable_steps = np.append(passable.ravel(), False)[steps]
+        sides = np.concatenate([side_walls.reshape(2, w * h), np.zeros((2, 1), dtype=bool)], axis=1)
+        free_steps = np.concatenate([sides[0][steps[:, :2]], sides[1][steps[:, 2:]]], axis=1)
+        free_steps |= np.append(np.array(self.quiet).ravel(), False)[steps]
+        free_steps[:, :, max(bomb_rad - 1, 0):] = True
+        # an arm is free at its first free step if no step before stopped the walk
+        reached = np.logical_and.accumulate(passable_steps, axis=-1)
+        return (reached & free_steps).any(axis=(1, 2)).reshape((w, h))
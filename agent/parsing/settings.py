@@ -29,3 +29,18 @@ stand_on_bomb_danger = 999
 enclosed_bomb_danger = stand_on_bomb_danger + 5  # shouldn't move to occupied spot
 possibly_enclosed_bomb_danger = stand_on_bomb_danger - 5
 close_enemy_danger = 1
+tick_send_margin = 0.015  # seconds of the tick kept for sending actions
+# about the slowest seconds a stage takes, it is skipped or degraded when less than that is left of the tick
+blow_up_enemies_budget = 0.002
+place_bombs_budget = 0.005
+suicide_bomb_budget = 0.002
+blow_up_path_to_center_budget = 0.040
+move_to_different_map_parts_budget = 0.025
+move_to_safer_spot_budget = 0.035
+simulation_max_depth = 4  # ticks SimulationPolicy looks ahead at most, it stops earlier at the tick deadline
+transposition_table_size = 100000  # entries kept by the lookahead search across ticks
+rollout_workers = 0  # processes of RolloutExecutor, 0 for one per core, 1 runs playouts in process
+cooperative_safer_spot = False  # plan move_all_to_safer_spot with space-time reservations instead of unit by unit
+danger_volume_safer_spot = False  # plan move_to_safer_spot against the DangerVolume instead of the static state map
+danger_volume_search_budget = 300  # (cell, tick) states the DangerVolume search expands at most
+endgame_fire_spawn_interval_ticks = 2  # ticks between two endgame fire spawns, when the game config doesn't say
@@ -0,0 +1,139 @@
+import dataclasses
+import random
+import unittest
+from dataclasses import dataclass
+
+import numpy as np
+
+from parsing.bombs import Bomb, BombCluster
+from parsing.parser import Parser
+from utils.blast import blast_arm_order
+from utils.game_utils import Point, blast_r
+
+
+@dataclass(frozen=False)
+class BombExplosionMapEntry:
+    """map entry of the clustering before the disjoint set, clusters were found by attribute equality"""
+    bomb: Bomb
+    cluster: BombCluster
+
+    def merge_with(self, other, cluster_to_bombs):
+        other_cluster = other.cluster
+        my_cluster = self.cluster
+        new_cluster = self.cluster.merge_with(other.cluster)
+        new_cluster_entries = []
+        for other_cluster_entry in cluster_to_bombs[other_cluster]:
+            other_cluster_entry.cluster = new_cluster
+            new_cluster_entries.append(other_cluster_entry)
+        for cluster_entry in cluster_to_bombs[my_cluster]:
+            cluster_entry.cluster = new_cluster
+            new_cluster_entries.append(cluster_entry)
+        cluster_to_bombs[other_cluster].clear()
+        cluster_to_bombs[my_cluster].clear()
+        cluster_to_bombs[new_cluster] = new_cluster_entries
+
+
+def attribute_clusters(parser: Parser, my: bool) -> dict:
+    """:return: cell -> clusters reaching it, in the order the old clustering listed them"""
+    cluster_map = np.zeros((parser.w, parser.h), dtype=object)
+    cluster_to_bombs = dict()
+    for bomb, cluster in zip(parser.bombs, parser.bomb_clusters):
+        entry = BombExplosionMapEntry(bomb, cluster)
+        cluster_map[bomb.pos] = [entry]
+        cluster_to_bombs[cluster] = [entry]
+    blockers = parser.blast_blockers & (parser.dead_units_map == 0)
+    has_bomb = parser.has_bomb_map != 0
+    for bomb in parser.my_bombs if my else parser.enemy_bombs:
+        footprint = parser.blast_kernel.footprint(blockers, bomb.pos, blast_r(bomb.blast_diameter),
+                                                  include_center=False)
+        entry = cluster_map[bomb.pos][0]
+        reached_bombs = list(map(Point, *np.nonzero(footprint & has_bomb)))
+        for other_pos in sorted(reached_bombs, key=lambda p: blast_arm_order(bomb.pos, p)):
+            entry.merge_with(cluster_map[other_pos][0], cluster_to_bombs)
+        for x, y in zip(*np.nonzero(footprint & ~has_bomb)):
+            if not cluster_map[x, y]:
+                cluster_map[x, y] = []
+            cluster_map[x, y].append(entry)
+    cells = dict()
+    for x, y in zip(*np.nonzero(cluster_map)):
+        clusters = []
+        for entry in cluster_map[x, y]:
+            if not any(entry.cluster is cluster for cluster in clusters):
+                clusters.append(entry.cluster)
+        cells[int(x), int(y)] = clusters
+    return cells
+
+
+def id_clusters(parser: Parser, my: bool) -> dict:
+    """:return: cell -> clusters reaching it, from the cluster id planes"""
+    cluster_map = parser.all_bomb_explosion_map_my if my else parser.all_bomb_explosion_map_enemy
+    clusters = parser.clusters_my if my else parser.clusters_enemy
+    cells = dict()
+    for x, y in zip(*np.nonzero((cluster_map >= 0).any(axis=0))):
+        cells[int(x), int(y)] = [clusters[i] for i in cluster_map[:, x, y] if i >= 0]
+    return cells
+
+
+def game_state_json(bombs):
+    """11x11 board without walls, agent a has c and e, agent b has d and f, bombs are (x, y, owner)"""
+    units = [("c", "a", 0, 0), ("e", "a", 0, 10), ("d", "b", 10, 10), ("f", "b", 10, 0)]
+    return {
+        "tick": 20,
+        "world": {"width": 11, "height": 11},
+        "agents": {"a": {"agent_id": "a", "unit_ids": ["c", "e"]}, "b": {"agent_id": "b", "unit_ids": ["d", "f"]}},
+        "unit_state": {unit_id: {"unit_id": unit_id, "agent_id": agent_id, "coordinates": [x, y], "hp": 3,
+                                 "inventory": {"bombs": 3}, "blast_diameter": 5, "invulnerable": 0, "stunned": 0}
+                       for unit_id, agent_id, x, y in units},
+        "entities": [{"type": "b", "x": x, "y": y, "unit_id": owner, "blast_diameter": 5, "created": 2,
+                      "expires": 32} for x, y, owner in bombs],
+    }
+
+
+class TestBombClusters(unittest.TestCase):
+
+    def test_chained_bombs_same_as_attribute_clusters(self):
+        # my bombs chain along y = 5 into an enemy bomb, enemy bombs chain along x = 8 from it
+        parser = Parser(20, game_state_json([(2, 5, "c"), (4, 5, "e"), (6, 5, "c"), (8, 5, "d"),
+                                             (8, 7, "d"), (8, 9, "f"), (2, 9, "e")]), "a")
+        self.assertEqual(4, len(parser.clusters_my))  # bombs of the other side don't spread
+        self.assertEqual(4, len(parser.clusters_enemy))
+        for my in (True, False):
+            self.assertEqual(attribute_clusters(parser, my), id_clusters(parser, my), my)
+
+    def test_random_layouts_same_as_attribute_clusters(self):
+        rng = random.Random(0)
+        cells = [(x, y) for x in range(1, 10) for y in range(1, 10)]
+        for _ in range(50):
+            state = game_state_json([(x, y, rng.choice("cdef")) for x, y in rng.sample(cells, rng.randint(2, 12))])
+            for bomb in state["entities"]:
+                bomb["created"] = rng.randint(0, 19)  # armed and unarmed bombs
+                bomb["expires"] = bomb["created"] + 30
+            state["entities"] += [{"type": "m", "x": x, "y": y} for x, y in rng.sample(cells, 10)
+                                  if not any(bomb["x"] == x and bomb["y"] == y for bomb in state["entities"])]
+            parser = Parser(20, state, "a")
+            for my in (True, False):
+                self.assertEqual(attribute_clusters(parser, my), id_clusters(parser, my), my)
+
+    def test_equal_clusters_stay_apart(self):
+        # Parser gives every bomb its own start, so clusters equal in all attributes are made by hand
+        parser = Parser(20, game_state_json([(2, 2, "d"), (4, 2, "d"), (8, 8, "d")]), "a")
+        parser.bomb_clusters = [dataclasses.replace(cluster, start=Point(0, 0)) for cluster in parser.bomb_clusters]
+        self.assertEqual(parser.bomb_clusters[0], parser.bomb_clusters[2])
+        parser.process_bombs()
+
+        chain, lone = parser.clusters_enemy
+        by_id = id_clusters(parser, False)
+        self.assertEqual([chain], by_id[2, 2])
+        self.assertEqual([chain], by_id[4, 2])
+        self.assertEqual([lone], by_id[8, 8])
+        self.assertEqual([lone], by_id[8, 6])
+        self.assertEqual([chain], by_id[3, 2])
+        # with attribute equality the merges went to the entry of (8, 8), which was last in cluster_to_bombs,
+        # and the chain stayed split in two
+        by_attributes = attribute_clusters(parser, False)
+        self.assertEqual(2, len(by_attributes[3, 2]))
+        self.assertIsNot(by_attributes[2, 2][0], by_attributes[4, 2][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from parsing.danger_volume import DangerVolume
+from parsing.parser import Parser
+from parsing.settings import explosion_danger
+from simulation.engame_fire_simulator2 import EndgameFireTimeline
+
+
+def game_state_json(entities, tick=10, size=9):
+    return {
+        "tick": tick,
+        "world": {"width": size, "height": size},
+        "agents": {"a": {"agent_id": "a", "unit_ids": ["c"]}, "b": {"agent_id": "b", "unit_ids": ["d"]}},
+        "unit_state": {unit_id: {"unit_id": unit_id, "agent_id": agent_id, "coordinates": [x, y], "hp": 3,
+                                 "blast_diameter": 3, "invulnerable": 0, "stunned": 0, "inventory": {"bombs": 3}}
+                       for unit_id, agent_id, x, y in [("c", "a", 0, 0), ("d", "b", 8, 8)]},
+        "entities": entities,
+    }
+
+
+class TestDangerVolume(unittest.TestCase):
+
+    def volume(self, entities, horizon=12, timeline=None):
+        parser = Parser(10, game_state_json(entities), "a")
+        timeline = timeline or EndgameFireTimeline(9, 9)
+        return parser, DangerVolume(parser, timeline.ticks_until_fire(10), horizon)
+
+    def test_bomb_burns_from_its_timer(self):
+        parser, volume = self.volume([{"type": "b", "x": 4, "y": 4, "created": 5, "expires": 13, "unit_id": "d",
+                                       "agent_id": "b", "blast_diameter": 3}])
+        expected = [False] * 3 + [True] * 5 + [False] * 4
+        for cell in [(4, 4), (5, 4), (4, 3)]:
+            self.assertEqual(volume.lethal[:, cell[0], cell[1]].tolist(), expected)
+        self.assertFalse(volume.lethal[:, 6, 4].any())
+        # the static danger of the bomb is replaced by the timed one
+        costs = volume.costs(parser.danger_map)
+        self.assertEqual(costs[0, 5, 4], 0)
+        self.assertEqual(costs[3, 5, 4], explosion_danger)
+
+    def test_explosion_expires(self):
+        parser, volume = self.volume([{"type": "x", "x": 2, "y": 3, "expires": 12}])
+        self.assertEqual(volume.lethal[:, 2, 3].tolist(), [True] * 2 + [False] * 10)
+        np.testing.assert_array_equal(volume.costs(parser.danger_map)[2:], 0)
+
+    def test_endgame_fire(self):
+        timeline = EndgameFireTimeline(9, 9, {"fire_spawn_interval_ticks": 2})
+        timeline.update(10, 2)
+        parser, volume = self.volume([{"type": "x", "x": 0, "y": 8}, {"type": "x", "x": 8, "y": 0}],
+                                     timeline=timeline)
+        self.assertTrue(volume.lethal[:, 0, 8].all())
+        self.assertEqual(volume.lethal[:, 7, 0].tolist(), [False] * 2 + [True] * 10)
+        self.assertEqual(volume.lethal[:, 1, 8].tolist(), [False] * 4 + [True] * 8)
+        self.assertFalse(volume.lethal[:, 4, 4].any())
+
+
+if __name__ == '__main__':
+    unittest.main()
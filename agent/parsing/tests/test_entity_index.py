@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+
+from game_state import EntityIndex, GameState
+
+
+def initial_state():
+    return {
+        "tick": 0,
+        "world": {"width": 5, "height": 5},
+        "unit_state": {"c": {"unit_id": "c", "agent_id": "a", "coordinates": [0, 0], "hp": 3, "blast_diameter": 3},
+                       "d": {"unit_id": "d", "agent_id": "b", "coordinates": [4, 4], "hp": 3, "blast_diameter": 3}},
+        "entities": [{"type": "m", "x": 1, "y": 1}, {"type": "w", "x": 2, "y": 1, "hp": 1},
+                     {"type": "o", "x": 3, "y": 1, "hp": 3}, {"type": "bp", "x": 0, "y": 4, "expires": 40}],
+    }
+
+
+def bomb(x, y, unit_id):
+    return {"type": "b", "x": x, "y": y, "unit_id": unit_id, "blast_diameter": 3, "created": 1, "expires": 31}
+
+
+class Recorder:
+    """listener that keeps what the index answers after every tick"""
+
+    def __init__(self):
+        self.state = None
+        self.ticks = []
+
+    def on_game_state(self, state):
+        self.state = state
+
+    def on_tick_events(self, events):
+        entities = self.state["entities"]
+        self.ticks.append({
+            "list": list(entities),
+            "indexed": [entities[i] for i in range(len(entities))],
+            "last": entities[-1] if len(entities) else None,
+            "walls": entities.of_type("w", "o", "m"),
+            "bombs_c": entities.unit_bombs("c"),
+            "bombs_d": entities.unit_bombs("d"),
+            "at_2_1": entities.at(2, 1),
+        })
+
+
+def play(ticks):
+    game_state = GameState("")
+    recorder = Recorder()
+    game_state.add_event_listener(recorder)
+    game_state.on_game_state(initial_state())
+    loop = asyncio.new_event_loop()
+    for tick, events in enumerate(ticks, start=1):
+        loop.run_until_complete(game_state.on_game_tick({"tick": tick, "events": events}))
+    loop.close()
+    return game_state, recorder.ticks
+
+
+class TestEntityIndex(unittest.TestCase):
+
+    def test_spawn_expire_and_update_events(self):
+        c_bomb, d_bomb = bomb(0, 1, "c"), bomb(4, 3, "d")
+        wall_hit = {"type": "w", "x": 2, "y": 1, "hp": 0}
+        game_state, ticks = play([
+            [{"type": "entity_spawned", "data": c_bomb}, {"type": "entity_spawned", "data": d_bomb}],
+            [{"type": "entity_state", "coordinates": [2, 1], "updated_entity": wall_hit}],
+            [{"type": "entity_expired", "data": [0, 1]}, {"type": "entity_expired", "data": [0, 4]}],
+            [{"type": "entity_expired", "data": [2, 2]}],  # nothing there
+        ])
+        metal, wall, ore, powerup = initial_state()["entities"]
+
+        self.assertEqual([metal, wall, ore, powerup, c_bomb, d_bomb], ticks[0]["list"])
+        self.assertEqual([c_bomb], ticks[0]["bombs_c"])
+        self.assertEqual([d_bomb], ticks[0]["bombs_d"])
+        self.assertEqual(d_bomb, ticks[0]["last"])
+
+        # updated entities move to the end, like remove and append on the old list
+        self.assertEqual([metal, ore, powerup, c_bomb, d_bomb, wall_hit], ticks[1]["list"])
+        self.assertEqual([metal, ore, wall_hit], ticks[1]["walls"])
+        self.assertEqual([wall_hit], ticks[1]["at_2_1"])
+
+        self.assertEqual([metal, ore, d_bomb, wall_hit], ticks[2]["list"])
+        self.assertEqual([], ticks[2]["bombs_c"])
+        self.assertEqual([d_bomb], ticks[2]["bombs_d"])
+        self.assertEqual(ticks[2], ticks[3])
+
+        for tick in ticks:
+            self.assertEqual(tick["list"], tick["indexed"])
+        self.assertEqual([metal, ore, d_bomb, wall_hit], list(game_state.state["entities"]))
+
+    def test_positional_access_follows_changes(self):
+        index = EntityIndex(initial_state()["entities"])
+        self.assertEqual("m", index[0]["type"])
+        self.assertEqual(["m", "w"], [entity["type"] for entity in index[:2]])
+        index.remove_at(1, 1)
+        self.assertEqual("w", index[0]["type"])
+        index.append(bomb(0, 1, "c"))
+        self.assertEqual("b", index[-1]["type"])
+        self.assertEqual(4, len(index))
+        self.assertIn(bomb(0, 1, "c"), index)
+        index.remove_at(4, 4)  # empty cell keeps the view
+        self.assertEqual(list(index), index[:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+
+import numpy as np
+
+from actions import MoveAction
+from parsing.gamestate import ParsedGameState, BOMB, EMPTY, EXPLOSION, HP, NO_EXPIRY, WALL, X, Y, _planes
+from parsing.tests.test_zobrist import game_state_json
+from simulation.forward_model import ForwardModel
+
+
+def snapshot(gs: ParsedGameState) -> dict:
+    result = {field: np.copy(getattr(gs, field)) for field in _planes}
+    result["unit_table"] = np.copy(gs.unit_table)
+    result["zobrist"] = gs.zobrist
+    result["tick"] = gs.tick
+    return result
+
+
+def step(gs: ParsedGameState, *actions) -> ParsedGameState:
+    forward = ForwardModel()
+    for action in actions:
+        forward.enque_action(action)
+    return forward.step(gs)
+
+
+class TestParsedGameState(unittest.TestCase):
+
+    def assertUnchanged(self, expected: dict, gs: ParsedGameState):
+        for field, value in expected.items():
+            if isinstance(value, np.ndarray):
+                np.testing.assert_array_equal(value, getattr(gs, field), field)
+            else:
+                self.assertEqual(value, getattr(gs, field), field)
+        self.assertEqual(gs.zobrist, gs.full_zobrist())
+
+    def test_successor_mutations_leave_parent(self):
+        parent = ParsedGameState(game_state_json())
+        before = snapshot(parent)
+        child = parent.successor()
+        child.tick += 1
+        child.set_cell((0, 0), BOMB, expires=20, blast_r=3, bomb_owner=0, created=11)
+        child.clear_cell((2, 2))
+        child.set_cells(np.eye(9, dtype=bool), EXPLOSION, 16)
+        child.set_unit(1, HP, 1)
+        child.move_unit(0, (0, 3))
+        self.assertUnchanged(before, parent)
+        self.assertEqual(child.zobrist, child.full_zobrist())
+        self.assertNotEqual(parent, child)
+
+    def test_parent_mutations_leave_successor(self):
+        parent = ParsedGameState(game_state_json())
+        child = parent.successor()
+        before = snapshot(child)
+        parent.set_cell((0, 0), WALL, wall_hp=1)
+        parent.set_unit(2, HP, 0)
+        self.assertUnchanged(before, child)
+
+    def test_grandchild_mutations_leave_ancestors(self):
+        root = ParsedGameState(game_state_json())
+        child = root.successor()
+        child.move_unit(0, (0, 3))
+        root_before, child_before = snapshot(root), snapshot(child)
+        grandchild = child.successor()
+        grandchild.move_unit(0, (0, 4))
+        grandchild.set_cell((4, 4), EXPLOSION, expires=20)
+        self.assertUnchanged(root_before, root)
+        self.assertUnchanged(child_before, child)
+
+    def test_forward_model_steps_leave_parent(self):
+        gs = ParsedGameState(game_state_json())
+        states = [(gs, snapshot(gs))]
+        for _ in range(6):  # bomb at (6, 6) goes off on tick 14
+            gs = step(gs, MoveAction("c", MoveAction.UP), MoveAction("d", MoveAction.DOWN))
+            states.append((gs, snapshot(gs)))
+        self.assertEqual(EXPLOSION, gs.cell_type[6, 6])
+        for state, before in states:
+            self.assertUnchanged(before, state)
+
+    def test_explosion_expires(self):
+        json = game_state_json()
+        json["entities"].append({"type": "x", "x": 4, "y": 8, "expires": 12})
+        gs = step(ParsedGameState(json))
+        self.assertEqual(EXPLOSION, gs.cell_type[4, 8])
+        gs = step(gs)
+        self.assertEqual(12, gs.tick)
+        self.assertEqual(EMPTY, gs.cell_type[4, 8])
+        self.assertEqual(NO_EXPIRY, gs.expires[4, 8])
+        self.assertEqual(EXPLOSION, gs.cell_type[8, 8])  # endgame fire stays
+
+    def test_blast_expires(self):
+        gs = ParsedGameState(game_state_json())
+        while gs.tick < 14:
+            gs = step(gs)
+        self.assertEqual(EXPLOSION, gs.cell_type[6, 6])
+        self.assertEqual(19, gs.expires[6, 6])
+        while gs.tick < 19:
+            gs = step(gs)
+        self.assertEqual(EMPTY, gs.cell_type[6, 6])
+        self.assertEqual([(8, 8)], list(zip(*np.nonzero(gs.cell_type == EXPLOSION))))  # only endgame fire is left
+
+    def test_off_board_move_ignored(self):
+        gs = ParsedGameState(game_state_json())
+        moved = step(gs, MoveAction("c", MoveAction.LEFT))
+        self.assertEqual((0, 2), tuple(moved.unit_table[0, [X, Y]]))
+        self.assertEqual(gs.zobrist, moved.zobrist)
+        moved = step(gs, MoveAction("c", MoveAction.RIGHT))
+        self.assertEqual((1, 2), tuple(moved.unit_table[0, [X, Y]]))
+
+    def test_equality_includes_tick(self):
+        gs = ParsedGameState(game_state_json())
+        later = gs.successor()
+        later.tick += 1
+        self.assertEqual(gs.zobrist, later.zobrist)
+        self.assertNotEqual(gs, later)
+        self.assertNotEqual(gs.key(), later.key())
+        same = gs.successor()
+        self.assertEqual(gs, same)
+        self.assertEqual(hash(gs), hash(same))
+
+    def test_equality_compares_planes(self):
+        gs = ParsedGameState(game_state_json())
+        other = gs.successor()
+        other.set_cell((0, 0), EXPLOSION, expires=20)
+        self.assertNotEqual(gs, other)
+        other.clear_cell((0, 0))
+        self.assertEqual(gs, other)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import json
+import os
+import unittest
+
+import numpy as np
+
+from game_state import GameState
+from parsing.incremental_parser import IncrementalParser
+from parsing.parser import Parser
+
+replay_path = os.path.join(os.path.dirname(__file__), "..", "..", "..", "agents", "replay.json")
+
+
+class TestIncrementalParser(unittest.TestCase):
+
+    def assert_same(self, expected: Parser, actual: Parser):
+        for name in ["walkable_map", "wall_map", "danger_map", "cell_occupation_danger_map", "endgame_fires_map",
+                     "has_bomb_map", "all_bomb_explosion_map_my", "all_bomb_explosion_map_enemy"]:
+            np.testing.assert_array_equal(getattr(expected, name), getattr(actual, name), name)
+        for name in ["bombs", "clusters_my", "clusters_enemy", "power_ups", "my_units", "enemy_units",
+                     "endgame_fires", "free_from_endgame_fire"]:
+            self.assertEqual(getattr(expected, name), getattr(actual, name), name)
+        self.assertEqual(expected.gs, actual.gs)
+
+    def test_replay(self):
+        with open(replay_path) as f:
+            replay = json.load(f)["payload"]
+        game_state = GameState("")
+        game_state.on_game_state(replay["initial_state"])
+        parser = IncrementalParser(pov_agent_id="a")
+        game_state.add_event_listener(parser)
+        loop = asyncio.new_event_loop()
+        for tick in replay["history"]:
+            loop.run_until_complete(game_state.on_game_tick(tick))
+            tick_number = tick["tick"]
+            parser.parse(tick_number, game_state.state)
+            self.assert_same(Parser(tick_number, game_state.state, "a"), parser)
+        loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import math
+import unittest
+
+import numpy as np
+
+from parsing.parser import Parser
+from parsing.settings import close_cell_danger, enclosed_bomb_danger, possibly_enclosed_bomb_danger, \
+    explosion_danger
+from parsing.tests.test_reach_index import replay_states
+from utils.game_utils import get_neighbours
+from utils.grid import cross_counts
+
+late_game_tick = 150
+maps = ["walkable_map", "wall_map", "danger_map", "cell_occupation_danger_map", "endgame_fires_map", "has_bomb_map"]
+
+
+class ReferenceParser(Parser):
+    """Parser with the per entity scalar writes of parse_entities and the get_neighbours loops of
+    add_enclosed_bomb_danger that the index array versions replaced"""
+
+    def parse_entities(self, entities):
+        self.entities = entities
+        crosses = np.zeros((self.w, self.h), dtype=np.int32)
+        for entity in entities:
+            e_type = entity.get("type")
+            if e_type == "fp" or e_type == "bp":
+                self.power_ups.append(entity)
+                continue
+            coordinates = entity.get("x"), entity.get("y")
+            if e_type != "x":
+                self.walkable_map[coordinates] = math.inf
+            crosses[coordinates] += 1
+            if e_type == "b":
+                self.parse_bomb(entity, coordinates)
+            if e_type == "x":
+                if "expires" not in entity:
+                    self.endgame_fires += 1
+                    self.endgame_fires_map[coordinates] = 1
+                self.danger_map[coordinates] = explosion_danger
+            if e_type == "m":
+                self.wall_map[coordinates] = math.inf
+            if e_type == "w" or e_type == "o":
+                self.wall_map[coordinates] = entity.get("hp")
+        self.cell_occupation_count += cross_counts(crosses)
+
+    def add_enclosed_bomb_danger(self):
+        for bomb in self.bombs:
+            for neighbour in get_neighbours(self.danger_map, bomb.pos):
+                if self.cell_occupation_danger_map[neighbour] >= 4 * close_cell_danger:
+                    self.danger_map[neighbour] += enclosed_bomb_danger
+                    continue
+                if self.cell_occupation_danger_map[neighbour] >= 3 * close_cell_danger - 0.001:
+                    for neigbours_neighbour in get_neighbours(self.danger_map, neighbour):
+                        if not self.walkable_map[neigbours_neighbour]:
+                            for n_n_neigbour in get_neighbours(self.danger_map, neigbours_neighbour):
+                                if self.units_map[n_n_neigbour] and \
+                                        self.units_map[n_n_neigbour].id in self.enemy_unit_ids:
+                                    self.danger_map[neighbour] += possibly_enclosed_bomb_danger
+                                    break
+
+
+class TestParserMaps(unittest.TestCase):
+
+    def test_same_as_reference_on_late_game(self):
+        for tick, state in replay_states(every=7):
+            if tick < late_game_tick:
+                continue
+            for agent_id in state["agents"]:
+                parser = Parser(tick, state, agent_id)
+                reference = ReferenceParser(tick, state, agent_id)
+                for name in maps:
+                    np.testing.assert_array_equal(getattr(reference, name), getattr(parser, name),
+                                                  f"{name} on tick {tick} of {agent_id}")
+                self.assertEqual((reference.endgame_fires, reference.bombs, reference.power_ups),
+                                 (parser.endgame_fires, parser.bombs, parser.power_ups), (tick, agent_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+import unittest
+
+import numpy as np
+
+from game_state import GameState
+from parsing.parser import Parser
+from utils.game_utils import Point, blast_r
+from utils.grid import check_free
+
+replay_path = os.path.join(os.path.dirname(__file__), "..", "..", "..", "agents", "replay.json")
+
+
+def replay_states(every=13):
+    """:return: (tick, game state dict) of every tick of the replay divisible by every, the dict is reused"""
+    with open(replay_path) as f:
+        replay = json.load(f)["payload"]
+    game_state = GameState("")
+    game_state.on_game_state(replay["initial_state"])
+    loop = asyncio.new_event_loop()
+    for tick in replay["history"]:
+        loop.run_until_complete(game_state.on_game_tick(tick))
+        if tick["tick"] % every == 0:
+            yield tick["tick"], game_state.state
+    loop.close()
+
+
+def replay_parsers(every=13):
+    for tick, state in replay_states(every):
+        for agent_id in state["agents"]:
+            yield Parser(tick, state, agent_id)
+
+
+class TestReachIndex(unittest.TestCase):
+
+    def test_same_as_scalar_checks_on_replay(self):
+        for parser in replay_parsers():
+            index = parser.get_reach_index()
+            cells = [Point(x, y) for x, y in np.ndindex(parser.w, parser.h)]
+            for rad in range(1, 5):
+                for ignore_unit_id in [None, *parser.my_unit_ids]:
+                    expected = [check_free(parser, p, rad + 1, rad, ignore_unit_id) for p in cells]
+                    actual = [index.check_free(p, rad + 1, rad, ignore_unit_id) for p in cells]
+                    self.assertEqual(expected, actual, (parser.tick_number, rad, ignore_unit_id))
+                    escape_map = index.escape_map(rad + 1, rad, ignore_unit_id)
+                    self.assertEqual(expected, [escape_map[p] for p in cells], (parser.tick_number, rad))
+                for p in cells:
+                    footprint = parser.blast_kernel.footprint(parser.blast_blockers, p, rad)
+                    expected = [enemy for enemy in parser.enemy_units if footprint[enemy.pos]]
+                    if parser.blast_blockers[p]:
+                        expected = []
+                    self.assertEqual(expected, index.enemies_hit(p, rad), (parser.tick_number, rad, p))
+
+    def test_not_free_map_on_replay(self):
+        for parser in replay_parsers():
+            for unit in parser.my_units:
+                rad = blast_r(unit.blast_diameter)
+                expected = np.zeros((parser.w, parser.h), dtype=bool)
+                for x, y in np.ndindex(parser.w, parser.h):
+                    other = parser.units_map[x, y]
+                    expected[x, y] = parser.walkable_map[x, y] or parser.danger_map[x, y] or \
+                        other and other.id != unit.id and other.id in parser.my_unit_ids or \
+                        not check_free(parser, Point(x, y), rad + 1, rad, unit.id)
+                np.testing.assert_array_equal(expected, parser.calculate_not_free_map(unit))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import unittest
+from collections import defaultdict
+
+from parsing.gamestate import ParsedGameState, BombState, Explosion, Powerup, Wall, NO_EXPIRY, \
+    owner_unit_id, parse_unit
+from parsing.tests.test_reach_index import replay_states
+from parsing.tests.test_zobrist import game_state_json
+from utils.game_utils import Point
+
+sample_state_path = os.path.join(os.path.dirname(__file__), "..", "..", "..", "sample_state.json")
+endgame_fire_expiry = 10000  # expiry the object map gave to explosions without one
+
+
+class DictGameState:
+    """ParsedGameState before the typed planes: an object map of dataclasses and dicts keyed by unit id"""
+
+    def __init__(self, json) -> None:
+        self.units = set(map(parse_unit, json["unit_state"].values()))
+        self.map = dict()
+        self.expiry_dict = defaultdict(list)
+        self.units_to_bombs = defaultdict(tuple)
+        for entity in json["entities"]:
+            e_type = entity["type"]
+            coords = Point(entity["x"], entity["y"])
+            new_entity = None
+            if e_type == "b":
+                new_entity = BombState(coords, entity["blast_diameter"], entity.get(owner_unit_id),
+                                       entity["created"], entity["expires"])
+                self.units_to_bombs[entity.get(owner_unit_id)] += (new_entity,)
+            elif e_type == "fp" or e_type == "bp":
+                new_entity = Powerup(coords, entity["type"], entity["expires"])
+            elif e_type == "m" or e_type == "w" or e_type == "o":
+                new_entity = Wall(coords, entity.get("hp"))
+            elif e_type == "x":
+                new_entity = Explosion(coords, entity.get("expires", endgame_fire_expiry))
+            if "expires" in entity:
+                self.expiry_dict[entity["expires"]].append(coords)
+            self.map[coords] = new_entity
+
+
+def plane_view(entity):
+    """entity of the object map as ParsedGameState.entity_at shows it"""
+    if isinstance(entity, Explosion) and entity.expires == endgame_fire_expiry:
+        return Explosion(entity.pos, NO_EXPIRY)
+    return entity
+
+
+def to_json(gs: ParsedGameState) -> dict:
+    """game state dict that parses back into gs"""
+    entities = []
+    for x, y in ((x, y) for x in range(gs.w) for y in range(gs.h)):
+        entity = gs.entity_at(Point(x, y))
+        if entity is None:
+            continue
+        json_entity = {"x": x, "y": y}
+        if isinstance(entity, Wall):
+            json_entity["type"] = "m"
+            if entity.hp is not None:
+                json_entity.update(type="w", hp=entity.hp)
+        elif isinstance(entity, BombState):
+            json_entity.update(type="b", blast_diameter=entity.blast_r, created=entity.created)
+            if entity.owner_unit_id is not None:
+                json_entity[owner_unit_id] = entity.owner_unit_id
+        elif isinstance(entity, Powerup):
+            json_entity.update(type=entity.type)
+        else:
+            json_entity.update(type="x")
+        if getattr(entity, "expires", NO_EXPIRY) != NO_EXPIRY:
+            json_entity["expires"] = entity.expires
+        entities.append(json_entity)
+    units = {unit.unit_id: {"unit_id": unit.unit_id, "agent_id": unit.agent_id, "coordinates": list(unit.pos),
+                            "hp": unit.hp, "blast_diameter": unit.blast_r, "invulnerable": unit.invulnerable,
+                            "stunned": unit.stunned}
+             for unit in map(gs.unit_state, range(len(gs.unit_ids)))}
+    return {"tick": gs.tick, "world": {"width": gs.w, "height": gs.h}, "unit_state": units, "entities": entities}
+
+
+def fixed_states():
+    yield game_state_json()
+    with open(sample_state_path) as f:
+        yield json.load(f)
+    for tick, state in replay_states(every=97):
+        yield dict(state, tick=tick, entities=list(state["entities"]))
+
+
+class TestTypedPlanes(unittest.TestCase):
+
+    def test_same_as_dict_state(self):
+        for state in fixed_states():
+            gs = ParsedGameState(state)
+            reference = DictGameState(state)
+            for x, y in ((x, y) for x in range(gs.w) for y in range(gs.h)):
+                self.assertEqual(plane_view(reference.map.get(Point(x, y))), gs.entity_at(Point(x, y)),
+                                 (state["tick"], x, y))
+            self.assertEqual(reference.units, gs.units)
+            self.assertEqual({unit.unit_id: unit for unit in reference.units}, gs.units_map)
+            for row, unit_id in enumerate(gs.unit_ids):
+                self.assertEqual(len(reference.units_to_bombs[unit_id]), gs.bomb_count(row), (state["tick"], unit_id))
+            for tick, cells in reference.expiry_dict.items():
+                cells = [cell for cell in cells if reference.map[cell] is not None]  # unknown types never show up
+                expiring = gs.expiring(tick)
+                self.assertEqual(sorted(cells), sorted(Point(int(x), int(y)) for x, y in zip(*expiring.nonzero())))
+
+    def test_round_trip(self):
+        for state in fixed_states():
+            gs = ParsedGameState(state)
+            copy = ParsedGameState(to_json(gs))
+            self.assertEqual(gs, copy)
+            self.assertEqual(gs.zobrist, copy.zobrist)
+            self.assertEqual(gs.units, copy.units)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from parsing.gamestate import ParsedGameState
+from simulation.forward_model import ForwardModel
+from utils.actions_generator import generate_possible_actions
+
+
+def game_state_json():
+    entities = [{"type": "m", "x": x, "y": y} for x in range(1, 9, 2) for y in range(1, 9, 2)]
+    entities += [{"type": "w", "x": 0, "y": 4, "hp": 1}, {"type": "o", "x": 4, "y": 0, "hp": 3},
+                 {"type": "bp", "x": 2, "y": 2, "expires": 40}, {"type": "x", "x": 8, "y": 8},
+                 {"type": "b", "x": 6, "y": 6, "blast_diameter": 5, "unit_id": "d", "created": 2, "expires": 14}]
+    return {
+        "tick": 10,
+        "world": {"width": 9, "height": 9},
+        "unit_state": {unit_id: {"unit_id": unit_id, "agent_id": agent_id, "coordinates": [x, y], "hp": 3,
+                                 "blast_diameter": 3, "invulnerable": 0, "stunned": 0}
+                       for unit_id, agent_id, x, y in [("c", "a", 0, 2), ("d", "b", 6, 5), ("e", "b", 2, 4)]},
+        "entities": entities,
+    }
+
+
+class TestZobrist(unittest.TestCase):
+
+    def test_incremental_matches_full(self):
+        rng = random.Random(0)
+        forward = ForwardModel()
+        for _ in range(20):
+            gs = ParsedGameState(game_state_json())
+            for _ in range(40):
+                forward.clear()
+                for actions in generate_possible_actions(gs).values():
+                    forward.enque_action(rng.choice(actions))
+                gs = forward.step(gs)
+                self.assertEqual(gs.zobrist, gs.full_zobrist())
+
+    def test_equal_states_hash_equal(self):
+        root = ParsedGameState(game_state_json())
+        forward = ForwardModel()
+        states = []
+        for first, second in (("up", "down"), ("down", "up")):
+            gs = root
+            for move in (first, second):
+                forward.clear()
+                action = next(a for a in generate_possible_actions(gs)["c"] if getattr(a, "action", None) == move)
+                forward.enque_action(action)
+                gs = forward.step(gs)
+            states.append(gs)
+        self.assertEqual(states[0], states[1])
+        self.assertEqual(hash(states[0]), hash(states[1]))
+        self.assertEqual(len({states[0], states[1], root}), 2)
+        self.assertNotEqual(root.key(), states[0].key())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Zobrist keys of ParsedGameState. Every (component, index, value) gets a pseudo random 64 bit key, the hash of a
+# state is the xor of the keys of all its cells and unit table entries. Keys are a mix of their coordinates instead
+# of a random table, so planes holding ticks need no value range and hashes agree between processes.
+# component is a plane, a unit table column or the tick; index is the flat cell or the unit row.
+
+_mask = (1 << 64) - 1
+_value_bits = 24
+_index_bits = 24
+
+TICK_COMPONENT = 63
+
+
+def _mix(x: int) -> int:
+    """splitmix64 finalizer"""
+    x = (x + 0x9E3779B97F4A7C15) & _mask
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _mask
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _mask
+    return x ^ (x >> 31)
+
+
+@lru_cache(maxsize=1 << 18)
+def zobrist_key(component: int, index: int, value: int) -> int:
+    return _mix((component << (_index_bits + _value_bits)) | (int(index) << _value_bits) | (int(value) & 0xFFFFFF))
+
+
+def zobrist_keys(component: int, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """zobrist_key of many (index, value) pairs"""
+    x = np.uint64(component << (_index_bits + _value_bits)) | \
+        (indices.astype(np.uint64) << np.uint64(_value_bits)) | \
+        (values.astype(np.int64) & 0xFFFFFF).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def zobrist_hash(component: int, values: np.ndarray) -> int:
+    """xor of the keys of all entries of values, index is the flat index"""
+    return int(np.bitwise_xor.reduce(zobrist_keys(component, np.arange(values.size), values.ravel())))
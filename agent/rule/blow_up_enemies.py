@@ -1,7 +1,4 @@
-from typing import List
-
 from actions import DetonateBombAction
-from parsing.bombs import BombExplosionMapEntry
 from rule.execute_action import execute_action
 from rule.state.rule_policy_state import RulePolicyState
 from rule.utils import mark_detonate_bomb_danger
@@ -15,36 +12,13 @@ def blow_up_enemies(state: RulePolicyState):
 
 
 def blow_up_if_worth_it(state: RulePolicyState, pos: Point, blow_if_equal: bool) -> bool:
-    bombs_list = state.parser.all_bomb_explosion_map_my[pos]
-    if not bombs_list:
-        return False
-    for bomb_entry in bombs_list:
-        if bomb_entry.cluster.my_bomb_that_can_trigger:
-            bomb_to_trigger = bomb_entry.cluster.my_bomb_that_can_trigger
-            enemies_in_cluster = 0
-            for e in state.parser.enemy_units:
-                enemy_weight = 2 if e == state.closest_to_center_unit else 1
-                if e.invincibility_last_tick and e.invincibility_last_tick > state.tick_number:
-                    enemy_weight *= 0.1
-                e_bomb_entries: List[BombExplosionMapEntry] = state.parser.all_bomb_explosion_map_my[e.pos]
-                if not e_bomb_entries:
-                    continue
-                for e_bomb_entry in e_bomb_entries:
-                    if e_bomb_entry.cluster == bomb_entry.cluster:
-                        enemies_in_cluster += enemy_weight
-                        break
-            my_in_cluster = 0
-            for u in state.parser.my_units:
-                my_weight = 2 if u == state.closest_to_center_unit else 1
-                if u.invincibility_last_tick and u.invincibility_last_tick > state.tick_number:
-                    my_weight *= 0.1
-                u_bomb_entries: List[BombExplosionMapEntry] = state.parser.all_bomb_explosion_map_my[u.pos]
-                if not u_bomb_entries:
-                    continue
-                for u_bomb_entry in u_bomb_entries:
-                    if u_bomb_entry.cluster == bomb_entry.cluster:
-                        my_in_cluster += my_weight
-                        break
+    for cluster_id in state.parser.my_cluster_ids_at(pos):
+        cluster = state.parser.clusters_my[cluster_id]
+        if cluster.my_bomb_that_can_trigger:
+            bomb_to_trigger = cluster.my_bomb_that_can_trigger
+            cluster_counts = state.get_cluster_counts()
+            enemies_in_cluster = cluster_counts.enemies[cluster_id]
+            my_in_cluster = cluster_counts.my[cluster_id]
             debug_print(state, "Thinking to blow up ", pos, "my", my_in_cluster, "enemy",
                         enemies_in_cluster)
             if my_in_cluster < enemies_in_cluster or my_in_cluster == enemies_in_cluster and blow_if_equal:
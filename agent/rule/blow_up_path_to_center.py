@@ -10,8 +10,8 @@ from rule.move_to_safer_spot import move_to_safer_spot, move_to_safer_spot_if_in
 from rule.state.rule_policy_state import RulePolicyState
 from rule.utils import is_my_unit_near
 from search.astar import AStar
+from search.distance_field import DistanceFields
 from utils.game_utils import manhattan_distance, blast_r, get_neighbours, Point
-from utils.grid import check_free
 from utils.policy import debug_print
 
 
@@ -27,6 +27,9 @@ def blow_up_path_to_center(state: RulePolicyState):
     for spot in state.blocked_locations:
         search_map[spot] = 10000
 
+    # fields from every power-up, shared by all units
+    powerup_fields = DistanceFields(search_map, [u.pos for u in state.parser.my_units])
+
     for unit_id in state.parser.my_unit_ids:
         if unit_id not in state.parser.unit_id_to_unit:
             # unit is dead
@@ -77,19 +80,19 @@ def blow_up_path_to_center(state: RulePolicyState):
         least_powerup_cost = math.inf
         powerup_path = None
         for powerup in state.parser.power_ups:
-            powerup_pos = Point(powerup.get("x"), powerup.get("y"))
-            path_to_powerup, powerup_cost = AStar(search_map, unit.pos, powerup_pos).run()
+            powerup_field = powerup_fields.get(Point(powerup.get("x"), powerup.get("y")))
+            powerup_cost = powerup_field.cost_at(unit.pos)
             should_persue_powerup = True
             for u in state.parser.my_units:
                 if u == unit:
                     continue
-                other_path, u_powerup_cost = AStar(search_map, u.pos, powerup_pos).run()
+                u_powerup_cost = powerup_field.cost_at(u.pos)
                 if u_powerup_cost < powerup_cost:
                     should_persue_powerup = False
                     break
                 if should_persue_powerup and least_powerup_cost > cost:
                     least_powerup_cost = cost
-                    powerup_path = path_to_powerup
+                    powerup_path = powerup_field.path_from(unit.pos)
         if least_powerup_cost != math.inf and powerup_path and len(powerup_path) > 1:
             next_pos = powerup_path[1]
 
@@ -100,11 +103,11 @@ def blow_up_path_to_center(state: RulePolicyState):
         if state.parser.wall_map[next_pos.x, next_pos.y] and state.bombs_count < 3:
             if is_my_unit_near(state, unit.pos, equals_is_true=False):
                 continue
-            if not check_free(state.parser, unit.pos, blast_r(unit.blast_diameter) + 1,
-                              blast_r(unit.blast_diameter)):
+            reach_index = state.parser.get_reach_index()
+            if not reach_index.check_free(unit.pos, blast_r(unit.blast_diameter) + 1, blast_r(unit.blast_diameter)):
                 for neighbour in get_neighbours(search_map, unit.pos):
-                    if check_free(state.parser, neighbour,
-                                  blast_r(unit.blast_diameter) + 1, blast_r(unit.blast_diameter), unit.id):
+                    if reach_index.check_free(neighbour, blast_r(unit.blast_diameter) + 1,
+                                              blast_r(unit.blast_diameter), unit.id):
                         move = plan_move_to_point(unit.id, unit.pos, neighbour)
                         execute_move(state, unit.id, move, neighbour)
                         state.force_bomb_unit_ids.add(unit.id)
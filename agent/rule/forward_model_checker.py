@@ -1,28 +1,28 @@
 import numpy as np
 
-from parsing.gamestate import Powerup
+from parsing.gamestate import BLAST_POWERUP, FREEZE_POWERUP
 from rule.state.rule_policy_state import RulePolicyState
 
 
 def check_forward_model(state: RulePolicyState):
-    if state.predicted_gs is not None:
-        if state.predicted_gs != state.parser.gs:
-            if state.predicted_gs.units != state.parser.gs.units:
-                print("Predicted units\n", state.predicted_gs.units)
-                print("Actual units\n", state.parser.gs.units)
-                print("Units diff predictred\n", state.predicted_gs.units - state.parser.gs.units)
-                print("Units diff actual\n", state.parser.gs.units - state.predicted_gs.units)
-                print("Map\n", state.parser.gs.map)
-            map_diff = np.ma.array(data=state.parser.gs.map, mask=state.predicted_gs.map == state.parser.gs.map)
-            has_diff = False
-            for el in map_diff.compressed():
-                if not isinstance(el, Powerup):
-                    print(el)
-                    has_diff = True
-            if has_diff:
+    predicted = state.predicted_gs
+    actual = state.parser.gs
+    if predicted is not None:
+        if predicted != actual:
+            if predicted.unit_ids != actual.unit_ids or not np.array_equal(predicted.unit_table, actual.unit_table):
+                print("Predicted units\n", predicted.units)
+                print("Actual units\n", actual.units)
+                print("Units diff predictred\n", predicted.units - actual.units)
+                print("Units diff actual\n", actual.units - predicted.units)
+                print("Map\n", actual.map)
+            map_diff = predicted.diff_mask(actual)
+            map_diff &= (actual.cell_type != BLAST_POWERUP) & (actual.cell_type != FREEZE_POWERUP)
+            if map_diff.any():
+                for x, y in zip(*map_diff.nonzero()):
+                    print(actual.entity_at((x, y)))
                 print("Prev map\n", state.prev_gs.map)
-                print("Predicted map\n", state.predicted_gs.map)
-                print("Actual map\n", state.parser.gs.map)
-                print("Map diff\n", map_diff)
-    state.prev_gs = state.parser.gs
-    state.predicted_gs = state.forward.step(state.parser.gs)
\ No newline at end of file
+                print("Predicted map\n", predicted.map)
+                print("Actual map\n", actual.map)
+                print("Map diff\n", np.ma.array(data=actual.map, mask=~map_diff))
+    state.prev_gs = actual
+    state.predicted_gs = state.forward.step(actual)
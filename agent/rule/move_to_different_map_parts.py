@@ -10,11 +10,39 @@ from rule.move_to_safer_spot import move_to_safer_spot_if_in_danger, move_to_saf
 from rule.state.rule_policy_state import RulePolicyState
 from rule.utils import is_my_unit_near
 from search.astar import AStar
+from search.distance_field import DistanceFields
 from utils.game_utils import manhattan_distance, Point, blast_r
-from utils.grid import check_free
 from utils.policy import debug_print
 
 
+def side_search_map(state: RulePolicyState) -> np.ndarray:
+    """cost map of the way to the other side without my units, spots taken so far this tick are off limits"""
+    search_map = np.ones_like(state.parser.wall_map)
+    search_map += state.parser.wall_map * 1000
+    search_map += state.parser.endgame_fires_map * 10000
+
+    for spot in state.already_occupied_spots:
+        search_map[spot] = 100000
+
+    for spot in state.blocked_locations:
+        search_map[spot] = 10000
+
+    for enemy in state.parser.enemy_units:
+        search_map[enemy.pos] = 10000
+    return search_map
+
+
+def powerup_search_map(state: RulePolicyState) -> np.ndarray:
+    """
+    side_search_map with all my units off limits. Every unit pays for its own cell, so the map is the same for all
+    of them and their power-up costs stay comparable.
+    """
+    search_map = side_search_map(state)
+    for unit in state.parser.my_units:
+        search_map[unit.pos] = 100000
+    return search_map
+
+
 def move_units_to_different_map_parts(state: RulePolicyState):
     if len(state.parser.my_units) < 2:
         return
@@ -65,27 +93,19 @@ def move_units_to_different_map_parts(state: RulePolicyState):
             state.unit_id_to_diff_map_side_target_pos[unit.id] = target
             break
 
+    powerup_fields = None
+    fields_occupied_spots = 0
+
     units_reached = set()
     for unit_id, target in state.unit_id_to_diff_map_side_target_pos.items():
         unit = state.parser.unit_id_to_unit[unit_id]
         if unit.pos == target:
             units_reached.add(unit_id)
             continue
-        search_map = np.ones_like(state.parser.wall_map)
-        search_map += state.parser.wall_map * 1000
-        search_map += state.parser.endgame_fires_map * 10000
-
-        for spot in state.already_occupied_spots:
-            search_map[spot] = 100000
-
-        for spot in state.blocked_locations:
-            search_map[spot] = 10000
-
+        search_map = side_search_map(state)
         for other in state.parser.my_units:
             if other.id != unit.id:
                 search_map[other.pos] = 100000
-        for enemy in state.parser.enemy_units:
-            search_map[enemy.pos] = 10000
         target_y_modifier = 1 if target.y > state.parser.center.y else -1
 
         target_y = target.y
@@ -122,22 +142,26 @@ def move_units_to_different_map_parts(state: RulePolicyState):
             debug_print(state, "already_placed_bomb", unit)
             continue
 
+        if powerup_fields is None or fields_occupied_spots != len(state.already_occupied_spots):
+            # fields from every power-up, shared by all units until one of them takes a spot
+            powerup_fields = DistanceFields(powerup_search_map(state), [u.pos for u in state.parser.my_units])
+            fields_occupied_spots = len(state.already_occupied_spots)
         least_powerup_cost = math.inf
         powerup_path = None
         for powerup in state.parser.power_ups:
-            powerup_pos = Point(powerup.get("x"), powerup.get("y"))
-            path_to_powerup, powerup_cost = AStar(search_map, unit.pos, powerup_pos).run()
+            powerup_field = powerup_fields.get(Point(powerup.get("x"), powerup.get("y")))
+            powerup_cost = powerup_field.cost_at(unit.pos)
             should_persue_powerup = True
             for u in state.parser.my_units:
                 if u == unit:
                     continue
-                other_path, u_powerup_cost = AStar(search_map, u.pos, powerup_pos).run()
+                u_powerup_cost = powerup_field.cost_at(u.pos)
                 if u_powerup_cost < powerup_cost:
                     should_persue_powerup = False
                     break
                 if should_persue_powerup and least_powerup_cost > cost:
                     least_powerup_cost = cost
-                    powerup_path = path_to_powerup
+                    powerup_path = powerup_field.path_from(unit.pos)
         if least_powerup_cost != math.inf and powerup_path and len(powerup_path) > 1:
             next_pos = powerup_path[1]
 
@@ -148,8 +172,8 @@ def move_units_to_different_map_parts(state: RulePolicyState):
         if state.parser.wall_map[next_pos.x, next_pos.y] and state.bombs_count < 3:
             if is_my_unit_near(state, unit.pos, equals_is_true=False):
                 continue
-            if not check_free(state.parser, unit.pos, blast_r(unit.blast_diameter) + 1,
-                              blast_r(unit.blast_diameter)):
+            if not state.parser.get_reach_index().check_free(unit.pos, blast_r(unit.blast_diameter) + 1,
+                                                             blast_r(unit.blast_diameter)):
                 continue
             execute_action(state, BombAction(unit.id))
             state.bombs_count += 1
@@ -6,8 +6,10 @@ from parsing.settings import *
 from rule.closest_to_center_discount import add_closest_to_center_enemy_discount
 from rule.execute_action import execute_move, plan_move
 from rule.state.rule_policy_state import RulePolicyState
+from search.cooperative_search import CooperativeLeastCostSearch
+from search.danger_volume_search import DangerVolumeSearch
 from search.least_cost_search import LeastCostSearch
-from utils.game_utils import get_neighbours, Unit
+from utils.game_utils import get_neighbours, get_neighbour_table, manhattan_distance, Unit
 from utils.grid import draw_cross
 from utils.policy import debug_print
 
@@ -18,27 +20,77 @@ def move_to_safer_spot(state: RulePolicyState, unit, allow_occupied_position=Fal
     """
     if state.is_busy(unit.id):
         return False
-    unit_map = np.copy(state.state_map)
-    debug_print(state, unit, "state_map", unit_map)
-    unit_close_cell_danger = np.copy(state.parser.cell_occupation_danger_map)
-    if unit_map[unit.pos] == math.inf:
-        unit_map[unit.pos] = stand_on_bomb_danger
-    for other_unit in state.parser.my_units:
-        if other_unit == unit:
-            continue
-        unit_place_danger = math.inf
-        if allow_occupied_position:
-            my_neighbours = set(get_neighbours(state.parser.danger_map, unit.pos))
-            if other_unit.pos in my_neighbours:
-                for neighbour in get_neighbours(state.parser.danger_map, other_unit.pos):
-                    if state.parser.danger_map[neighbour] <= my_bomb_starting_danger and not \
-                            state.parser.walkable_map[neighbour]:
-                        unit_place_danger = move_on_occupied_spot_penalty
-        unit_map[other_unit.pos] += unit_place_danger
-        draw_cross(unit_close_cell_danger, other_unit.pos.x, other_unit.pos.y, rad=2, value=close_cell_danger)
-    debug_print(state, unit, "added units", unit_map)
-    unit_map += np.square(unit_close_cell_danger)
+    unit_map = safer_spot_map(state, unit, allow_occupied_position)
+
+    if danger_volume_safer_spot:
+        volume = state.get_danger_volume().costs(unit_map)
+        search_budget = danger_volume_search_budget // 2 if state.degraded else danger_volume_search_budget
+        safest_path, cost = DangerVolumeSearch(volume, unit.pos, state.already_occupied_destinations,
+                                               search_budget).run()
+    else:
+        search_budget = search_budget_small if state.degraded else search_budget_big
+        least_cost_search = LeastCostSearch(unit_map, unit.pos,
+                                            exclude_points=state.already_occupied_destinations,
+                                            search_budget=search_budget)
+        safest_path, cost = least_cost_search.run(horizon=search_horizon)
+    # good breakpoint spot
+    state.already_occupied_destinations.add(safest_path[-1])
+    debug_print(state, unit_map, unit, safest_path, cost)
+    move = plan_move(unit.id, safest_path)
+    move_cell = safest_path[1] if move else unit.pos
+    return execute_move(state, unit.id, move, move_cell)
+
+
+def can_step_aside(state: RulePolicyState, unit, other_unit) -> bool:
+    """other_unit is next to unit and can leave its spot to a safe free cell"""
+    if other_unit.pos not in get_neighbours(state.parser.danger_map, unit.pos):
+        return False
+    for neighbour in get_neighbours(state.parser.danger_map, other_unit.pos):
+        if state.parser.danger_map[neighbour] <= my_bomb_starting_danger and not state.parser.walkable_map[neighbour]:
+            return True
+    return False
+
+
+def safer_spot_map(state: RulePolicyState, unit, allow_occupied_position=False,
+                   other_units_block=True) -> np.ndarray:
+    """
+    Cost map of the safer spot search of unit: the tick's SaferSpotBase with the cells that differ for unit
+    redone, then unit's discounts and penalties on top
+    :param other_units_block: my other units and spots taken this tick are off limits for the whole search.
+    Without it they are left to a ReservationTable
+    """
+    debug_print(state, unit, "state_map", state.state_map)
+    base = state.get_safer_spot_base()
+    unit_map = np.copy(base.cost_map)
+    other_units = [other_unit for other_unit in state.parser.my_units if other_unit != unit]
+    place_dangers = []
+    if other_units_block:
+        for other_unit in other_units:
+            unit_place_danger = math.inf
+            if allow_occupied_position and can_step_aside(state, unit, other_unit):
+                unit_place_danger = move_on_occupied_spot_penalty
+            place_dangers.append((other_unit.pos, unit_place_danger))
+    debug_print(state, unit, "added units", place_dangers)
+
+    # the close cell danger of unit's own cross doesn't count for unit
+    squares = dict()
+    if len(other_units) < len(state.parser.my_units):
+        for cell in [unit.pos, *get_neighbour_table(*unit_map.shape).points[unit.pos.x][unit.pos.y]]:
+            close_danger = state.parser.cell_occupation_danger_map[cell]
+            for other_unit in other_units:
+                if manhattan_distance(cell, other_unit.pos) <= 1:
+                    close_danger += close_cell_danger
+            squares[cell] = close_danger * close_danger
+    for cell in {*squares, unit.pos, *(pos for pos, _ in place_dangers)}:
+        value = state.state_map[cell]
+        if cell == unit.pos and value == math.inf:
+            value = stand_on_bomb_danger
+        for pos, unit_place_danger in place_dangers:
+            if pos == cell:
+                value += unit_place_danger
+        unit_map[cell] = value + squares.get(cell, base.close_cell_squares[cell])
     debug_print(state, unit, "added _cell_danger", unit_map)
+
     add_closest_to_center_enemy_discount(state, unit, unit_map)
     if unit != state.closest_to_center_unit:
         for power_up in state.parser.power_ups:
@@ -59,27 +111,49 @@ def move_to_safer_spot(state: RulePolicyState, unit, allow_occupied_position=Fal
 
         debug_print(state, unit, "added center discounts", unit_map)
 
-    for spot in state.already_occupied_spots:
-        unit_map[spot] += stand_on_bomb_danger
-    debug_print(state, unit, "removed already_occupied_spots", unit_map)
+    if other_units_block:
+        for spot in state.already_occupied_spots:
+            unit_map[spot] += stand_on_bomb_danger
+        debug_print(state, unit, "removed already_occupied_spots", unit_map)
 
     for spot in state.blocked_locations:
         if spot != unit.pos:
             unit_map[spot] += stand_on_bomb_danger
     debug_print(state, unit, "removed blocked_locations", unit_map)
+    return unit_map
 
-    search_budget = search_budget_big
 
-    least_cost_search = LeastCostSearch(unit_map, unit.pos,
-                                        exclude_points=state.already_occupied_destinations,
-                                        search_budget=search_budget)
-    safest_path, cost = least_cost_search.run(horizon=search_horizon)
-    # good breakpoint spot
-    state.already_occupied_destinations.add(safest_path[-1])
-    debug_print(state, unit_map, unit, safest_path, cost)
-    move = plan_move(unit.id, safest_path)
-    move_cell = safest_path[1] if move else unit.pos
-    return execute_move(state, unit.id, move, move_cell)
+def move_all_to_safer_spot_cooperative(state: RulePolicyState, move_order):
+    """
+    move_to_safer_spot for all units in one pass. Units are planned in move_order against a space-time
+    reservation table instead of blocking each other's cells for the whole search. Units still to be planned
+    hold their spot for the next tick, unless they can step aside.
+    """
+    search_budget = search_budget_small if state.degraded else search_budget_big
+    planner = CooperativeLeastCostSearch(search_horizon, search_budget)
+    reservations = planner.reservations
+    for unit in state.parser.my_units:
+        if state.is_busy(unit.id):  # moved by an earlier strategy this tick
+            reservations.reserve(unit.id, [unit.pos, state.unit_id_to_target_pos.get(unit.id, unit.pos)], stay=False)
+
+    pending = [unit for unit in move_order if not state.is_busy(unit.id)]
+    for i, unit in enumerate(pending):
+        unit_map = safer_spot_map(state, unit, other_units_block=False)
+        held = []
+        for other_unit in pending[i + 1:]:
+            if can_step_aside(state, unit, other_unit):
+                unit_map[other_unit.pos] += move_on_occupied_spot_penalty
+            else:
+                reservations.reserve(other_unit.id, [other_unit.pos, other_unit.pos], stay=False)
+                held.append(other_unit.id)
+        safest_path, cost = planner.plan(unit.id, unit_map, unit.pos, state.already_occupied_destinations)
+        for unit_id in held:
+            reservations.release(unit_id)
+        state.already_occupied_destinations.add(safest_path[-1])
+        debug_print(state, unit_map, unit, safest_path, cost)
+        move = plan_move(unit.id, safest_path)
+        move_cell = safest_path[1] if move else unit.pos
+        execute_move(state, unit.id, move, move_cell)
 
 
 def move_all_to_safer_spot(state: RulePolicyState):
@@ -87,6 +161,9 @@ def move_all_to_safer_spot(state: RulePolicyState):
         return state.endgame_fire_simulator.endgame_fire_spiral[unit.pos] - state.parser.danger_map[unit.pos]
 
     move_order = sorted(state.parser.my_units, key=unit_move_importance)
+    if cooperative_safer_spot:
+        move_all_to_safer_spot_cooperative(state, move_order)
+        return
     for unit in move_order:
         move_to_safer_spot(state, unit, True)
 
@@ -7,7 +7,6 @@ from rule.state.rule_policy_state import RulePolicyState
 from rule.utils import is_my_unit_near, mark_detonate_bomb_danger
 from search.astar import AStar
 from utils.game_utils import is_invincible_next_tick, blast_r, manhattan_distance
-from utils.grid import check_free
 from utils.policy import debug_print, can_hit_enemy
 
 
@@ -59,17 +58,13 @@ def place_bombs(state: RulePolicyState):
             debug_print(state, "Placing bomb", unit, "is closest to center")
             continue
 
-        if not check_free(state.parser, unit.pos, blast_r(unit.blast_diameter) + 1, blast_r(unit.blast_diameter)):
+        if not state.parser.get_reach_index().check_free(unit.pos, blast_r(unit.blast_diameter) + 1,
+                                                         blast_r(unit.blast_diameter)):
             debug_print(state, "Placing bomb", unit, "not free")
             continue
 
-        bomb_clusters = state.parser.all_bomb_explosion_map_enemy[unit.pos]
-        is_in_enemy_bomb_cluster = False
-        if bomb_clusters:
-            for entry in bomb_clusters:
-                if entry.cluster.is_enemy:
-                    is_in_enemy_bomb_cluster = True
-                    break
+        is_in_enemy_bomb_cluster = any(state.parser.clusters_enemy[cluster_id].is_enemy
+                                       for cluster_id in state.parser.enemy_cluster_ids_at(unit.pos))
         if is_in_enemy_bomb_cluster:
             debug_print(state, "Placing bomb", unit, "in enemy bomb cluster")
             continue
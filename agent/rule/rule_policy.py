@@ -2,6 +2,8 @@ import asyncio
 
 from actions import MoveAction, Action
 from game_state import GameState
+from parsing.settings import tick_send_margin, blow_up_enemies_budget, place_bombs_budget, suicide_bomb_budget, \
+    blow_up_path_to_center_budget, move_to_different_map_parts_budget, move_to_safer_spot_budget
 from rule.blow_up_enemies import blow_up_enemies
 from rule.blow_up_path_to_center import blow_up_path_to_center
 from rule.move_to_different_map_parts import move_units_to_different_map_parts
@@ -9,13 +11,39 @@ from rule.move_to_safer_spot import move_all_to_safer_spot
 from rule.place_bombs import place_bombs
 from rule.state.rule_policy_state import RulePolicyState
 from rule.suicide_bomb import suicide_bomb
+from utils.deadline import Deadline, tick_duration
 from utils.policy import prod_print
+from utils.profiler import profiler
+
+
+def move_to_different_map_parts(state: RulePolicyState):
+    if state.parser.free_from_endgame_fire > 49:
+        move_units_to_different_map_parts(state)
+    else:
+        state.unit_id_to_diff_map_side_target_pos.clear()
+
+
+# (name, stage, budget, essential) in execution order. When the tick has less than budget left,
+# optional stages are skipped and essential ones run degraded
+stages = (
+    ("blow_up_enemies", blow_up_enemies, blow_up_enemies_budget, False),
+    ("place_bombs", place_bombs, place_bombs_budget, False),
+    ("suicide_bomb", suicide_bomb, suicide_bomb_budget, False),
+    ("blow_up_path_to_center", blow_up_path_to_center, blow_up_path_to_center_budget, False),
+    ("move_to_different_map_parts", move_to_different_map_parts, move_to_different_map_parts_budget, False),
+    ("move_all_to_safer_spot", move_all_to_safer_spot, move_to_safer_spot_budget, True),
+)
 
 
 class RulePolicy:
 
-    def __init__(self):
+    def __init__(self, deadline_aware: bool = False):
+        """
+        :param deadline_aware: fit every tick into 1 / TICK_RATE_HZ, never send actions of a stale tick
+        and print per stage timing. Stages are always recorded by utils.profiler
+        """
         self.state = RulePolicyState()
+        self.deadline_aware = deadline_aware
 
     def reset(self):
         self.state = RulePolicyState()
@@ -23,24 +51,33 @@ class RulePolicy:
     def init(self, client: GameState):
         self.state.client = client
         self.state.loop = asyncio.get_event_loop()
+        client.add_event_listener(self.state.incremental_parser)
 
     def execute_actions(self, tick_number: int, game_state: GameState):
-        self.state.update(tick_number, game_state)
-
-        blow_up_enemies(self.state)
-        place_bombs(self.state)
-        suicide_bomb(self.state)
-        blow_up_path_to_center(self.state)
+        deadline = None
+        if self.deadline_aware:
+            tick_start = self.state.client.tick_started_at if self.state.client else None
+            deadline = Deadline(tick_duration - tick_send_margin, tick_start)
+        profiler.new_tick()
 
-        if self.state.parser.free_from_endgame_fire > 49:
-            move_units_to_different_map_parts(self.state)
-        else:
-            self.state.unit_id_to_diff_map_side_target_pos.clear()
+        with profiler.stage("tick"):
+            self.state.update(tick_number, game_state)
 
-        move_all_to_safer_spot(self.state)
+            for name, stage, budget, essential in stages:
+                if deadline is not None and not deadline.allows(budget):
+                    if not essential:
+                        profiler.skip(name)
+                        continue
+                    self.state.degraded = True
+                with profiler.stage(name):
+                    stage(self.state)
 
-        self.__execute_pending_actions()
+            with profiler.stage("send"):
+                self.__execute_pending_actions()
 
+        if self.deadline_aware:
+            self.state.print_queue.append(("Tick #{}!".format(tick_number), "Stages", profiler.last_tick_report(),
+                                           "left {:.1f}ms".format(deadline.remaining() * 1000)))
         while not self.state.debug and self.state.print_queue:
             print(*self.state.print_queue.popleft())
 
@@ -68,5 +105,9 @@ class RulePolicy:
             executed_actions.clear()
 
     async def __send_action_async_impl(self, action: Action, tick_number: int):
+        if self.deadline_aware and self.state.client.tick != tick_number:
+            prod_print(self.state, "Action {action} for tick {tick} is only sent on {current}, cancelling".format(
+                action=action, tick=tick_number, current=self.state.client.tick))
+            return
         await action.send(self.state.client)
         prod_print(self.state, "Sent action {action} on tick {tick}!".format(action=action, tick=tick_number))
\ No newline at end of file
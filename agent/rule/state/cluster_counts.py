@@ -0,0 +1,42 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def unit_weight(state, unit) -> float:
+    """how much a unit in a blast counts: double for the one closest to center, a tenth while invincible"""
+    weight = 2 if unit == state.closest_to_center_unit else 1
+    if unit.invincibility_last_tick and unit.invincibility_last_tick > state.tick_number:
+        weight *= 0.1
+    return weight
+
+
+def weighted_cluster_counts(cluster_map: 'np.ndarray', clusters: int, units, weights) -> list:
+    """
+    :param cluster_map: cluster ids reaching every cell, shape (depth, w, h), -1 for none
+    :return: summed weights of units standing in reach of every cluster, added up in units order
+    """
+    counts = [0] * clusters
+    for unit, weight in zip(units, weights):
+        for cluster_id in cluster_map[:, unit.pos.x, unit.pos.y].tolist():
+            if cluster_id >= 0:
+                counts[cluster_id] += weight
+    return counts
+
+
+class ClusterCounts:
+    """
+    Weighted number of enemies and of my units in reach of every cluster of my bombs, see blow_up_if_worth_it.
+    Built once a tick on the first cluster that can be triggered. Detonations only raise danger and units stay
+    where they are, so the counts hold for the whole tick.
+    """
+
+    def __init__(self, state):
+        parser = state.parser
+        clusters = len(parser.clusters_my)
+        cluster_map = parser.all_bomb_explosion_map_my
+        self.enemies = weighted_cluster_counts(cluster_map, clusters, parser.enemy_units,
+                                               [unit_weight(state, unit) for unit in parser.enemy_units])
+        self.my = weighted_cluster_counts(cluster_map, clusters, parser.my_units,
+                                          [unit_weight(state, unit) for unit in parser.my_units])
@@ -1,18 +1,25 @@
 from collections import deque
 
+from parsing.danger_volume import DangerVolume
+from parsing.incremental_parser import IncrementalParser
 from parsing.parser import Parser
+from parsing.settings import search_horizon
 from rule.state.blocked_locations import compute_blocked_locations
 from rule.state.closest_to_center import calculate_closest_to_center
+from rule.state.cluster_counts import ClusterCounts
+from rule.state.safer_spot_base import SaferSpotBase
 from rule.state.state_map import compute_state_map
-from simulation.engame_fire_simulator2 import EndgameFireSimulator2
+from simulation.engame_fire_simulator2 import EndgameFireSimulator2, EndgameFireTimeline
 from simulation.forward_model import ForwardModel
+from utils.profiler import profiler
 
 
 class RulePolicyState:
     def __init__(self):
         self.busy = set()  # units that already made the move
         self.tasks = list()
-        self.endgame_fire_simulator = EndgameFireSimulator2(15, 15)
+        self.endgame_fire_simulator = None
+        self.endgame_fire_timeline = None  # kept for the whole game
         self.has_no_path_to_center = None
         self.all_have_path_to_center = False
         self.already_occupied_spots = list()
@@ -20,6 +27,7 @@ class RulePolicyState:
         self.loop = None
         self.print_queue = deque()
         self.parser = None
+        self.incremental_parser = IncrementalParser()
         self.client = None
         self.closest_to_center_unit = None
         self.closest_to_center_my = None
@@ -34,6 +42,11 @@ class RulePolicyState:
         self.force_bomb_unit_ids = set()
         self.tick_number = 0
         self.state_map = None
+        self.danger_volume = None
+        self.detonated = list()  # blast footprints of the bombs detonated this tick
+        self.safer_spot_base = None
+        self.cluster_counts = None
+        self.degraded = False  # short on time, strategies should cut their search
 
     def update(self, tick_number, game_state):
         self.forward.clear()
@@ -44,13 +57,58 @@ class RulePolicyState:
         self.already_occupied_destinations.clear()
         self.blocked_locations.clear()
         self.tasks.clear()
+        self.degraded = False
+        self.danger_volume = None
+        self.detonated.clear()
+        self.safer_spot_base = None
+        self.cluster_counts = None
 
-        self.parser = Parser(tick_number, game_state)
+        with profiler.stage("parse"):
+            if self.incremental_parser.synced:
+                self.parser = self.incremental_parser
+                self.parser.parse(tick_number, game_state)
+            else:
+                self.parser = Parser(tick_number, game_state)
         self.bombs_count = len(self.parser.my_bombs)
+        self.endgame_fire_simulator = EndgameFireSimulator2(self.parser.w, self.parser.h)
+        if self.endgame_fire_timeline is None or \
+                self.endgame_fire_timeline.spiral is not self.endgame_fire_simulator.endgame_fire_spiral:
+            self.endgame_fire_timeline = EndgameFireTimeline(self.parser.w, self.parser.h, game_state.get("config"))
+        self.endgame_fire_timeline.update(tick_number, self.parser.endgame_fires)
 
-        compute_state_map(self)
+        with profiler.stage("state_map"):
+            compute_state_map(self)
         calculate_closest_to_center(self)
-        compute_blocked_locations(self)
+        with profiler.stage("blocked_locations"):
+            compute_blocked_locations(self)
+
+    def get_danger_volume(self) -> DangerVolume:
+        """built on first use in a tick"""
+        if self.danger_volume is None:
+            ticks_until_fire = self.endgame_fire_timeline.ticks_until_fire(self.tick_number)
+            self.danger_volume = DangerVolume(self.parser, ticks_until_fire, search_horizon)
+            for footprint in self.detonated:
+                self.danger_volume.detonate(footprint)
+        return self.danger_volume
+
+    def get_safer_spot_base(self) -> SaferSpotBase:
+        """built on first use in a tick"""
+        if self.safer_spot_base is None:
+            self.safer_spot_base = SaferSpotBase(self.state_map, self.parser.cell_occupation_danger_map,
+                                                 [unit.pos for unit in self.parser.my_units])
+        return self.safer_spot_base
+
+    def get_cluster_counts(self) -> ClusterCounts:
+        """built on first use in a tick"""
+        if self.cluster_counts is None:
+            self.cluster_counts = ClusterCounts(self)
+        return self.cluster_counts
+
+    def maps_changed(self):
+        """state_map or danger_map were changed in place, see mark_detonate_bomb_danger"""
+        self.safer_spot_base = None
+        self.danger_volume = None
+        self.parser.reach_index = None
 
     def is_busy(self, unit_id):
         return unit_id in self.busy
@@ -0,0 +1,18 @@
+import numpy as np
+
+from parsing.settings import close_cell_danger
+from utils.grid import draw_cross
+
+
+class SaferSpotBase:
+    """
+    The part of the safer spot map that is the same for all my units in a tick: the state map plus the squared
+    close cell danger of the board and of all my units. A unit's own cross is taken out again in safer_spot_map.
+    """
+
+    def __init__(self, state_map: np.ndarray, occupation_danger_map: np.ndarray, my_positions):
+        close_cell_danger_map = np.copy(occupation_danger_map)
+        for pos in my_positions:
+            draw_cross(close_cell_danger_map, pos.x, pos.y, rad=2, value=close_cell_danger)
+        self.close_cell_squares = np.square(close_cell_danger_map)
+        self.cost_map = state_map + self.close_cell_squares
@@ -5,7 +5,8 @@ import numpy as np
 from parsing.settings import explosion_danger
 from rule.execute_action import plan_move, execute_move
 from search.astar import AStar
-from utils.game_utils import is_invincible_next_tick, Point, blast_r, manhattan_distance
+from utils.blast import unravel
+from utils.game_utils import is_invincible_next_tick, blast_r, manhattan_distance
 from utils.policy import can_hit_enemy, debug_print
 
 
@@ -24,31 +25,12 @@ def suicide_bomb(state):
             if is_invincible_next_tick(enemy, state.tick_number):
                 continue
 
-            def check_explosion(x, y):
-                if x < 0 or x >= state.parser.w or y < 0 or y >= state.parser.h:
-                    return True
-                if state.parser.wall_map[x, y]:
-                    return True
-                if state.parser.danger_map[x, y] >= explosion_danger:
-                    if manhattan_distance(Point(x, y), unit.pos) <= max_distance:
-                        explosions_near_enemy.add(Point(x, y))
-                    return False
-                return False
-
             rad = blast_r(unit.blast_diameter)
-            x, y = enemy.pos
-            for i in range(1, rad):
-                if check_explosion(x + i, y):
-                    break
-            for i in range(1, rad):
-                if check_explosion(x - i, y):
-                    break
-            for i in range(1, rad):
-                if check_explosion(x, y + i):
-                    break
-            for i in range(1, rad):
-                if check_explosion(x, y - i):
-                    break
+            cells = state.parser.blast_kernel.cells(state.parser.blast_blockers, enemy.pos, rad, include_center=False)
+            for cell in unravel(cells, state.parser.h):
+                if state.parser.danger_map[cell] >= explosion_danger and \
+                        manhattan_distance(cell, unit.pos) <= max_distance:
+                    explosions_near_enemy.add(cell)
         debug_print(state, "Possible suicide pos", explosions_near_enemy)
         if not explosions_near_enemy:
             continue
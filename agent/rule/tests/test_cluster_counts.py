@@ -0,0 +1,47 @@
+import unittest
+from types import SimpleNamespace
+
+from parsing.tests.test_reach_index import replay_parsers
+from rule.state.cluster_counts import ClusterCounts
+
+
+def loop_counts(state, cluster_id):
+    """weighted enemies and my units in reach of the cluster, as blow_up_if_worth_it counted them per cluster"""
+    cluster_map = state.parser.all_bomb_explosion_map_my
+    enemies_in_cluster = 0
+    for e in state.parser.enemy_units:
+        enemy_weight = 2 if e == state.closest_to_center_unit else 1
+        if e.invincibility_last_tick and e.invincibility_last_tick > state.tick_number:
+            enemy_weight *= 0.1
+        if cluster_id in cluster_map[:, e.pos.x, e.pos.y]:
+            enemies_in_cluster += enemy_weight
+    my_in_cluster = 0
+    for u in state.parser.my_units:
+        my_weight = 2 if u == state.closest_to_center_unit else 1
+        if u.invincibility_last_tick and u.invincibility_last_tick > state.tick_number:
+            my_weight *= 0.1
+        if cluster_id in cluster_map[:, u.pos.x, u.pos.y]:
+            my_in_cluster += my_weight
+    return enemies_in_cluster, my_in_cluster
+
+
+class TestClusterCounts(unittest.TestCase):
+
+    def test_same_as_loop_on_multi_cluster_states(self):
+        checked = 0
+        for parser in replay_parsers(every=3):
+            if len(parser.clusters_my) < 2:
+                continue
+            for closest in [None, *parser.my_units, *parser.enemy_units]:
+                state = SimpleNamespace(parser=parser, tick_number=parser.tick_number, closest_to_center_unit=closest)
+                counts = ClusterCounts(state)
+                for cluster_id in range(len(parser.clusters_my)):
+                    self.assertEqual(loop_counts(state, cluster_id),
+                                     (counts.enemies[cluster_id], counts.my[cluster_id]),
+                                     (parser.tick_number, cluster_id))
+            checked += 1
+        self.assertGreater(checked, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
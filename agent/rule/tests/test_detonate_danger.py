@@ -0,0 +1,33 @@
+import unittest
+
+from parsing.settings import explosion_danger
+from parsing.tests.test_danger_volume import game_state_json
+from rule.state.rule_policy_state import RulePolicyState
+from rule.utils import mark_detonate_bomb_danger
+from utils.game_utils import Point
+
+
+class TestDetonateDanger(unittest.TestCase):
+
+    def setUp(self):
+        game_state = game_state_json([{"type": "b", "x": 4, "y": 4, "created": 5, "expires": 20, "unit_id": "d",
+                                       "agent_id": "b", "blast_diameter": 3}])
+        game_state["connection"] = {"agent_id": "a"}
+        self.state = RulePolicyState()
+        self.state.update(10, game_state)
+
+    def test_detonated_blast_is_lethal_in_danger_volume(self):
+        before = self.state.get_danger_volume()
+        self.assertGreater(self.state.parser.bomb_danger_map[4, 5], 0)  # in reach of the enemy bomb
+        mark_detonate_bomb_danger(self.state, Point(4, 7), 3)
+        volume = self.state.get_danger_volume()
+        self.assertIsNot(before, volume)
+        costs = volume.costs(self.state.state_map)
+        for cell in [(4, 5), (4, 6), (4, 7), (5, 7)]:
+            self.assertGreaterEqual(costs[1, cell[0], cell[1]], explosion_danger, cell)
+            self.assertTrue(volume.lethal[1, cell[0], cell[1]], cell)
+        self.assertLess(costs[1, 4, 3], explosion_danger)  # the enemy bomb goes off later
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from parsing.tests.test_danger_volume import game_state_json
+from rule.move_to_different_map_parts import powerup_search_map
+from rule.state.rule_policy_state import RulePolicyState
+from search.astar import AStar
+from search.distance_field import DistanceFields
+from utils.game_utils import Point
+
+
+class TestPowerupSearchMap(unittest.TestCase):
+
+    def setUp(self):
+        game_state = game_state_json([{"type": "bp", "x": 4, "y": 4}])
+        game_state["agents"]["a"]["unit_ids"] = ["c", "e"]
+        game_state["unit_state"]["c"]["coordinates"] = [0, 4]
+        game_state["unit_state"]["e"] = dict(game_state["unit_state"]["c"], unit_id="e", coordinates=[2, 4])
+        game_state["connection"] = {"agent_id": "a"}
+        self.state = RulePolicyState()
+        self.state.update(10, game_state)
+        self.powerup = Point(4, 4)
+
+    def test_path_avoids_my_other_units(self):
+        field = DistanceFields(powerup_search_map(self.state)).get(self.powerup)
+        path = field.path_from(Point(0, 4))
+        self.assertEqual(path[-1], self.powerup)
+        self.assertNotIn(Point(2, 4), path)
+        # the same as searching the map of the unit, which blocks only the others, plus its own cell
+        own_map = powerup_search_map(self.state)
+        own_map[0, 4] = 1
+        _, cost = AStar(own_map, Point(0, 4), self.powerup).run()
+        self.assertEqual(field.cost_at(Point(0, 4)), cost - 1 + 100000)
+
+    def test_path_avoids_occupied_spots(self):
+        self.state.already_occupied_spots.append(Point(1, 4))
+        field = DistanceFields(powerup_search_map(self.state)).get(self.powerup)
+        path = field.path_from(Point(0, 4))
+        self.assertEqual(path[-1], self.powerup)
+        self.assertNotIn(Point(1, 4), path)
+
+
+if __name__ == '__main__':
+    unittest.main()
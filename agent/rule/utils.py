@@ -30,4 +30,6 @@ def mark_detonate_bomb_danger(state: RulePolicyState, pos: Point, blast_rad: int
         state.parser.danger_map
     ]
     for map in maps_to_mark:
-        state.parser.raise_danger_for_potential_explosion(map, pos, explosion_danger, blast_rad)
\ No newline at end of file
+        footprint = state.parser.raise_danger_for_potential_explosion(map, pos, explosion_danger, blast_rad)
+    state.detonated.append(footprint)
+    state.maps_changed()
@@ -1,9 +1,14 @@
+import os
+
 from runner import Runner
 from rule.rule_policy import RulePolicy
 
+# DEADLINE_AWARE=1 fits every tick into 1 / TICK_RATE_HZ, see RulePolicy
+deadline_aware = os.environ.get("DEADLINE_AWARE") == "1"
+
 
 def main():
-    Runner(RulePolicy())
+    Runner(RulePolicy(deadline_aware=deadline_aware))
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ import asyncio
 import os
 import numpy as np
 from game_state import GameState
+from utils.profiler import profiler
 
 
 uri = os.environ.get(
@@ -19,6 +20,7 @@ class Runner:
         #policy.debug = True
 
         self._client.set_game_tick_callback(self._on_game_tick)
+        self._client.set_game_end_callback(self._on_game_end)
 
         loop = asyncio.get_event_loop()
         self._loop = loop
@@ -31,3 +33,6 @@ class Runner:
     async def _on_game_tick(self, tick_number, game_state):
         print("RUNNER: Tick {tick}".format(tick=tick_number))
         self._policy.execute_actions(tick_number, game_state)
+
+    def _on_game_end(self, endgame_payload):
+        print("RUNNER: Profile\n" + profiler.summary())
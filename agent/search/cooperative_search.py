@@ -0,0 +1,173 @@
+import math
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from search.least_cost_search import exclude_point_stay_cost
+from utils.game_utils import Point, get_neighbour_table
+from utils.profiler import profiler
+
+SpaceTime = Tuple[Point, int]
+
+
+class ReservationTable:
+    """
+    Cells taken by units at given ticks, t = 0 is now. Units planned earlier reserve their path,
+    later ones plan around it: a cell is only avoided at the ticks somebody is in it.
+    """
+
+    def __init__(self, horizon: int):
+        self.horizon = horizon
+        self.cells: Dict[SpaceTime, str] = dict()  # (cell, t) -> unit id
+        self.moves: Set[Tuple[Point, Point, int]] = set()  # (from, to, t): from at t, to at t + 1
+        self.reserved_cells: Set[Point] = set()  # cells reserved at any tick
+        self.unit_paths: Dict[str, Tuple[List[Point], bool]] = dict()
+
+    def reserve(self, unit_id: str, path: List[Point], stay: bool = True):
+        """
+        :param path: cell of the unit at every tick from 0
+        :param stay: unit stays at the end of path until the horizon
+        """
+        for t, cell in enumerate(path):
+            self.cells[(cell, t)] = unit_id
+        for t in range(1, len(path)):
+            self.moves.add((path[t - 1], path[t], t - 1))
+        if stay and path:
+            for t in range(len(path), self.horizon + 1):
+                self.cells[(path[-1], t)] = unit_id
+        self.reserved_cells.update(path)
+        self.unit_paths[unit_id] = (path, stay)
+
+    def release(self, unit_id: str):
+        """drops the reservations of unit_id"""
+        path, stay = self.unit_paths.pop(unit_id)
+        self.cells = {key: owner for key, owner in self.cells.items() if owner != unit_id}
+        for t in range(1, len(path)):
+            self.moves.discard((path[t - 1], path[t], t - 1))
+        self.reserved_cells = {cell for cell, _ in self.cells}
+
+    def is_free(self, cell: Point, t: int, unit_id: str) -> bool:
+        owner = self.cells.get((cell, t))
+        return owner is None or owner == unit_id
+
+    def can_move(self, unit_id: str, current: Point, target: Point, t: int) -> bool:
+        """target is free at t + 1 and nobody comes the other way"""
+        return self.is_free(target, t + 1, unit_id) and (target, current, t) not in self.moves
+
+    def can_stay(self, unit_id: str, cell: Point, t: int) -> bool:
+        """nobody needs cell after t"""
+        if cell not in self.reserved_cells:
+            return True
+        return all(self.is_free(cell, tick, unit_id) for tick in range(t + 1, self.horizon + 1))
+
+
+class SpaceTimeLeastCostSearch:
+    """
+    LeastCostSearch over (cell, tick) against a ReservationTable. Path costs are the same as there, waiting is
+    only considered next to reserved cells, where it can let another unit pass. Where no reservations are, a cell
+    reached again later and not cheaper is not expanded again.
+    """
+
+    def __init__(self, grid: np.ndarray, start: Point, unit_id: str, reservations: ReservationTable,
+                 exclude_points=None, search_budget: int = 100):
+        self.grid = grid
+        self.start = start
+        self.unit_id = unit_id
+        self.reservations = reservations
+        self.exclude_points = exclude_points if exclude_points is not None else set()
+        self.search_budget = search_budget
+
+    def run(self, horizon: int) -> Tuple[List[Point], float]:
+        """
+        :return: cell at every tick from now to the chosen spot, and the cost of that
+        """
+        w, h = self.grid.shape
+        table = get_neighbour_table(w, h)
+        values = self.grid.ravel().tolist()
+        reservations = self.reservations
+        unit_id = self.unit_id
+        inf = math.inf
+
+        start = (self.start, 0)
+        cost: Dict[SpaceTime, float] = {start: values[self.start[0] * h + self.start[1]]}
+        came_from: Dict[SpaceTime, Optional[SpaceTime]] = {start: None}
+        settled: Dict[Point, Tuple[int, float]] = dict()  # first expansion of a cell: (tick, cost)
+        frontier = [(0, 0, self.start)]
+        searches = 0
+
+        while frontier and searches < self.search_budget:
+            current_cost, t, current = heappop(frontier)
+            node = (current, t)
+            if current_cost > cost[node]:
+                continue  # stale entry
+            if current not in reservations.reserved_cells:
+                previous = settled.get(current)
+                if previous is not None and previous[0] <= t and previous[1] <= cost[node]:
+                    continue
+            settled.setdefault(current, (t, cost[node]))
+            searches += 1
+
+            new_cost = cost[node] + values[current[0] * h + current[1]]
+            targets = [p for p in table.points[current[0]][current[1]] if values[p[0] * h + p[1]] != inf]
+            if any(p in reservations.reserved_cells for p in targets) or current in reservations.reserved_cells:
+                targets.append(current)  # wait for the way to clear
+            for neighbour in targets:
+                if not reservations.can_move(unit_id, current, neighbour, t):
+                    continue
+                next_node = (neighbour, t + 1)
+                if next_node in cost and new_cost >= cost[next_node]:
+                    continue
+                cost[next_node] = new_cost
+                came_from[next_node] = node
+                if t + 1 >= horizon:
+                    continue
+                heappush(frontier, (new_cost, t + 1, neighbour))
+
+        profiler.count("space_time_search_runs")
+        profiler.count("space_time_search_expanded", searches)
+
+        min_cost = inf
+        min_cost_node = None
+        for node, node_cost in cost.items():
+            p, t = node
+            parent = came_from[node]
+            if parent is not None and parent[0] == p:
+                continue  # waited here, staying from the tick before is the same
+            if not reservations.can_stay(unit_id, p, t):
+                continue
+            p_stay_cost = values[p[0] * h + p[1]]
+            if p in self.exclude_points:
+                p_stay_cost += exclude_point_stay_cost
+            p_cost = node_cost + p_stay_cost + max(0, p_stay_cost * (horizon - t - 1))
+            min_cost_t = -1 if min_cost_node is None else min_cost_node[1]
+            if p_cost < min_cost or (p_cost == min_cost and t > min_cost_t):
+                min_cost = p_cost
+                min_cost_node = node
+
+        path = []
+        node = min_cost_node
+        while node is not None:
+            path.append(node[0])
+            node = came_from[node]
+        path.reverse()
+        return path, min_cost
+
+
+class CooperativeLeastCostSearch:
+    """
+    Plans units one after another against a shared ReservationTable, each unit reserves its path for the next ones
+    """
+
+    def __init__(self, horizon: int, search_budget: int):
+        self.horizon = horizon
+        self.search_budget = search_budget
+        self.reservations = ReservationTable(horizon)
+
+    def plan(self, unit_id: str, grid: np.ndarray, start: Point, exclude_points=None) -> Tuple[List[Point], float]:
+        path, cost = SpaceTimeLeastCostSearch(grid, start, unit_id, self.reservations, exclude_points,
+                                              self.search_budget).run(self.horizon)
+        if not path:  # nowhere to stay safely, keep the spot
+            path = [start]
+        self.reservations.reserve(unit_id, path)
+        return path, cost
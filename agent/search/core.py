@@ -0,0 +1,161 @@
+import math
+from functools import lru_cache
+from heapq import heappush, heappop
+from typing import List, Tuple, Set
+
+import numpy as np
+
+from utils.game_utils import Point, get_neighbour_table
+
+
+class SearchBuffers:
+    """
+    Per board size cost, parent and path length arrays over flat cell indices, shared by all searches.
+    A cell holds a value of the current search only if its stamp equals generation, so starting a search
+    is one increment instead of clearing the arrays.
+    """
+
+    def __init__(self, w: int, h: int):
+        n = w * h
+        self.cost = [math.inf] * n
+        self.parent = [-1] * n
+        self.length = [0] * n
+        self.stamp = [0] * n
+        self.generation = 0
+
+    def next_generation(self) -> int:
+        self.generation += 1
+        return self.generation
+
+
+@lru_cache(maxsize=None)
+def get_search_buffers(w: int, h: int) -> SearchBuffers:
+    return SearchBuffers(w, h)
+
+
+def trace_path(buffers: SearchBuffers, cells: List[Point], end: int) -> List[Point]:
+    """:return: path from the search start to end, empty if end wasn't reached"""
+    path = []
+    stamp = buffers.stamp
+    parent = buffers.parent
+    node = end
+    while node != -1 and stamp[node] == buffers.generation:
+        path.append(cells[node])
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def astar(grid: np.ndarray, start: Point, end: Point) -> Tuple[List[Point], float, int]:
+    """
+    AStar.run over flat indices. The frontier holds the same (priority, Point) entries as before,
+    so ties are broken the same way.
+    :return: path, its cost and number of expanded nodes
+    """
+    w, h = grid.shape
+    table = get_neighbour_table(w, h)
+    neighbours = table.flat
+    cells = table.cells
+    buffers = get_search_buffers(w, h)
+    gen = buffers.next_generation()
+    cost = buffers.cost
+    parent = buffers.parent
+    stamp = buffers.stamp
+    values = grid.ravel().tolist()
+    inf = math.inf
+
+    start_i = start[0] * h + start[1]
+    end_i = end[0] * h + end[1]
+    end_x, end_y = end
+    stamp[start_i] = gen
+    cost[start_i] = values[start_i]
+    parent[start_i] = -1
+    frontier = [(0, start)]
+    expanded = 0
+
+    while frontier:
+        current = heappop(frontier)[1]
+        expanded += 1
+        if current == end:
+            break
+        current_i = current[0] * h + current[1]
+        current_cost = cost[current_i]
+        for neighbour in neighbours[current_i]:
+            value = values[neighbour]
+            if value == inf and neighbour != end_i:
+                continue
+            new_cost = current_cost + value
+            if stamp[neighbour] != gen or new_cost < cost[neighbour]:
+                stamp[neighbour] = gen
+                cost[neighbour] = new_cost
+                parent[neighbour] = current_i
+                point = cells[neighbour]
+                heappush(frontier, (new_cost + abs(point[0] - end_x) + abs(point[1] - end_y), point))
+
+    path = trace_path(buffers, cells, end_i)
+    return path, cost[end_i] if stamp[end_i] == gen else inf, expanded
+
+
+def least_cost(grid: np.ndarray, start: Point, horizon: int, search_budget: int, exclude_points: Set[Point],
+               exclude_point_stay_cost: float) -> Tuple[List[Point], float, int]:
+    """
+    LeastCostSearch.run over flat indices, see there
+    :return: path, its cost and number of expanded nodes
+    """
+    w, h = grid.shape
+    table = get_neighbour_table(w, h)
+    neighbours = table.flat
+    cells = table.cells
+    buffers = get_search_buffers(w, h)
+    gen = buffers.next_generation()
+    cost = buffers.cost
+    parent = buffers.parent
+    length = buffers.length
+    stamp = buffers.stamp
+    values = grid.ravel().tolist()
+    inf = math.inf
+
+    start_i = start[0] * h + start[1]
+    stamp[start_i] = gen
+    cost[start_i] = values[start_i]
+    parent[start_i] = -1
+    length[start_i] = 0
+    reached = [start_i]  # in order of first discovery, ties of the final choice go to the earliest
+    frontier = [(0, start)]
+    searches = 0
+
+    while frontier and searches < search_budget:
+        current = heappop(frontier)[1]
+        searches += 1
+        current_i = current[0] * h + current[1]
+        new_cost = cost[current_i] + values[current_i]
+        path_length = length[current_i] + 1
+        for neighbour in neighbours[current_i]:
+            if values[neighbour] == inf:
+                continue
+            if stamp[neighbour] != gen:
+                stamp[neighbour] = gen
+                reached.append(neighbour)
+            elif new_cost >= cost[neighbour]:
+                continue
+            cost[neighbour] = new_cost
+            parent[neighbour] = current_i
+            length[neighbour] = path_length
+            if path_length >= horizon:
+                continue
+            heappush(frontier, (new_cost, cells[neighbour]))
+
+    min_cost = inf
+    min_cost_i = -1
+    for i in reached:
+        p_stay_cost = values[i]
+        if exclude_points and cells[i] in exclude_points:
+            p_stay_cost += exclude_point_stay_cost
+        p_length = length[i]
+        p_cost = cost[i] + p_stay_cost + max(0, p_stay_cost * (horizon - p_length - 1))
+        if p_cost < min_cost or (p_cost == min_cost and p_length > (-1 if min_cost_i == -1 else length[min_cost_i])):
+            min_cost = p_cost
+            min_cost_i = i
+
+    path = trace_path(buffers, cells, min_cost_i) if min_cost_i != -1 else []
+    return path, min_cost, searches
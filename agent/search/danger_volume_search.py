@@ -0,0 +1,122 @@
+import math
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from parsing.settings import explosion_danger, danger_volume_search_budget
+from search.least_cost_search import exclude_point_stay_cost
+from utils.game_utils import Point, get_neighbour_table
+from utils.profiler import profiler
+
+Node = Tuple[int, int]  # flat cell index, tick
+
+
+class DangerVolumeSearch:
+    """
+    Least cost path over (cell, tick) against a cost volume of shape (horizon, w, h), see DangerVolume.costs.
+    A path pays the cost of the cell it is in at every tick, staying at its end until the horizon included,
+    so a cell only costs its danger at the ticks it is dangerous.
+    Pruning: lethal states are never entered, waiting is only tried while the cell or a neighbour still changes
+    cost later, and a state is not expanded when waiting in its cell since an already expanded earlier tick got
+    there for no more.
+    """
+
+    def __init__(self, volume: np.ndarray, start: Point, exclude_points=None,
+                 search_budget: int = danger_volume_search_budget):
+        self.volume = volume
+        self.start = start
+        self.exclude_points = exclude_points if exclude_points is not None else set()
+        self.search_budget = search_budget
+
+    def run(self) -> Tuple[List[Point], float]:
+        """
+        :return: cell at every tick from now to the chosen spot, and the cost of that until the horizon
+        """
+        horizon, w, h = self.volume.shape
+        table = get_neighbour_table(w, h)
+        cells = table.cells
+        flat = self.volume.reshape(horizon, w * h)
+        values = flat.tolist()
+        prefix = np.cumsum(flat, axis=0).tolist()  # cost of staying in a cell from tick 0
+        lethal_prefix = np.cumsum(flat >= explosion_danger, axis=0).tolist()
+        neighbours = table.flat
+        changes_until = last_change(self.volume).ravel().tolist()
+        inf = math.inf
+
+        start = (self.start[0] * h + self.start[1], 0)
+        cost: Dict[Node, float] = {start: values[0][start[0]]}
+        came_from: Dict[Node, Optional[Node]] = {start: None}
+        settled: Dict[int, Tuple[float, int]] = dict()  # cell -> cost less stay prefix, lethal ticks before
+        frontier = [(cost[start], 0, start[0])]
+        searches = 0
+
+        while frontier and searches < self.search_budget:
+            current_cost, t, current = heappop(frontier)
+            if current_cost > cost[(current, t)]:
+                continue  # stale entry
+            key = (current_cost - prefix[t][current], lethal_prefix[t][current])
+            previous = settled.get(current)
+            waited = t and came_from[(current, t)][0] == current
+            if not waited and previous is not None and previous[1] == key[1] and previous[0] <= key[0] + 1e-9:
+                continue  # waiting since then is as cheap
+            settled[current] = key
+            searches += 1
+            if t + 1 >= horizon:
+                continue
+
+            next_values = values[t + 1]
+            targets = neighbours[current]
+            if t < changes_until[current]:
+                targets = (*targets, current)
+            for neighbour in targets:
+                value = next_values[neighbour]
+                if value == inf or value >= explosion_danger:
+                    continue
+                new_cost = current_cost + value
+                next_node = (neighbour, t + 1)
+                if next_node in cost and new_cost >= cost[next_node]:
+                    continue
+                cost[next_node] = new_cost
+                came_from[next_node] = (current, t)
+                heappush(frontier, (new_cost, t + 1, neighbour))
+
+        profiler.count("danger_volume_search_runs")
+        profiler.count("danger_volume_search_expanded", searches)
+
+        min_cost = inf
+        min_cost_node = None
+        last = horizon - 1
+        for node, node_cost in cost.items():
+            i, t = node
+            p_cost = node_cost + prefix[last][i] - prefix[t][i]
+            if cells[i] in self.exclude_points:
+                p_cost += exclude_point_stay_cost
+            if p_cost < min_cost:
+                min_cost = p_cost
+                min_cost_node = node
+
+        if min_cost_node is None:
+            return [self.start], min_cost
+        path = []
+        node = min_cost_node
+        while node is not None:
+            path.append(cells[node[0]])
+            node = came_from[node]
+        path.reverse()
+        return path, min_cost
+
+
+def last_change(volume: np.ndarray) -> np.ndarray:
+    """
+    :return: per cell, the last tick at which its cost or the cost of a neighbour differs from the tick before
+    """
+    changed = np.zeros(volume.shape, dtype=bool)
+    changed[1:] = volume[1:] != volume[:-1]
+    around = np.copy(changed)
+    around[:, 1:] |= changed[:, :-1]
+    around[:, :-1] |= changed[:, 1:]
+    around[:, :, 1:] |= changed[:, :, :-1]
+    around[:, :, :-1] |= changed[:, :, 1:]
+    horizon = volume.shape[0]
+    return np.where(around.any(axis=0), horizon - 1 - around[::-1].argmax(axis=0), 0)
@@ -0,0 +1,94 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.game_utils import Point, PriorityQueue, get_neighbour_table, NeighbourTable
+from utils.profiler import profiler
+
+
+class DistanceField:
+    """
+    Dijkstra from source over the whole grid. Cost of a path is the sum of grid values of all its cells, both ends
+    included, like AStar.run gives. That is symmetric, so a field from a target answers cost and path to the target
+    from every cell.
+    """
+
+    def __init__(self, grid: np.ndarray, source: Point, targets: List[Point] = None):
+        """
+        :param targets: stop once these are reached, only their costs and paths are final then
+        """
+        self.grid = grid
+        self.source = source
+        self.cost = np.full(grid.shape, math.inf)
+        self.came_from: Dict[Point, Optional[Point]] = dict()
+        self.run(targets)
+
+    def run(self, targets: List[Point] = None):
+        grid = self.grid
+        cost = self.cost
+        settled = np.zeros(grid.shape, dtype=bool)
+        targets = set(targets) if targets is not None else set()
+        remaining = len(targets) if targets else -1  # -1 never reaches 0, run over the whole grid
+        frontier = PriorityQueue()
+        frontier.put(self.source, 0)
+        self.came_from[self.source] = None
+        cost[self.source] = grid[self.source]
+        expanded = 0
+        neighbours = get_neighbour_table(*grid.shape).points
+        passable = NeighbourTable.passable(grid)
+
+        while not frontier.empty() and remaining != 0:
+            current: Point = frontier.get()
+            if settled[current]:
+                continue
+            settled[current] = True
+            expanded += 1
+            if current in targets:
+                remaining -= 1
+            for neighbor in neighbours[current.x][current.y]:
+                if not passable[neighbor]:
+                    continue
+                new_cost = cost[current] + grid[neighbor]
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    frontier.put(neighbor, new_cost)
+                    self.came_from[neighbor] = current
+
+        profiler.count("distance_field_runs")
+        profiler.count("distance_field_expanded", expanded)
+
+    def cost_at(self, p: Point) -> float:
+        return self.cost[p]
+
+    def path_from(self, p: Point) -> List[Point]:
+        """
+        :return: path from p to source, empty if source can't be reached
+        """
+        path = []
+        node = p
+        while node in self.came_from:
+            path.append(node)
+            node = self.came_from[node]
+        return path
+
+
+class DistanceFields:
+    """
+    Distance fields over one grid, computed on first use and shared for the rest of the tick
+    """
+
+    def __init__(self, grid: np.ndarray, targets: List[Point] = None):
+        """
+        :param targets: the only cells fields will be asked about
+        """
+        self.grid = grid
+        self.targets = targets
+        self.fields: Dict[Point, DistanceField] = dict()
+
+    def get(self, source: Point) -> DistanceField:
+        field = self.fields.get(source)
+        if field is None:
+            field = DistanceField(self.grid, source, self.targets)
+            self.fields[source] = field
+        return field
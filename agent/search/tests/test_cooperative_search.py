@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from search.cooperative_search import CooperativeLeastCostSearch, ReservationTable
+from utils.game_utils import Point
+
+
+def cheap_at(cell, size=3):
+    grid = np.full((size, size), 5.)
+    grid[cell] = 0
+    return grid
+
+
+class TestCooperativeSearch(unittest.TestCase):
+
+    def test_passes_through_cell_left_by_other_unit(self):
+        planner = CooperativeLeastCostSearch(horizon=6, search_budget=50)
+        path_b, _ = planner.plan("b", cheap_at(Point(1, 2)), Point(1, 1))
+        path_a, _ = planner.plan("a", cheap_at(Point(2, 1)), Point(0, 1))
+        self.assertEqual(path_b, [Point(1, 1), Point(1, 2)])
+        self.assertEqual(path_a, [Point(0, 1), Point(1, 1), Point(2, 1)])
+
+    def test_goes_around_unit_that_stays(self):
+        planner = CooperativeLeastCostSearch(horizon=8, search_budget=50)
+        path_b, _ = planner.plan("b", cheap_at(Point(1, 1)), Point(1, 1))
+        path_a, _ = planner.plan("a", cheap_at(Point(2, 1)), Point(0, 1))
+        self.assertEqual(path_b, [Point(1, 1)])
+        self.assertNotIn(Point(1, 1), path_a)
+        self.assertEqual(path_a[0], Point(0, 1))
+        self.assertEqual(path_a[-1], Point(2, 1))
+
+    def test_no_swaps_or_shared_cells(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            planner = CooperativeLeastCostSearch(horizon=8, search_budget=40)
+            starts = [Point(*map(int, p)) for p in rng.permutation(np.argwhere(np.ones((5, 5))))[:3]]
+            paths = [planner.plan(str(i), rng.integers(0, 4, (5, 5)).astype(float), start)[0]
+                     for i, start in enumerate(starts)]
+            padded = [path + [path[-1]] * (9 - len(path)) for path in paths]
+            for t in range(9):
+                self.assertEqual(len({path[t] for path in padded}), 3)
+                for i in range(3):
+                    for j in range(3):
+                        if i != j and t > 0:
+                            self.assertFalse(padded[i][t] == padded[j][t - 1] and padded[j][t] == padded[i][t - 1])
+
+    def test_release(self):
+        reservations = ReservationTable(horizon=4)
+        reservations.reserve("a", [Point(0, 0), Point(0, 1)], stay=False)
+        self.assertFalse(reservations.is_free(Point(0, 1), 1, "b"))
+        self.assertTrue(reservations.is_free(Point(0, 1), 2, "b"))
+        reservations.release("a")
+        self.assertTrue(reservations.is_free(Point(0, 1), 1, "b"))
+        self.assertTrue(reservations.can_move("b", Point(0, 1), Point(0, 0), 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import math
+import unittest
+
+import numpy as np
+
+from parsing.settings import explosion_danger
+from search.danger_volume_search import DangerVolumeSearch
+from utils.game_utils import Point
+from utils.profiler import profiler
+
+
+def corridor(horizon, length=5):
+    """1 wide corridor from x = 0 to the cheap cell at its end"""
+    volume = np.ones((horizon, length, 1))
+    volume[:, length - 1, 0] = 0
+    return volume
+
+
+class TestDangerVolumeSearch(unittest.TestCase):
+
+    def test_waits_for_explosion_to_expire(self):
+        volume = corridor(horizon=12)
+        volume[1:6, 2, 0] = explosion_danger
+        path, cost = DangerVolumeSearch(volume, Point(0, 0)).run()
+        self.assertEqual(path[-1], Point(4, 0))
+        self.assertEqual(path.index(Point(2, 0)), 6)
+        self.assertLess(cost, explosion_danger)
+
+    def test_passes_before_bomb_explodes(self):
+        volume = corridor(horizon=12)
+        volume[4:9, 2, 0] = explosion_danger
+        path, _ = DangerVolumeSearch(volume, Point(0, 0)).run()
+        self.assertEqual(path, [Point(x, 0) for x in range(5)])
+
+    def test_pruning_keeps_least_cost(self):
+        rng = np.random.default_rng(1)
+        for _ in range(5):
+            volume = np.repeat(rng.choice([0., 1., 3., math.inf], size=(1, 6, 6), p=[.3, .4, .1, .2]), 15, axis=0)
+            for x, y, start in rng.integers(0, [6, 6, 10], size=(6, 3)):
+                volume[start:start + 5, x, y] = explosion_danger
+            volume[:, 0, 0] = 1
+            expanded = profiler.counters["danger_volume_search_expanded"]
+            path, cost = DangerVolumeSearch(volume, Point(0, 0), search_budget=10000).run()
+            self.assertAlmostEqual(cost, least_cost(volume))
+            self.assertAlmostEqual(cost, sum(volume[t][p] for t, p in enumerate(path)) +
+                                   volume[len(path):, path[-1].x, path[-1].y].sum())
+            self.assertLess(profiler.counters["danger_volume_search_expanded"] - expanded, volume.size)
+
+
+def least_cost(volume):
+    """every (cell, tick) without pruning, from (0, 0)"""
+    horizon, w, h = volume.shape
+    safe = np.where(volume >= explosion_danger, math.inf, volume)
+    best = np.full((w, h), math.inf)
+    best[0, 0] = safe[0, 0, 0]
+    result = math.inf
+    for t in range(horizon):
+        result = min(result, np.min(best + safe[t + 1:].sum(axis=0)))
+        if t + 1 == horizon:
+            break
+        reached = np.copy(best)
+        reached[1:] = np.minimum(reached[1:], best[:-1])
+        reached[:-1] = np.minimum(reached[:-1], best[1:])
+        reached[:, 1:] = np.minimum(reached[:, 1:], best[:, :-1])
+        reached[:, :-1] = np.minimum(reached[:, :-1], best[:, 1:])
+        best = reached + safe[t + 1]
+    return result
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,8 +5,105 @@ from unittest import IsolatedAsyncioTestCase
 import numpy as np
 
 from search.astar import AStar
-from utils.game_utils import Point
-from search.least_cost_search import LeastCostSearch
+from search.distance_field import DistanceField
+from utils.game_utils import Point, PriorityQueue, get_neighbour_table, get_neighbours, manhattan_distance
+from search.least_cost_search import LeastCostSearch, exclude_point_stay_cost
+
+inf = math.inf
+
+
+def reference_astar(grid, start, end):
+    """AStar.run with Dict[Point, ...] bookkeeping, before search.core"""
+    frontier = PriorityQueue()
+    frontier.put(start, 0)
+    came_from = {start: None}
+    cost_so_far = {start: grid[start]}
+    while not frontier.empty():
+        current = frontier.get()
+        if current == end:
+            break
+        for neighbor in get_neighbours(grid, current, include=end):
+            new_cost = cost_so_far[current] + grid[neighbor]
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                frontier.put(neighbor, new_cost + manhattan_distance(neighbor, end))
+                came_from[neighbor] = current
+    path = []
+    node = end
+    while node in came_from:
+        path.append(node)
+        node = came_from[node]
+    path.reverse()
+    return path, cost_so_far[end] if end in cost_so_far else inf
+
+
+def reference_least_cost(grid, start, horizon, search_budget, exclude_points=()):
+    """LeastCostSearch.run with Dict[Point, ...] bookkeeping, before search.core"""
+    frontier = PriorityQueue()
+    frontier.put(start, 0)
+    came_from = {start: None}
+    cost_so_far = {start: grid[start]}
+    path_len = {start: 0}
+    searches = 0
+    while not frontier.empty() and searches < search_budget:
+        current = frontier.get()
+        searches += 1
+        for neighbor in get_neighbours(grid, current):
+            new_cost = cost_so_far[current] + grid[current]
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                came_from[neighbor] = current
+                path_length = path_len[current] + 1
+                path_len[neighbor] = path_length
+                if path_length >= horizon:
+                    continue
+                frontier.put(neighbor, new_cost)
+    min_cost = inf
+    min_cost_point = None
+    for p, length in path_len.items():
+        p_stay_cost = grid[p]
+        if p in exclude_points:
+            p_stay_cost += exclude_point_stay_cost
+        p_cost = cost_so_far[p] + p_stay_cost + max(0, p_stay_cost * (horizon - length - 1))
+        min_cost_path_len = -1 if min_cost_point is None else path_len[min_cost_point]
+        if p_cost < min_cost or (p_cost == min_cost and path_len[p] > min_cost_path_len):
+            min_cost = p_cost
+            min_cost_point = p
+    path = []
+    node = min_cost_point
+    while node in came_from:
+        path.append(node)
+        node = came_from[node]
+    path.reverse()
+    return path, min_cost
+
+
+def fixed_grids():
+    """the grids of the tests below"""
+    ones = np.ones((4, 4))
+    danger = np.array([[1, 1, 1, 1], [1, 1, 1, 1], [1, 1, 10, 10], [1, 1, 10, 0]])
+    walls = np.array([[0, inf, inf, inf], [0, 0, 0, inf], [inf, inf, 0, inf], [inf, inf, inf, inf]])
+    ones[3, 3] = 0
+    return [ones, np.zeros((4, 4)), walls, danger, danger * 10 + 10]
+
+
+def random_grid(rng, w, h):
+    """costs in the range of state maps: mostly 0 and 1, some danger, some walls"""
+    grid = rng.choice([0., 0., 0.1, 1., 3., 15.], size=(w, h))
+    grid[rng.random((w, h)) < 0.25] = inf
+    return grid
+
+
+def cases(rng):
+    """:return: (grid, start, end) with start and end on free cells"""
+    grids = fixed_grids()
+    for size in (15, 15, 15, 31, 63):
+        grids.append(random_grid(rng, size, size))
+    for grid in grids:
+        free = np.argwhere(grid != inf)
+        for _ in range(10):
+            start, end = (Point(*map(int, free[i])) for i in rng.integers(len(free), size=2))
+            yield grid, start, end
 
 
 class TestShortestPath(IsolatedAsyncioTestCase):
@@ -18,32 +115,43 @@ class TestShortestPath(IsolatedAsyncioTestCase):
             [0, 1, -1, 1],
             [0, math.inf, 1, 0],
         ])
-        search = LeastCostSearch(grid, Point(0, 0))
-
-        self.assertEqual(set(search.get_neighbors(Point(0, 0))),
+        self.assertEqual(set(get_neighbours(grid, Point(0, 0))),
                          {
                              Point(1, 0),
                              Point(0, 1)
                          })
 
-        self.assertEqual(set(search.get_neighbors(Point(1, 1))),
+        self.assertEqual(set(get_neighbours(grid, Point(1, 1))),
                          {
                              Point(1, 0),
                              Point(0, 1),
                              Point(1, 2),
                              Point(2, 1),
                          })
-        self.assertEqual(set(search.get_neighbors(Point(3, 0))),
+        self.assertEqual(set(get_neighbours(grid, Point(3, 0))),
                          {
                              Point(2, 0),
                          })
-        self.assertEqual(set(search.get_neighbors(Point(2, 3))),
+        self.assertEqual(set(get_neighbours(grid, Point(2, 3))),
                          {
                              Point(3, 3),
                              Point(2, 2),
                              Point(1, 3),
                          })
 
+    def test_neighbour_table_order(self):
+        table = get_neighbour_table(3, 4)
+        self.assertEqual(table.points[1][1], (Point(1, 2), Point(1, 0), Point(0, 1), Point(2, 1)))
+        self.assertEqual(table.points[1][2], (Point(2, 2), Point(0, 2), Point(1, 1), Point(1, 3)))
+        self.assertEqual(table.points[0][0], (Point(0, 1), Point(1, 0)))
+        self.assertEqual(table.flat[1 * 4 + 2], (2 * 4 + 2, 0 * 4 + 2, 1 * 4 + 1, 1 * 4 + 3))
+
+        grid = np.ones((3, 4))
+        grid[0, 1] = math.inf
+        self.assertEqual(get_neighbours(grid, Point(1, 1)), [Point(1, 2), Point(1, 0), Point(2, 1)])
+        self.assertEqual(get_neighbours(grid, Point(1, 1), include=Point(0, 1), include_center=True),
+                         [Point(1, 2), Point(1, 0), Point(0, 1), Point(2, 1), Point(1, 1)])
+
     def test_shortest_path_finds_safe_spot(self):
         grid = np.array([
             [1, 1, 1, 1],
@@ -142,6 +250,36 @@ class TestShortestPath(IsolatedAsyncioTestCase):
         )
         path, cost = AStar(grid, Point(3, 10), Point(7, 7)).run()
 
+    def test_distance_field_matches_astar(self):
+        rng = np.random.default_rng(0)
+        grid = rng.integers(1, 5, size=(9, 9)).astype(float)
+        grid[rng.random((9, 9)) < 0.2] = math.inf
+        source = Point(4, 4)
+        grid[source] = 1
+        field = DistanceField(grid, source)
+        for x, y in np.ndindex(grid.shape):
+            if grid[x, y] == math.inf:
+                continue
+            path, cost = AStar(grid, Point(x, y), source).run()
+            self.assertEqual(field.cost_at(Point(x, y)), cost)
+            field_path = field.path_from(Point(x, y))
+            if cost != math.inf:
+                self.assertEqual(field_path[0], Point(x, y))
+                self.assertEqual(field_path[-1], source)
+                self.assertEqual(sum(grid[p] for p in field_path), cost)
+
+        near = DistanceField(grid, source, targets=[Point(4, 5)])
+        self.assertEqual(near.cost_at(Point(4, 5)), field.cost_at(Point(4, 5)))
+        self.assertEqual(near.cost_at(Point(0, 0)), math.inf)
+
+    def test_matches_dict_based_search(self):
+        rng = np.random.default_rng(1)
+        for grid, start, end in cases(rng):
+            self.assertEqual(AStar(grid, start, end).run(), reference_astar(grid, start, end))
+            horizon = max(grid.shape)
+            self.assertEqual(LeastCostSearch(grid, start, {end}, grid.size // 3).run(horizon),
+                             reference_least_cost(grid, start, horizon, grid.size // 3, {end}))
+
 
 if __name__ == '__main__':
     unittest.main()
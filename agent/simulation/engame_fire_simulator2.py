@@ -1,44 +1,165 @@
+import math
+from functools import lru_cache
+
 from parsing.parser import *
-from parsing.settings import endgame_fire_base_multiplier, endgame_fire_else
+from parsing.settings import endgame_fire_base_multiplier, endgame_fire_else, endgame_fire_spawn_interval_ticks
 
 fires_per_step = 2
 
 
+@lru_cache(maxsize=None)
+def get_endgame_fire_spiral(w: int, h: int) -> np.ndarray:
+    """
+    Spiral rank of every cell of a w x h board, shape (w, h), read-only. Ranks grow towards the center.
+    A board that isn't square gets the centered part of the square spiral around it, ranked again from 0.
+    """
+    if w != h:
+        spiral = rerank(centered_window(get_endgame_fire_spiral, w, h))
+    else:
+        spiral = square_spiral(w)[0]
+    spiral.setflags(write=False)
+    return spiral
+
+
+@lru_cache(maxsize=None)
+def get_endgame_fire_order(w: int, h: int) -> np.ndarray:
+    """
+    Index of the endgame fire spawn that lands on every cell, shape (w, h), read-only.
+    Of the two cells of a spiral rank, the mirrored one burns first.
+    """
+    if w != h:
+        order = rerank(centered_window(get_endgame_fire_order, w, h))
+    else:
+        spiral, mirrored = square_spiral(w)
+        order = spiral * fires_per_step + ~mirrored
+    order.setflags(write=False)
+    return order
+
+
+def centered_window(square, w: int, h: int) -> np.ndarray:
+    size = max(w, h)
+    left, top = (size - w) // 2, (size - h) // 2
+    return square(size, size)[left:left + w, top:top + h]
+
+
+def rerank(values: np.ndarray) -> np.ndarray:
+    """:return: rank of every value among the distinct ones, from 0"""
+    return np.unique(values, return_inverse=True)[1].reshape(values.shape).astype(float)
+
+
+def square_spiral(size: int):
+    """
+    :return: spiral rank of every cell of a size x size board, and the cells set as mirror of the walked ones
+    """
+    w = h = size
+    spiral = np.zeros((w, h))
+    mirrored = np.zeros((w, h), dtype=bool)
+    total_steps = w * h // 2
+
+    NORTH, S, W, E = (0, -1), (0, 1), (-1, 0), (1, 0)  # directions
+    turn_left = {NORTH: W, E: NORTH, S: E, W: S}  # old -> new direction
+
+    x, y = w // 2, h // 2  # start near the center
+    dx, dy = E  # initial direction
+    steps = total_steps
+    while True:
+        spiral[y, x] = steps  # visit
+        mirrored[y, x] = False
+        spiral[h - y - 1, w - x - 1] = steps  # visit
+        mirrored[h - y - 1, w - x - 1] = True
+        # try to turn left
+        new_dx, new_dy = turn_left[dx, dy]
+        new_x, new_y = x + new_dx, y + new_dy
+        if (0 <= new_x < w and 0 <= new_y < h and
+                spiral[new_y, new_x] == 0.):  # can turn right
+            x, y = new_x, new_y
+            dx, dy = new_dx, new_dy
+        else:  # try to move straight
+            x, y = x + dx, y + dy
+            if not (0 <= x < w and 0 <= y < h):
+                break
+        steps -= 1
+    return spiral, mirrored
+
+
+@lru_cache(maxsize=None)
+def get_endgame_fire_danger(w: int, h: int, burning_ranks: int, started: bool) -> np.ndarray:
+    """
+    Endgame fire danger plane once the first burning_ranks spiral ranks burn, read-only.
+    A game has about w * h / 2 distinct ones
+    :param started: there is endgame fire on the board
+    """
+    fire_danger_steps = get_endgame_fire_spiral(w, h) - burning_ranks
+    multiplier = endgame_fire_else if started else endgame_fire_base_multiplier
+    fire_danger_steps.clip(0, out=fire_danger_steps)  # replace negatives with zero
+    fire_danger_steps[fire_danger_steps == 0] = 0.35
+    fire_danger_steps[fire_danger_steps == 1] = 0.45  # Counter({'b': 74, 'a': 45, '': 1})
+    fire_danger_steps[fire_danger_steps == 2] = 0.55
+    fire_danger = 1. / fire_danger_steps
+    np.square(fire_danger, out=fire_danger)
+    fire_danger *= multiplier
+    fire_danger.setflags(write=False)
+    return fire_danger
+
+
 class EndgameFireSimulator2:
 
     def __init__(self, w: int, h: int):
-        self.endgame_fire_spiral = np.zeros((w, h))
-        total_steps = w * h // 2
-
-        NORTH, S, W, E = (0, -1), (0, 1), (-1, 0), (1, 0)  # directions
-        turn_left = {NORTH: W, E: NORTH, S: E, W: S}  # old -> new direction
-
-        x, y = w // 2, h // 2  # start near the center
-        dx, dy = E  # initial direction
-        steps = total_steps
-        while True:
-            self.endgame_fire_spiral[y, x] = steps  # visit
-            self.endgame_fire_spiral[h - y - 1, w - x - 1] = steps  # visit
-            # try to turn left
-            new_dx, new_dy = turn_left[dx, dy]
-            new_x, new_y = x + new_dx, y + new_dy
-            if (0 <= new_x < w and 0 <= new_y < h and
-                    self.endgame_fire_spiral[new_y, new_x] == 0.):  # can turn right
-                x, y = new_x, new_y
-                dx, dy = new_dx, new_dy
-            else:  # try to move straight
-                x, y = x + dx, y + dy
-                if not (0 <= x < w and 0 <= y < h):
-                    break
-            steps -= 1
+        self.w = w
+        self.h = h
+        self.endgame_fire_spiral = get_endgame_fire_spiral(w, h)
 
     def get_endgame_fire_danger(self, n_fires):
-        fire_danger_steps = self.endgame_fire_spiral - (n_fires // 2)
-        multiplier = endgame_fire_base_multiplier if n_fires == 0 else endgame_fire_else
-        fire_danger_steps.clip(0, out=fire_danger_steps)  # replace negatives with zero
-        fire_danger_steps[fire_danger_steps == 0] = 0.35
-        fire_danger_steps[fire_danger_steps == 1] = 0.45  # Counter({'b': 74, 'a': 45, '': 1})
-        fire_danger_steps[fire_danger_steps == 2] = 0.55
-        fire_danger = 1. / fire_danger_steps
-        np.square(fire_danger, out=fire_danger)
-        return fire_danger * multiplier
+        """:return: read-only danger plane, shared by all calls with the same n_fires // 2"""
+        return get_endgame_fire_danger(self.w, self.h, n_fires // fires_per_step, n_fires != 0)
+
+
+class EndgameFireTimeline:
+    """
+    Absolute tick at which endgame fire lands on every cell. From start_tick on, every spawn_interval ticks one fire
+    spawns on the next cell of get_endgame_fire_order. Until fire shows up the start is predicted from the game
+    duration, then the timeline is anchored on the observed fires and only moved when they stop matching.
+    """
+
+    def __init__(self, w: int, h: int, config: dict = None):
+        """
+        :param config: the config block of the game state, with fire_spawn_interval_ticks and game_duration_ticks
+        """
+        config = config or dict()
+        self.spiral = get_endgame_fire_spiral(w, h)
+        self.order = get_endgame_fire_order(w, h)
+        self.spawn_interval = config.get("fire_spawn_interval_ticks", endgame_fire_spawn_interval_ticks)
+        self.start_tick = config.get("game_duration_ticks", math.inf)  # tick of the first spawn
+        self.anchored = False
+        self.ignition_ticks = self.timeline()
+
+    def timeline(self) -> np.ndarray:
+        ignition_ticks = self.start_tick + self.order * self.spawn_interval
+        ignition_ticks.setflags(write=False)
+        return ignition_ticks
+
+    def spawns_until(self, tick: int) -> int:
+        """:return: number of fires the timeline has spawned up to tick"""
+        if tick < self.start_tick:
+            return 0
+        return (tick - self.start_tick) // self.spawn_interval + 1
+
+    def update(self, tick: int, n_fires: int):
+        spawns = n_fires
+        if not spawns:
+            if not self.anchored and tick >= self.start_tick:
+                self.start_tick = tick + 1  # late
+                self.ignition_ticks = self.timeline()
+            return
+        if self.anchored and self.spawns_until(tick) == spawns:
+            return
+        self.start_tick = tick - (spawns - 1) * self.spawn_interval  # the last spawn was this tick
+        self.anchored = True
+        self.ignition_ticks = self.timeline()
+
+    def ticks_until_fire(self, tick: int) -> np.ndarray:
+        """:return: ticks from tick until fire lands on every cell, 0 where it burns"""
+        return np.maximum(self.ignition_ticks - tick, 0)
+
+    def ticks_until_fire_at(self, pos, tick: int) -> float:
+        return max(self.ignition_ticks[pos] - tick, 0)
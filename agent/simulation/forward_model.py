@@ -1,9 +1,12 @@
 from collections import defaultdict
-from copy import deepcopy
+
+import numpy as np
 
 from actions import Action, MoveAction, BombAction, DetonateBombAction
+from utils.blast import get_blast_kernel
 from utils.game_utils import Point
-from parsing.gamestate import BombState, Explosion, ParsedGameState, Powerup, UnitState, Wall
+from parsing.gamestate import ParsedGameState, BOMB, EXPLOSION, WALL, BLAST_POWERUP, INDESTRUCTIBLE, \
+    FREEZE_POWERUP, HP, BLAST_R, INVULNERABLE, STUNNED
 
 bomb_expiry_ticks = 30
 blast_expiry_ticks = 5
@@ -12,9 +15,10 @@ invulnerability_ticks = 5
 
 class ForwardModel:
     def __init__(self) -> None:
-        self.move_actions = set()
-        self.detonate_actions = set()
-        self.bomb_actions = set()
+        # lists, not sets: actions are processed in the order they were enqueued, so steps are reproducible
+        self.move_actions = list()
+        self.detonate_actions = list()
+        self.bomb_actions = list()
 
     def clear(self):
         self.move_actions.clear()
@@ -23,14 +27,14 @@ class ForwardModel:
 
     def enque_action(self, action: Action):
         if isinstance(action, BombAction):
-            self.bomb_actions.add(action)
+            self.bomb_actions.append(action)
         elif isinstance(action, DetonateBombAction):
-            self.detonate_actions.add(action)
+            self.detonate_actions.append(action)
         else:
-            self.move_actions.add(action)
+            self.move_actions.append(action)
 
     def step(self, game_state: ParsedGameState) -> ParsedGameState:
-        new_gs = deepcopy(game_state)
+        new_gs = game_state.successor()
         new_gs.tick += 1
 
         expire_entities(new_gs)
@@ -43,181 +47,116 @@ class ForwardModel:
 
     def process_bomb_actions(self, new_gs: ParsedGameState):
         for action in self.bomb_actions:
-            unit_id = action.unit_id
-            unit: UnitState = new_gs.units_map[unit_id]
-            if unit.stunned >= new_gs.tick:
+            row = new_gs.unit_index[action.unit_id]
+            if new_gs.unit_table[row, STUNNED] >= new_gs.tick:
                 continue
-            if len(new_gs.units_to_bombs[unit_id]) >= 3:
+            if new_gs.bomb_count(row) >= 3:
                 continue
-            bomb = BombState(
-                unit.pos,
-                unit.blast_r,
-                action.unit_id,
-                new_gs.tick,
-                new_gs.tick + bomb_expiry_ticks
+            new_gs.set_cell(
+                new_gs.unit_pos(row),
+                BOMB,
+                expires=new_gs.tick + bomb_expiry_ticks,
+                blast_r=new_gs.unit_table[row, BLAST_R],
+                bomb_owner=row,
+                created=new_gs.tick
             )
-            new_gs.map[unit.pos] = bomb
-            new_gs.units_to_bombs[unit_id].append(bomb)
 
     def process_detonate_actions(self, new_gs: ParsedGameState):
         for action in self.detonate_actions:
-            potential_bomb = new_gs.map[action.bomb.pos]
-            if potential_bomb is not None and isinstance(potential_bomb, BombState):
-                # and game_state.tick - potential_bomb.created >= bomb_arming_ticks:
+            if new_gs.cell_type[action.bomb.pos] == BOMB:
+                # and game_state.tick - created >= bomb_arming_ticks:
                 detonate_bomb(action.bomb.pos, new_gs)
 
     def process_move_actions(self, new_gs: ParsedGameState):
         intended_positions = defaultdict(int)
         for action in self.move_actions:
-            unit_id = action.unit_id
-            unit = new_gs.units_map[unit_id]
-            if unit.stunned >= new_gs.tick:
-                intended_positions[unit.pos] += 1
+            row = new_gs.unit_index[action.unit_id]
+            pos = new_gs.unit_pos(row)
+            if new_gs.unit_table[row, STUNNED] >= new_gs.tick:
+                intended_positions[pos] += 1
                 continue
-            intended_positions[get_target_pos(action, unit)] += 1
+            intended_positions[get_target_pos(action, pos)] += 1
 
         for action in self.move_actions:
-            unit_id = action.unit_id
-            unit = new_gs.units_map[unit_id]
-            new_pos = get_target_pos(action, unit)
+            row = new_gs.unit_index[action.unit_id]
+            new_pos = get_target_pos(action, new_gs.unit_pos(row))
             if intended_positions[new_pos] >= 2:
                 continue
 
-            if unit.stunned >= new_gs.tick:
+            if new_gs.unit_table[row, STUNNED] >= new_gs.tick:
                 continue
-            target_obj = new_gs.map[new_pos]
-            blast_r = unit.blast_r
-            if isinstance(target_obj, Explosion):
-                damage_unit(unit, new_gs)
-            elif target_obj is not None and not isinstance(target_obj, Powerup):  # wall or bomb
+            if not new_gs.in_bounds(new_pos):
                 continue
-            unit = new_gs.units_map[unit_id]
-            new_gs.units.remove(unit)
-            new_unit = UnitState(
-                unit.unit_id,
-                unit.agent_id,
-                new_pos,
-                unit.hp,
-                blast_r,
-                unit.invulnerable,
-                unit.stunned,
-            )
-            new_gs.units.add(new_unit)
-            new_gs.units_map[unit.unit_id] = new_unit
+            target_type = new_gs.cell_type[new_pos]
+            if target_type == EXPLOSION:
+                damage_unit(row, new_gs)
+            elif target_type == WALL or target_type == BOMB:
+                continue
+            new_gs.move_unit(row, new_pos)
 
 
 def expire_entities(new_gs: ParsedGameState):
-    for point in new_gs.expiry_dict[new_gs.tick]:
-        if isinstance(new_gs.map[point], BombState):
-            detonate_bomb(point, new_gs)
-        else:
-            new_gs.map[point] = None
-    new_gs.expiry_dict.pop(new_gs.tick, None)
+    expiring = new_gs.expiring(new_gs.tick)
+    if not expiring.any():
+        return
+    bombs = expiring & (new_gs.cell_type == BOMB)
+    for x, y in zip(*expiring.nonzero()):
+        if not bombs[x, y]:
+            new_gs.clear_cell(Point(int(x), int(y)))
+    for x, y in zip(*bombs.nonzero()):
+        if new_gs.cell_type[x, y] == BOMB:  # may be already chained by other bomb
+            detonate_bomb(Point(int(x), int(y)), new_gs)
 
 
 def pickup_powerups(new_gs: ParsedGameState):
-    units_to_replace = dict()
-    for unit in new_gs.units:
-        if isinstance(new_gs.map[unit.pos], Powerup):
-            blast_r = unit.blast_r
-            if new_gs.map[unit.pos].type == "bp":
-                blast_r += 2
-            # TODO handle fp
-            new_gs.map[unit.pos] = None
-            units_to_replace[unit] = UnitState(
-                unit.unit_id,
-                unit.agent_id,
-                unit.pos,
-                unit.hp,
-                blast_r,
-                unit.invulnerable,
-                unit.stunned,
-            )
-    for unit, new_unit in units_to_replace.items():
-        new_gs.units.remove(unit)
-        new_gs.units.add(new_unit)
-        new_gs.units_map[unit.unit_id] = new_unit
+    under_units = new_gs.cells_under_units(new_gs.cell_type)
+    for row in np.flatnonzero((under_units == BLAST_POWERUP) | (under_units == FREEZE_POWERUP)):
+        if under_units[row] == BLAST_POWERUP:
+            new_gs.set_unit(row, BLAST_R, new_gs.unit_table[row, BLAST_R] + 2)
+        # TODO handle fp
+        new_gs.clear_cell(new_gs.unit_pos(row))
 
 
 def detonate_bomb(pos: Point, gs: ParsedGameState):
-    bomb: BombState = gs.map[pos]
-    gs.map[pos] = None
-    gs.units_to_bombs[bomb.owner_unit_id].remove(bomb)
-    rad = bomb.blast_r // 2 + 1
-    arr = gs.map
-    x, y = pos
-    for i in range(rad):
-        if x + i >= arr.shape[0]:
-            break
-        if explode(arr[x + i, y], gs, Point(x + i, y)):
-            break
-    for i in range(rad):
-        if x - i < 0:
-            break
-        if explode(arr[x - i, y], gs, Point(x - i, y)):
-            break
-    for i in range(rad):
-        if y + i >= arr.shape[1]:
-            break
-        if explode(arr[x, y + i], gs, Point(x, y + i)):
-            break
-    for i in range(rad):
-        if y - i < 0:
-            break
-        if explode(arr[x, y - i], gs, Point(x, y - i)):
-            return False
-
-
-def explode(obj, gs, pos) -> bool:
-    for unit in gs.units:
-        if unit.pos == pos:
-            damage_unit(unit, gs)
-    if obj is None or isinstance(obj, Powerup) or isinstance(obj, Explosion):
-        gs.map[pos] = Explosion(
-            pos,
-            gs.tick + blast_expiry_ticks
-        )
-        return False
-    if isinstance(obj, Wall):
-        hp = obj.hp
-        if hp == -1 or hp is None:
-            return True
-        hp -= 1
+    rad = int(gs.blast_r[pos]) // 2 + 1
+    gs.clear_cell(pos)
+    footprint = get_blast_kernel(gs.w, gs.h).footprint(gs.cell_type == WALL, pos, rad, include_blocker=True)
+    explode(gs, footprint)
+
+
+def explode(gs: ParsedGameState, footprint: np.ndarray):
+    for row in np.flatnonzero(gs.cells_under_units(footprint)):
+        damage_unit(row, gs)
+    walls = footprint & (gs.cell_type == WALL) & (gs.wall_hp != INDESTRUCTIBLE)
+    for x, y in zip(*walls.nonzero()):
+        hp = gs.wall_hp[x, y] - 1
         if hp <= 0:
-            gs.map[pos] = None
+            gs.clear_cell((x, y))
         else:
-            gs.map[pos] = Wall(pos, hp)
-        return True
-    if isinstance(obj, BombState):
-        detonate_bomb(obj, gs)
-
-
-def damage_unit(unit: UnitState, gs: ParsedGameState):
-    if unit.invulnerable <= gs.tick:
-        gs.units.remove(unit)
-        new_unit = UnitState(
-            unit.unit_id,
-            unit.agent_id,
-            unit.pos,
-            unit.hp - 1,
-            unit.blast_r,
-            gs.tick + invulnerability_ticks,
-            unit.stunned,
-        )
-        gs.units.add(new_unit)
-        gs.units_map[unit.unit_id] = new_unit
-
-
-def get_target_pos(action: Action, unit: UnitState):
-    new_pos = unit.pos
+            gs.set_cell((x, y), WALL, wall_hp=hp)
+    bombs = footprint & (gs.cell_type == BOMB)
+    gs.set_cells(footprint & ~walls & ~bombs & (gs.cell_type != WALL), EXPLOSION, gs.tick + blast_expiry_ticks)
+    for x, y in zip(*bombs.nonzero()):  # bombs go through other bombs and set them off
+        if gs.cell_type[x, y] == BOMB:
+            detonate_bomb(Point(int(x), int(y)), gs)
+
+
+def damage_unit(row: int, gs: ParsedGameState):
+    if gs.unit_table[row, INVULNERABLE] <= gs.tick:
+        gs.set_unit(row, HP, gs.unit_table[row, HP] - 1)
+        gs.set_unit(row, INVULNERABLE, gs.tick + invulnerability_ticks)
+
+
+def get_target_pos(action: Action, pos: Point) -> Point:
+    new_pos = pos
     if not isinstance(action, MoveAction):
         return new_pos
     if action.action == MoveAction.UP:
-        new_pos = Point(unit.pos.x, unit.pos.y + 1)
+        new_pos = Point(pos.x, pos.y + 1)
     if action.action == MoveAction.DOWN:
-        new_pos = Point(unit.pos.x, unit.pos.y - 1)
+        new_pos = Point(pos.x, pos.y - 1)
     if action.action == MoveAction.LEFT:
-        new_pos = Point(unit.pos.x - 1, unit.pos.y)
+        new_pos = Point(pos.x - 1, pos.y)
     if action.action == MoveAction.RIGHT:
-        new_pos = Point(unit.pos.x + 1, unit.pos.y)
+        new_pos = Point(pos.x + 1, pos.y)
     return new_pos
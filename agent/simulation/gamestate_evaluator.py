@@ -1,14 +1,20 @@
-from parsing.gamestate import ParsedGameState
+from typing import Iterable
+
+from parsing.gamestate import ParsedGameState, X, Y, HP, BLAST_R
 
 
 def evaluate_gamestate_for_unit(gs: ParsedGameState, unit_id: str) -> float:
-    for su in gs.units:
-        if su.unit_id == unit_id:
-            unit = su
-            break
+    x, y, hp, blast_r = gs.unit_table[gs.unit_index[unit_id], [X, Y, HP, BLAST_R]].tolist()
     unit_score = 0
-    unit_score += unit.hp * 100
-    unit_score += unit.blast_r * 10
-    dist_to_center = abs(unit.pos.x - gs.w // 2) + abs(unit.pos.y - gs.h // 2)  # TODO replace with endfire-related calc
+    unit_score += hp * 100
+    unit_score += blast_r * 10
+    dist_to_center = abs(x - gs.w // 2) + abs(y - gs.h // 2)  # TODO replace with endfire-related calc
     unit_score += (15 - dist_to_center) * 0.5
     return unit_score
+
+
+def evaluate_gamestate_for_team(gs: ParsedGameState, my_unit_ids: Iterable[str],
+                                enemy_unit_ids: Iterable[str]) -> float:
+    """sum of own unit scores minus sum of enemy ones"""
+    return sum(evaluate_gamestate_for_unit(gs, unit_id) for unit_id in my_unit_ids) - \
+        sum(evaluate_gamestate_for_unit(gs, unit_id) for unit_id in enemy_unit_ids)
@@ -0,0 +1,140 @@
+import multiprocessing
+import os
+import random
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from actions import Action, MoveAction
+from parsing.gamestate import ParsedGameState, EXPLOSION
+from parsing.settings import rollout_workers
+from simulation.forward_model import ForwardModel, get_target_pos
+from simulation.gamestate_evaluator import evaluate_gamestate_for_team
+from simulation.rollout_search import joint_actions
+from utils.actions_generator import generate_unit_actions
+from utils.deadline import Deadline
+from utils.profiler import profiler
+
+PlayoutPolicy = Callable[[ParsedGameState, int, random.Random], Action]
+
+
+def random_playout_action(gs: ParsedGameState, row: int, rng: random.Random) -> Action:
+    return rng.choice(generate_unit_actions(gs, row))
+
+
+def cautious_playout_action(gs: ParsedGameState, row: int, rng: random.Random) -> Action:
+    """random action that doesn't walk into fire"""
+    pos = gs.unit_pos(row)
+    actions = [action for action in generate_unit_actions(gs, row)
+               if not isinstance(action, MoveAction) or gs.cell_type[get_target_pos(action, pos)] != EXPLOSION]
+    return rng.choice(actions)
+
+
+@dataclass
+class ActionValue:
+    total: float = 0
+    playouts: int = 0
+
+    def mean(self) -> float:
+        return self.total / self.playouts if self.playouts else 0
+
+
+@dataclass
+class PlayoutTask:
+    gs: ParsedGameState
+    my_unit_ids: Tuple[str, ...]
+    enemy_unit_ids: Tuple[str, ...]
+    playouts: range  # playout i starts with root joint action i % number of root actions
+    depth: int
+    seed: int
+    policy: PlayoutPolicy
+    budget: Optional[float]  # seconds, None for no limit
+
+
+def run_playouts(task: PlayoutTask) -> List[Tuple[float, int]]:
+    """
+    :return: (sum of values, number of playouts) per root joint action
+    """
+    gs = task.gs
+    roots = joint_actions(gs, task.my_unit_ids)
+    results = [[0.0, 0] for _ in roots]
+    if not roots:
+        return [tuple(result) for result in results]
+    deadline = Deadline(task.budget) if task.budget is not None else None
+    forward = ForwardModel()
+    for i in task.playouts:
+        if deadline is not None and deadline.remaining() <= 0:
+            break
+        rng = random.Random(task.seed * 1000003 + i)  # same playouts however they are split between workers
+        root = i % len(roots)
+        state = gs
+        for tick in range(task.depth):
+            forward.clear()
+            if tick == 0:
+                for action in roots[root]:
+                    forward.enque_action(action)
+            for row, unit_id in enumerate(state.unit_ids):
+                if tick == 0 and unit_id in task.my_unit_ids:
+                    continue
+                forward.enque_action(task.policy(state, row, rng))
+            state = forward.step(state)
+        results[root][0] += evaluate_gamestate_for_team(state, task.my_unit_ids, task.enemy_unit_ids)
+        results[root][1] += 1
+    return [tuple(result) for result in results]
+
+
+class RolloutExecutor:
+    """
+    Monte Carlo value of every joint action of my units: playouts of depth ticks with ForwardModel, where after the
+    first tick all units follow a playout policy. Playouts are split between a pool of worker processes that get
+    a pickled ParsedGameState, with one worker they run in this process.
+    """
+
+    def __init__(self, workers: int = rollout_workers, policy: PlayoutPolicy = random_playout_action):
+        """
+        :param workers: 0 for one per core
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.policy = policy
+        self.pool = None
+
+    def evaluate(self, gs: ParsedGameState, my_unit_ids: Iterable[str], enemy_unit_ids: Iterable[str],
+                 playouts: int, depth: int, seed: int = 0, deadline: Deadline = None) -> List[ActionValue]:
+        """
+        :return: value estimate per joint action of my units, in joint_actions(gs, my_unit_ids) order.
+        Fewer playouts are run when the deadline comes first
+        """
+        my_unit_ids = tuple(my_unit_ids)
+        enemy_unit_ids = tuple(enemy_unit_ids)
+        budget = deadline.remaining() if deadline is not None else None
+        chunks = min(self.workers, playouts) or 1
+        tasks = [PlayoutTask(gs, my_unit_ids, enemy_unit_ids, range(k, playouts, chunks), depth, seed, self.policy,
+                             budget) for k in range(chunks)]
+        if chunks == 1:
+            chunk_results = [run_playouts(tasks[0])]
+        else:
+            chunk_results = self.get_pool().map(run_playouts, tasks)
+
+        values = [ActionValue() for _ in chunk_results[0]]
+        for chunk_result in chunk_results:
+            for value, (total, count) in zip(values, chunk_result):
+                value.total += total
+                value.playouts += count
+        profiler.count("rollout_playouts", sum(value.playouts for value in values))
+        return values
+
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers)
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,127 @@
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Iterable
+
+from actions import Action
+from parsing.gamestate import ParsedGameState, HP
+from parsing.settings import transposition_table_size
+from simulation.forward_model import ForwardModel
+from simulation.gamestate_evaluator import evaluate_gamestate_for_team
+from simulation.transposition_table import TranspositionTable
+from utils.actions_generator import generate_unit_actions
+from utils.deadline import Deadline
+from utils.profiler import profiler
+
+JointAction = Tuple[Action, ...]
+NO_ACTION = -1
+
+
+def joint_actions(gs: ParsedGameState, unit_ids: Iterable[str]) -> List[JointAction]:
+    """:return: every combination of actions of the alive units, empty if none is alive"""
+    per_unit = [generate_unit_actions(gs, gs.unit_index[unit_id]) for unit_id in unit_ids
+                if gs.unit_table[gs.unit_index[unit_id], HP] > 0]
+    if not per_unit:
+        return []
+    return list(itertools.product(*per_unit))
+
+
+class OutOfTime(Exception):
+    pass
+
+
+@dataclass
+class SearchResult:
+    actions: Dict[str, Action]  # best joint action of my units
+    value: float
+    depth: int  # deepest iteration that returned the actions
+    nodes: int
+
+
+class RolloutSearch:
+    """
+    Depth limited search over joint actions of my units on top of ForwardModel. Enemies stay idle, leaves are
+    scored by evaluate_gamestate_for_team. States reached again by another joint action or at another depth are
+    taken from the transposition table. search() deepens iteratively until the deadline or max_depth and returns
+    the best joint action found.
+    """
+
+    def __init__(self, my_unit_ids: Iterable[str], enemy_unit_ids: Iterable[str], max_depth: int,
+                 tt: TranspositionTable = None):
+        """
+        :param tt: table to reuse, e.g. from the previous tick. Entries are (searched depth, value,
+        index of the best joint action) and only valid for the same units and evaluation
+        """
+        self.my_unit_ids = tuple(my_unit_ids)
+        self.enemy_unit_ids = tuple(enemy_unit_ids)
+        self.max_depth = max_depth
+        self.forward_model = ForwardModel()
+        self.tt = tt if tt is not None else TranspositionTable(transposition_table_size)
+        self.deadline = None
+        self.nodes = 0
+
+    def search(self, gs: ParsedGameState, deadline: Deadline) -> SearchResult:
+        self.deadline = deadline
+        self.nodes = 0
+        result = SearchResult(dict(), self.evaluate(gs), 0, 0)
+        for depth in range(1, self.max_depth + 1):
+            try:
+                value, best = self.search_node(gs, depth)
+            except OutOfTime:
+                break
+            if best == NO_ACTION:  # none of my units is alive
+                break
+            result = SearchResult({action.unit_id: action for action in self.joint_actions(gs)[best]}, value, depth,
+                                  self.nodes)
+        profiler.count("rollout_searches")
+        profiler.count("rollout_nodes", self.nodes)
+        profiler.count("rollout_depth", result.depth)
+        return result
+
+    def search_node(self, gs: ParsedGameState, depth: int) -> Tuple[float, int]:
+        """
+        :return: value of gs searched depth ticks ahead and index of the best joint action in joint_actions(gs)
+        """
+        key = gs.key()
+        entry = self.tt.get(key)
+        if entry is not None and entry[0] >= depth:
+            return entry[1], entry[2]
+        if self.deadline.remaining() <= 0:
+            raise OutOfTime()
+        self.nodes += 1
+
+        if depth == 0:
+            value = self.evaluate(gs)
+            self.tt.put(key, (0, value, NO_ACTION))
+            return value, NO_ACTION
+        joint_actions = self.joint_actions(gs)
+        if not joint_actions:
+            value = self.evaluate(gs)
+            self.tt.put(key, (math.inf, value, NO_ACTION))  # nothing to search, valid for any depth
+            return value, NO_ACTION
+
+        order = list(range(len(joint_actions)))
+        if entry is not None and entry[2] != NO_ACTION:  # best of the shallower search first
+            order.remove(entry[2])
+            order.insert(0, entry[2])
+        best_value = -math.inf
+        best = NO_ACTION
+        for i in order:
+            value, _ = self.search_node(self.step(gs, joint_actions[i]), depth - 1)
+            if value > best_value:
+                best_value = value
+                best = i
+        self.tt.put(key, (depth, best_value, best))
+        return best_value, best
+
+    def joint_actions(self, gs: ParsedGameState) -> List[JointAction]:
+        return joint_actions(gs, self.my_unit_ids)
+
+    def step(self, gs: ParsedGameState, joint_action: JointAction) -> ParsedGameState:
+        self.forward_model.clear()
+        for action in joint_action:
+            self.forward_model.enque_action(action)
+        return self.forward_model.step(gs)
+
+    def evaluate(self, gs: ParsedGameState) -> float:
+        return evaluate_gamestate_for_team(gs, self.my_unit_ids, self.enemy_unit_ids)
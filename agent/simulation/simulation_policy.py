@@ -1,27 +1,64 @@
-from parsing.extended_game_state import ExtendedGameState
-from utils.actions_generator import generate_possible_actions
-from simulation.forward_model import ForwardModel
 import asyncio
 
+from actions import Action
+from game_state import GameState
+from parsing.extended_game_state import ExtendedGameState
+from parsing.settings import tick_send_margin, simulation_max_depth, transposition_table_size
+from simulation.rollout_search import RolloutSearch
+from simulation.transposition_table import TranspositionTable
+from utils.deadline import Deadline, tick_duration
+from utils.profiler import profiler
+
 
 class SimulationPolicy:
-    def __init__(self):
-        self.loop = asyncio.get_event_loop()
-        self.tasks = list()
-        self.forward_model = ForwardModel()
+    """
+    Picks the joint action of my units by searching ahead with the forward model until the tick deadline
+    """
 
-    def init(self, client):
-        pass
+    def __init__(self, max_depth: int = simulation_max_depth):
+        self.loop = None
+        self.client = None
+        self.max_depth = max_depth
+        self.tick_number = 0
+        self.debug = False
+        self.last_result = None
+        self.tt = TranspositionTable(transposition_table_size)  # shared by the searches of all ticks
+
+    def init(self, client: GameState):
+        self.client = client
+        self.loop = asyncio.get_event_loop()
 
     def execute_actions(self, tick_number, game_state):
-        extended_game_state = ExtendedGameState(game_state)
-        gs = extended_game_state.gs
-        actions_dict = generate_possible_actions(gs)
-        for unit, actions in actions_dict.items():
-            pass
+        self.tick_number = tick_number
+        tick_start = self.client.tick_started_at if self.client else None
+        deadline = Deadline(tick_duration - tick_send_margin, tick_start)
+        profiler.new_tick()
+
+        with profiler.stage("tick"):
+            with profiler.stage("parse"):
+                extended_game_state = ExtendedGameState(game_state)
+            with profiler.stage("search"):
+                search = RolloutSearch(extended_game_state.my_unit_ids, extended_game_state.enemy_unit_ids,
+                                       self.max_depth, self.tt)
+                self.last_result = search.search(extended_game_state.gs, deadline)
+            with profiler.stage("send"):
+                for action in self.last_result.actions.values():
+                    if type(action) is not Action:  # idle is not sent
+                        self.execute_action(action, tick_number)
+
+        self.prod_print("Stages", profiler.last_tick_report(), "depth {} nodes {} value {:.1f}".format(
+            self.last_result.depth, self.last_result.nodes, self.last_result.value))
 
     def execute_action(self, action, tick_number):
-        self.tasks.append(self.loop.create_task(self.send_action_acync_impl(action, tick_number)))
+        self.loop.create_task(self.send_action_async_impl(action, tick_number))
+
+    async def send_action_async_impl(self, action: Action, tick_number: int):
+        if self.client.tick != tick_number:
+            self.prod_print("Action {action} for tick {tick} is only sent on {current}, cancelling".format(
+                action=action, tick=tick_number, current=self.client.tick))
+            return
+        await action.send(self.client)
+        self.debug_print("Sent action {action} on tick {tick}!".format(action=action, tick=tick_number))
 
     def prod_print(self, *args):
         print("Tick #{}!\n".format(self.tick_number), *args)
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from simulation.engame_fire_simulator2 import EndgameFireSimulator2, EndgameFireTimeline, get_endgame_fire_order, \
+    get_endgame_fire_spiral
+
+
+class TestEndgameFireSimulator(unittest.TestCase):
+
+    def test_danger_is_shared_and_read_only(self):
+        simulator = EndgameFireSimulator2(15, 15)
+        danger = simulator.get_endgame_fire_danger(10)
+        self.assertIs(danger, simulator.get_endgame_fire_danger(11))
+        self.assertIs(danger, EndgameFireSimulator2(15, 15).get_endgame_fire_danger(10))
+        self.assertIsNot(danger, simulator.get_endgame_fire_danger(12))
+        self.assertFalse(danger.flags.writeable)
+        self.assertFalse(simulator.endgame_fire_spiral.flags.writeable)
+        with self.assertRaises(ValueError):
+            danger[0, 0] = 0
+
+    def test_danger_before_and_after_start(self):
+        simulator = EndgameFireSimulator2(15, 15)
+        self.assertNotEqual(simulator.get_endgame_fire_danger(0)[0, 0], simulator.get_endgame_fire_danger(1)[0, 0])
+        danger = simulator.get_endgame_fire_danger(20)
+        self.assertGreater(danger[0, 0], danger[7, 7])
+
+    def test_board_that_is_not_square(self):
+        spiral = EndgameFireSimulator2(11, 15).endgame_fire_spiral
+        self.assertEqual(spiral.shape, (11, 15))
+        ranks = np.unique(spiral)
+        np.testing.assert_array_equal(ranks, np.arange(len(ranks)))
+        self.assertEqual(spiral[5, 7], ranks[-1])  # center burns last
+        self.assertEqual(EndgameFireSimulator2(11, 15).get_endgame_fire_danger(30).shape, (11, 15))
+
+
+class TestEndgameFireTimeline(unittest.TestCase):
+
+    def test_predicted_from_config(self):
+        timeline = EndgameFireTimeline(9, 9, {"fire_spawn_interval_ticks": 3, "game_duration_ticks": 200})
+        timeline.update(150, 0)
+        self.assertEqual(timeline.ignition_ticks[8, 0], 200)
+        self.assertEqual(timeline.ignition_ticks[0, 8], 203)  # other cell of the same rank
+        self.assertEqual(timeline.ignition_ticks[1, 8], 209)
+        self.assertEqual(timeline.ticks_until_fire_at((1, 8), 190), 19)
+        self.assertFalse(timeline.ignition_ticks.flags.writeable)
+
+    def test_anchored_on_observed_fires(self):
+        timeline = EndgameFireTimeline(9, 9, {"fire_spawn_interval_ticks": 2, "game_duration_ticks": 200})
+        timeline.update(200, 0)  # late
+        timeline.update(201, 0)
+        self.assertEqual(timeline.ignition_ticks[8, 0], 202)
+        timeline.update(205, 1)
+        self.assertEqual(timeline.ignition_ticks[8, 0], 205)
+        self.assertEqual(timeline.ignition_ticks[1, 8], 211)
+        ignition_ticks = timeline.ignition_ticks
+        for tick, fires in [(206, 1), (207, 2), (208, 2), (209, 3)]:
+            timeline.update(tick, fires)
+        self.assertIs(timeline.ignition_ticks, ignition_ticks)  # as predicted
+        np.testing.assert_array_equal(timeline.ticks_until_fire(207)[[8, 0, 1], [0, 8, 8]], [0, 0, 4])
+
+    def test_every_cell_gets_its_own_spawn(self):
+        for w, h in [(9, 9), (15, 15), (11, 15)]:
+            order = get_endgame_fire_order(w, h)
+            np.testing.assert_array_equal(np.sort(order.ravel()), np.arange(w * h))
+        np.testing.assert_array_equal(get_endgame_fire_order(15, 15) // 2, get_endgame_fire_spiral(15, 15))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import pickle
+import unittest
+
+from parsing.gamestate import ParsedGameState
+from simulation.rollout_executor import RolloutExecutor, cautious_playout_action
+from simulation.rollout_search import joint_actions
+from simulation.tests.test_rollout_search import game_state_json
+
+
+def bomb_state() -> ParsedGameState:
+    return ParsedGameState(game_state_json(
+        [("c", "a", 3, 2), ("d", "b", 6, 6)],
+        [{"type": "b", "x": 2, "y": 2, "blast_diameter": 3, "unit_id": "d", "created": 0, "expires": 12},
+         {"type": "w", "x": 4, "y": 3, "hp": 1}]
+    ))
+
+
+class TestRolloutExecutor(unittest.TestCase):
+
+    def test_pickled_state(self):
+        gs = bomb_state()
+        copy = pickle.loads(pickle.dumps(gs))
+        self.assertEqual(copy, gs)
+        self.assertEqual(copy.key(), gs.key())
+        copy.clear_cell((2, 2))
+        self.assertNotEqual(copy, gs)
+        self.assertEqual(copy.zobrist, copy.full_zobrist())
+
+    def test_pool_matches_in_process(self):
+        gs = bomb_state()
+        with RolloutExecutor(1) as executor:
+            local = executor.evaluate(gs, ["c"], ["d"], 60, 6, seed=3)
+        with RolloutExecutor(2) as executor:
+            pooled = executor.evaluate(gs, ["c"], ["d"], 60, 6, seed=3)
+        self.assertEqual(len(local), len(joint_actions(gs, ["c"])))
+        self.assertEqual(local, pooled)
+        self.assertEqual(sum(value.playouts for value in local), 60)
+
+    def test_values_root_actions(self):
+        gs = bomb_state()
+        roots = joint_actions(gs, ["c"])
+        with RolloutExecutor(1, cautious_playout_action) as executor:
+            values = executor.evaluate(gs, ["c"], ["d"], 40 * len(roots), 3)
+        stay = next(i for i, (action,) in enumerate(roots) if type(action).__name__ == "Action")
+        best = max(range(len(roots)), key=lambda i: values[i].mean())
+        self.assertLess(values[stay].mean(), values[best].mean())
+
+
+if __name__ == '__main__':
+    unittest.main()
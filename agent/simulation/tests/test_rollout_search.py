@@ -0,0 +1,58 @@
+import unittest
+
+from actions import Action, MoveAction
+from parsing.gamestate import ParsedGameState
+from simulation.rollout_search import RolloutSearch
+from utils.actions_generator import generate_possible_actions
+from utils.deadline import Deadline
+
+
+def game_state_json(units, entities, tick=10, size=9):
+    return {
+        "tick": tick,
+        "world": {"width": size, "height": size},
+        "unit_state": {unit_id: {"unit_id": unit_id, "agent_id": agent_id, "coordinates": [x, y], "hp": 3,
+                                 "blast_diameter": 3, "invulnerable": 0, "stunned": 0}
+                       for unit_id, agent_id, x, y in units},
+        "entities": entities,
+    }
+
+
+def describe(action):
+    return type(action).__name__, getattr(action, "action", None)
+
+
+class TestRolloutSearch(unittest.TestCase):
+
+    def test_possible_actions(self):
+        gs = ParsedGameState(game_state_json(
+            [("c", "a", 0, 0), ("d", "b", 5, 5)],
+            [{"type": "m", "x": 1, "y": 0}]
+        ))
+        actions = generate_possible_actions(gs)
+        self.assertEqual(set(actions), {"c", "d"})
+        self.assertEqual([describe(action) for action in actions["c"]],
+                         [("Action", None), ("MoveAction", MoveAction.UP), ("BombAction", None)])
+        self.assertEqual(len(actions["d"]), 6)
+
+    def test_runs_from_bomb(self):
+        gs = ParsedGameState(game_state_json(
+            [("c", "a", 3, 2), ("d", "b", 8, 8)],
+            [{"type": "b", "x": 2, "y": 2, "blast_diameter": 3, "unit_id": "d", "created": 0, "expires": 12}]
+        ))
+        result = RolloutSearch(["c"], ["d"], max_depth=3).search(gs, Deadline(10))
+        self.assertEqual(result.depth, 3)
+        action = result.actions["c"]
+        self.assertIsInstance(action, MoveAction)
+        self.assertNotEqual(action.action, MoveAction.LEFT)
+        self.assertGreater(result.value, 0)
+
+    def test_stops_at_deadline(self):
+        gs = ParsedGameState(game_state_json([("c", "a", 3, 2), ("d", "b", 8, 8)], []))
+        result = RolloutSearch(["c"], ["d"], max_depth=50).search(gs, Deadline(0.05))
+        self.assertLess(result.depth, 50)
+        self.assertIsInstance(result.actions["c"], Action)
+
+
+if __name__ == '__main__':
+    unittest.main()
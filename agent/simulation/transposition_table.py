@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from typing import Any, Optional
+
+from utils.profiler import profiler
+
+
+class TranspositionTable:
+    """
+    Search results keyed by ParsedGameState.key(), holding at most capacity entries.
+    The least recently used entry is evicted first, so the table can live across ticks and old ticks age out.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries: OrderedDict[int, Any] = OrderedDict()
+
+    def get(self, key: int) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            profiler.count("tt_misses")
+            return None
+        profiler.count("tt_hits")
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: int, entry: Any):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            profiler.count("tt_evictions")
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.entries
@@ -0,0 +1,10 @@
+from runner import Runner
+from simulation.simulation_policy import SimulationPolicy
+
+
+def main():
+    Runner(SimulationPolicy())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,41 @@
 from typing import List, Dict
-from actions import Action, DetonateBombAction, MoveAction
-from parsing.gamestate import ParsedGameState, BombState, Wall
+from actions import Action, BombAction, DetonateBombAction, MoveAction
+from parsing.bombs import Bomb
+from parsing.gamestate import ParsedGameState, WALL, BOMB, HP, STUNNED
+from parsing.settings import bomb_arming_ticks
+from simulation.forward_model import get_target_pos
 from utils.game_utils import Point
-from parser import bomb_arming_ticks
+
+max_bombs_per_unit = 3
 
 
 def generate_possible_actions(gs: ParsedGameState) -> Dict[str, List[Action]]:
-    actions = dict()
-    for unit in gs.units:
-        pos = unit.pos
-        actions = [Action(unit.unit_id)]
-        if unit.stunned <= gs.tick:
-            add_action_for_pos(unit.unit_id, Point(pos.x, pos.y-1), gs, MoveAction.UP, actions)
-            add_action_for_pos(unit.unit_id, Point(pos.x, pos.y+1), gs, MoveAction.DOWN, actions)
-            add_action_for_pos(unit.unit_id, Point(pos.x-1, pos.y), gs, MoveAction.LEFT, actions)
-            add_action_for_pos(unit.unit_id, Point(pos.x+1, pos.y), gs, MoveAction.RIGHT, actions)
-            for bomb in gs.units_to_bombs:
-                if bomb.created <= gs.tick - bomb_arming_ticks:
-                    actions.append(DetonateBombAction(unit.unit_id, bomb))
+    """
+    :return: unit_id -> actions that can change something, always starting with the idle Action
+    """
+    return {unit_id: generate_unit_actions(gs, row) for row, unit_id in enumerate(gs.unit_ids)}
+
+
+def generate_unit_actions(gs: ParsedGameState, row: int) -> List[Action]:
+    unit_id = gs.unit_ids[row]
+    actions = [Action(unit_id)]
+    if gs.unit_table[row, HP] <= 0 or gs.unit_table[row, STUNNED] > gs.tick:
+        return actions
+    pos = gs.unit_pos(row)
+    for move in MoveAction.ALL:
+        add_action_for_pos(unit_id, get_target_pos(MoveAction(unit_id, move), pos), gs, move, actions)
+    if gs.cell_type[pos] != BOMB and gs.bomb_count(row) < max_bombs_per_unit:
+        actions.append(BombAction(unit_id))
+    armed = (gs.cell_type == BOMB) & (gs.bomb_owner == row) & (gs.created <= gs.tick - bomb_arming_ticks)
+    for x, y in zip(*armed.nonzero()):
+        bomb_pos = Point(int(x), int(y))
+        actions.append(DetonateBombAction(unit_id, Bomb(bomb_pos, int(gs.blast_r[bomb_pos]), unit_id, True)))
     return actions
 
 
 def add_action_for_pos(unit_id: str, pos: Point, gs: ParsedGameState, action: str, actions: List[Action]):
-    if pos.x < 0 or pos.x >= gs.w or pos.y < 0 or pos.y >= gs.h:
+    if not gs.in_bounds(pos):
         return
-    if isinstance(gs.map[pos], Wall) or isinstance(gs.map[pos], BombState):
+    if gs.cell_type[pos] == WALL or gs.cell_type[pos] == BOMB:
         return
-    actions.append(MoveAction(unit_id, action))
+    actions.append(MoveAction(unit_id, action, pos))
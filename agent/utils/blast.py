@@ -0,0 +1,116 @@
+from functools import lru_cache
+
+import numpy as np
+
+from utils.game_utils import Point
+
+# arm order used by every "walk four arms until wall" loop: +x, -x, +y, -y
+arm_directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class BlastKernel:
+    """
+    Precomputed blast rays for a board size. rays[cell, arm, i] is the flat index of the cell i + 1 steps
+    away from cell along arm, or the off-board sentinel w * h.
+    Radius follows blast_r(): an explosion of radius rad covers the center and rad - 1 cells of every arm.
+    """
+
+    def __init__(self, w: int, h: int):
+        self.w = w
+        self.h = h
+        self.sentinel = w * h
+        length = max(w, h) - 1
+        xs, ys = np.divmod(np.arange(w * h), h)
+        steps = np.arange(1, length + 1)
+        self.rays = np.full((w * h, 4, length), self.sentinel, dtype=np.intp)
+        for arm, (dx, dy) in enumerate(arm_directions):
+            rx = xs[:, None] + dx * steps
+            ry = ys[:, None] + dy * steps
+            valid = (rx >= 0) & (rx < w) & (ry >= 0) & (ry < h)
+            self.rays[:, arm, :][valid] = (rx * h + ry)[valid]
+        self.max_steps = length
+        # within_radius[rad, i] is True if step i + 1 of an arm is covered by a blast of radius rad
+        self.within_radius = np.arange(1, length + 1)[None, :] < np.arange(length + 2)[:, None]
+        self._padded = np.ones(w * h + 1, dtype=bool)
+
+    def _padded_blockers(self, blockers: np.ndarray) -> np.ndarray:
+        self._padded[:-1] = blockers.ravel()
+        return self._padded
+
+    def _arms(self, padded: np.ndarray, flat_pos, rad, include_blocker: bool):
+        steps = self.rays[flat_pos, :, :min(max(rad - 1, 0), self.max_steps)]
+        blocked = padded[steps]
+        free = np.logical_and.accumulate(~blocked, axis=-1)
+        if include_blocker:
+            reached = np.ones_like(free)
+            reached[..., 1:] = free[..., :-1]
+            free = reached & (steps != self.sentinel)
+        return steps, free
+
+    def cells(self, blockers: np.ndarray, pos: Point, rad: int, include_center: bool = True,
+              include_blocker: bool = False) -> np.ndarray:
+        """
+        Flat indices covered by the blast in walk order: center, then each arm from the center outwards.
+        :param blockers: bool plane of cells that stop the blast
+        :param include_blocker: the first blocker of every arm is covered too (it gets hit)
+        """
+        padded = self._padded_blockers(blockers)
+        flat_pos = pos[0] * self.h + pos[1]
+        steps, free = self._arms(padded, flat_pos, rad, include_blocker)
+        arms = steps[free]
+        if include_center and (include_blocker or not padded[flat_pos]):
+            return np.concatenate(([flat_pos], arms))
+        return arms
+
+    def footprint(self, blockers: np.ndarray, pos: Point, rad: int, include_center: bool = True,
+                  include_blocker: bool = False) -> np.ndarray:
+        mask = np.zeros(self.w * self.h, dtype=bool)
+        mask[self.cells(blockers, pos, rad, include_center, include_blocker)] = True
+        return mask.reshape((self.w, self.h))
+
+    def footprints(self, blockers: np.ndarray, positions, radii, include_center: bool = True,
+                   include_blocker: bool = False) -> np.ndarray:
+        """
+        Footprints of many blasts at once.
+        :return: bool array of shape (len(positions), w, h)
+        """
+        n = len(positions)
+        result = np.zeros((n, self.w * self.h + 1), dtype=bool)
+        if n == 0:
+            return result[:, :-1].reshape((0, self.w, self.h))
+        padded = self._padded_blockers(blockers)
+        flat_pos = np.array([x * self.h + y for x, y in positions], dtype=np.intp)
+        max_rad = min(max(radii), self.max_steps + 1)
+        steps, free = self._arms(padded, flat_pos, max_rad, include_blocker)
+        free &= self.within_radius[np.minimum(radii, max_rad), None, :max_rad - 1]
+        rows = np.nonzero(free)[0]
+        result[rows, steps[free]] = True
+        if include_center:
+            centers = include_blocker | ~padded[flat_pos]
+            result[np.arange(n)[centers], flat_pos[centers]] = True
+        return result[:, :-1].reshape((n, self.w, self.h))
+
+
+@lru_cache(maxsize=None)
+def get_blast_kernel(w: int, h: int) -> BlastKernel:
+    return BlastKernel(w, h)
+
+
+def unravel(flat_cells: np.ndarray, h: int):
+    """flat indices to Points"""
+    return [Point(*divmod(int(cell), h)) for cell in flat_cells]
+
+
+def blast_arm_order(center: Point, p: Point):
+    """(arm, step) of p on the arms of center in walk order, center is (0, 0)"""
+    dx = p[0] - center[0]
+    dy = p[1] - center[1]
+    if dx > 0:
+        return 0, dx
+    if dx < 0:
+        return 1, -dx
+    if dy > 0:
+        return 2, dy
+    if dy < 0:
+        return 3, -dy
+    return 0, 0
@@ -0,0 +1,25 @@
+import os
+import time
+
+tick_rate_hz = float(os.environ.get("TICK_RATE_HZ", 10))
+tick_duration = 1 / tick_rate_hz
+
+
+class Deadline:
+    """
+    End of the time given to a tick, counted from when the tick arrived
+    """
+
+    def __init__(self, budget: float, start: float = None):
+        self.start = time.perf_counter() if start is None else start
+        self.end = self.start + budget
+
+    def remaining(self) -> float:
+        return self.end - time.perf_counter()
+
+    def allows(self, cost: float) -> bool:
+        """
+        :return: True if cost seconds of work still fit before the deadline
+        """
+        return self.remaining() >= cost
+
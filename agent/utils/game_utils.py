@@ -3,6 +3,7 @@ from __future__ import annotations
 import heapq
 import math
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, List, Tuple, Iterator, NamedTuple
 
 import numpy as np
@@ -39,42 +40,56 @@ class Point(NamedTuple):
         return self.x < other.x
 
 
+class NeighbourTable:
+    """
+    Neighbours of every cell of a w x h board in get_neighbours order, off-board cells left out.
+    points[x][y] is a tuple of Points, flat[x * h + y] a tuple of flat indices and cells[x * h + y] the Point itself.
+    All are built once per board size, so search loops don't allocate.
+    """
+
+    def __init__(self, w: int, h: int):
+        self.w = w
+        self.h = h
+        self.points: List[List[Tuple[Point, ...]]] = []
+        self.flat: List[Tuple[int, ...]] = []
+        self.cells: List[Point] = []
+        for x in range(w):
+            column = []
+            for y in range(h):
+                self.cells.append(Point(x, y))
+                neighbours = [Point(x + 1, y), Point(x - 1, y), Point(x, y - 1), Point(x, y + 1)]
+                if (x + y) % 2 == 0:  # to prevent ugly (diagonal) paths
+                    neighbours.reverse()
+                neighbours = tuple(p for p in neighbours if 0 <= p.x < w and 0 <= p.y < h)
+                column.append(neighbours)
+                self.flat.append(tuple(p.x * h + p.y for p in neighbours))
+            self.points.append(column)
+
+    @staticmethod
+    def passable(grid: np.ndarray, include: Point = None) -> np.ndarray:
+        """bool mask of the cells get_neighbours may return"""
+        mask = grid != math.inf
+        if include is not None:
+            mask[include] = True
+        return mask
+
+
+@lru_cache(maxsize=None)
+def get_neighbour_table(w: int, h: int) -> NeighbourTable:
+    return NeighbourTable(w, h)
+
+
 def get_neighbours(
         grid: np.array,
         center: Point,
         include: Point = None,
         include_center: bool = False
-) -> Iterator[Point]:
-    x = center.x
-    y = center.y
-    neighbors = [
-        Point(x + 1, y),
-        Point(x - 1, y),
-        Point(x, y - 1),
-        Point(x, y + 1),
-    ]
-
-    if (x + y) % 2 == 0:  # to prevent ugly (diagonal) paths
-        neighbors.reverse()
-
-    size_x = grid.shape[0] - 1
-    size_y = grid.shape[1] - 1
-
-    def is_valid(p: Point) -> bool:
-        if p == include:
-            return True
-        if p.x < 0 or p.x > size_x:
-            return False
-        if p.y < 0 or p.y > size_y:
-            return False
-        return grid[p.x, p.y] != math.inf
-
-    result = filter(is_valid, neighbors)
+) -> List[Point]:
+    neighbours = get_neighbour_table(grid.shape[0], grid.shape[1]).points[center[0]][center[1]]
+    result = [p for p in neighbours if p == include or grid[p] != math.inf]
     if include_center:
-        result_list = list(result)
-        result_list.append(center)
-        return result_list
-    return list(result)
+        result.append(center)
+    return result
 
 
 @dataclass(frozen=True)
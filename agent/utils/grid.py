@@ -20,6 +20,36 @@ def draw_cross(arr: np.ndarray, x: int, y: int, rad: int, value: int, draw_cross
             arr[x, y - i] += value
 
 
+def cross_counts(centers: np.ndarray) -> np.ndarray:
+    """
+    Number of rad 2 crosses covering every cell, same as calling draw_cross(arr, x, y, 2, 1) centers[x, y] times
+    """
+    centers = centers.astype(np.int32)
+    counts = centers.copy()
+    counts[1:, :] += centers[:-1, :]
+    counts[:-1, :] += centers[1:, :]
+    counts[:, 1:] += centers[:, :-1]
+    counts[:, :-1] += centers[:, 1:]
+    return counts
+
+
+_occupation_danger_table = np.zeros(1)
+
+
+def occupation_danger(counts: np.ndarray) -> np.ndarray:
+    """
+    close_cell_danger summed counts times, bit for bit what repeated draw_cross additions give
+    """
+    global _occupation_danger_table
+    needed = int(counts.max(initial=0)) + 1
+    if needed > len(_occupation_danger_table):
+        table = [0.]
+        for _ in range(needed - 1):
+            table.append(table[-1] + close_cell_danger)
+        _occupation_danger_table = np.array(table)
+    return _occupation_danger_table[counts]
+
+
 def draw_cross_assign(arr: np.ndarray, x: int, y: int, rad: int, value: int):
     for i in range(rad):
         if x + i < arr.shape[0]:
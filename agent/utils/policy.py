@@ -1,65 +1,37 @@
-import numpy as np
-
-from utils.game_utils import Unit, blast_r, is_invincible_next_tick, Point
+from utils.blast import arm_directions, blast_arm_order
+from utils.game_utils import Unit, blast_r, is_invincible_next_tick
 
 
 def can_hit_enemy(unit, parser) -> Unit:  # returns enemy or none
-    def has_enemy(x, y):
-        if x < 0 or x >= parser.w or y < 0 or y >= parser.h:
-            return None, True
-        if parser.wall_map[x, y] != 0:
-            return None, True
-        for enemy in parser.enemy_units:
-            if enemy.pos == Point(x, y):
-                return enemy, False
-        return None, False
-
-    rad = blast_r(unit.blast_diameter)
-    x, y = unit.pos
-    enemy_found = None
-    for i in range(rad):
-        enemy, stop_iter = has_enemy(x + i, y)
-        if enemy:
-            if not is_invincible_next_tick(enemy, parser.gs.tick):
-                return enemy
-            enemy_found = enemy
-        if stop_iter:
-            break
-    for i in range(rad):
-        enemy, stop_iter = has_enemy(x - i, y)
-        if enemy:
-            if not is_invincible_next_tick(enemy, parser.gs.tick):
-                return enemy
-            enemy_found = enemy
-        if stop_iter:
-            break
-    for i in range(rad):
-        enemy, stop_iter = has_enemy(x, y + i)
-        if enemy:
-            if not is_invincible_next_tick(enemy, parser.gs.tick):
-                return enemy
-            enemy_found = enemy
-        if stop_iter:
-            break
-    for i in range(rad):
-        enemy, stop_iter = has_enemy(x, y - i)
-        if enemy:
-            if not is_invincible_next_tick(enemy, parser.gs.tick):
-                return enemy
-            enemy_found = enemy
-        if stop_iter:
-            break
-    return enemy_found
+    if parser.blast_blockers[unit.pos]:
+        return None
+    enemy_at = dict()
+    for enemy in parser.get_reach_index().enemies_hit(unit.pos, blast_r(unit.blast_diameter)):
+        enemy_at.setdefault(enemy.pos, enemy)
+    enemies = list(enemy_at.values())
+    hittable = [enemy for enemy in enemies if not is_invincible_next_tick(enemy, parser.tick_number)]
+    if hittable:  # first one met walking the arms
+        return min(hittable, key=lambda enemy: blast_arm_order(unit.pos, enemy.pos))
+    if enemies:  # last one met walking the arms
+        return max(enemies, key=lambda enemy: last_visit_order(unit.pos, enemy.pos))
+    return None
+
+
+def last_visit_order(center, p):
+    """
+    blast_arm_order of the last time the arm walks pass p. can_hit_enemy used to start every arm at center, so
+    center is walked again at the start of the last arm and an enemy on center is met after the other arms,
+    before the cells of the last arm
+    """
+    if p == center:
+        return len(arm_directions) - 1, 0
+    return blast_arm_order(center, p)
 
 
 def debug_print(state, *args):
-    if state.debug:
-        print("Tick #{}!\n".format(state.tick_number), *args)
-    else:
-        for arg in args:
-            if not isinstance(arg, np.ndarray) or arg.dtype == object:
-                continue
-            repr(arg)
+    if not state.debug:
+        return
+    print("Tick #{}!\n".format(state.tick_number), *args)
 
 
 def prod_print(state, *args):
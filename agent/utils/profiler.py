@@ -0,0 +1,64 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class Profiler:
+    """
+    Always-on wall time of policy stages and counts of search work over a game.
+    Stages are timed with `with profiler.stage(name):`, counters are bumped with profiler.count(name, n).
+    """
+
+    def __init__(self):
+        self.last = dict()  # stage -> seconds in the current tick
+        self.samples = defaultdict(list)  # stage -> seconds of every call in the game
+        self.skipped = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def reset(self):
+        self.__init__()
+
+    def new_tick(self):
+        self.last.clear()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.last[name] = elapsed
+            self.samples[name].append(elapsed)
+
+    def skip(self, name: str):
+        self.skipped[name] += 1
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def last_tick_report(self) -> str:
+        return " ".join("{}={:.1f}ms".format(name, elapsed * 1000) for name, elapsed in self.last.items())
+
+    def summary(self) -> str:
+        lines = ["stage calls p50 p99 max (ms) skipped"]
+        for name, samples in self.samples.items():
+            p50, p99 = np.percentile(samples, [50, 99]) * 1000
+            lines.append("{} {} {:.2f} {:.2f} {:.2f} {}".format(
+                name, len(samples), p50, p99, max(samples) * 1000, self.skipped[name]))
+        for name, skipped in self.skipped.items():
+            if name not in self.samples:  # skipped on every tick
+                lines.append("{} 0 - - - {}".format(name, skipped))
+        for name, value in self.counters.items():
+            lines.append("{} {}".format(name, value))
+        for name, misses in list(self.counters.items()):
+            if name.endswith("_misses"):
+                cache = name[:-len("_misses")]
+                hits = self.counters.get(cache + "_hits", 0)
+                lines.append("{} hit rate {:.1%}".format(cache, hits / (hits + misses)))
+        return "\n".join(lines)
+
+
+profiler = Profiler()
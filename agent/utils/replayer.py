@@ -1,15 +1,12 @@
 import asyncio
 import json
 
-import torch
+import numpy as np
 
 from game_state import GameState
-from nn.nn_policy import PolicyNeuralNetPolicy
-from rule_policy import Ticker, np
+from rule.rule_policy import RulePolicy
 
-# replay_path = "../logs/replay.json"
-replay_path = "../runs/arxiv/replay-78-1644097313.134485-1644097313.150521.json"
-# replay_path = "../lost_runs/lucky-lock-vs-honorable-friend.json"
+replay_path = "../agents/replay.json"
 target_tick = 285
 target_agent = 'a'
 
@@ -36,17 +33,15 @@ def main():
         replay = json.load(json_file)
     replay_payload = replay.get("payload")
 
-    # policy = RulePolicy()
-    policy = PolicyNeuralNetPolicy(torch.jit.load("nn/model.pth"))
-    policy.debug = True
-    ticker = Ticker()
-    policy.init(game_state, ticker)
+    policy = RulePolicy()
+    policy.state.debug = True
     initial_state = replay_payload.get("initial_state")
     connection = Connection(game_state)
 
     game_state.on_game_state(initial_state)
     game_state.connection = connection
     game_state.state["connection"] = connection
+    policy.init(game_state)
 
     loop = asyncio.get_event_loop()
     last_tick_number = 0
@@ -54,16 +49,13 @@ def main():
         tick_number = tick.get("tick")
         if tick_number > target_tick:
             for i in range(0, target_tick - last_tick_number):
-                ticker.tick = last_tick_number + i
-                policy.execute_actions(ticker.tick, game_state.state)
-            ticker.tick = target_tick
+                policy.execute_actions(last_tick_number + i, game_state.state)
             policy.execute_actions(target_tick, game_state.state)
             break
         task = loop.create_task(game_state.on_game_tick(tick))
         loop.run_until_complete(asyncio.gather(task))
         last_tick_number = tick_number
         if tick_number == target_tick:
-            ticker.tick = tick_number
             policy.execute_actions(tick_number, game_state.state)
             break
 
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from utils.blast import get_blast_kernel, unravel
+from utils.game_utils import Point
+from utils.policy import last_visit_order
+
+
+def walk_arms(blockers, pos, rad):
+    x, y = pos
+    cells = [] if blockers[x, y] else [Point(x, y)]
+    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        for i in range(1, rad):
+            px, py = x + dx * i, y + dy * i
+            if px < 0 or px >= blockers.shape[0] or py < 0 or py >= blockers.shape[1] or blockers[px, py]:
+                break
+            cells.append(Point(px, py))
+    return cells
+
+
+class TestBlastKernel(unittest.TestCase):
+
+    def test_matches_arm_walk(self):
+        rng = np.random.default_rng(0)
+        blockers = rng.random((15, 13)) < 0.3
+        kernel = get_blast_kernel(15, 13)
+        for x, y in np.ndindex(blockers.shape):
+            for rad in (1, 2, 4, 20):
+                expected = walk_arms(blockers, Point(x, y), rad)
+                self.assertEqual(unravel(kernel.cells(blockers, Point(x, y), rad), 13), expected)
+
+    def test_include_blocker(self):
+        blockers = np.zeros((5, 5), dtype=bool)
+        blockers[3, 2] = True
+        footprint = get_blast_kernel(5, 5).footprint(blockers, Point(2, 2), 3, include_blocker=True)
+        self.assertTrue(footprint[3, 2])
+        self.assertFalse(footprint[4, 2])
+        self.assertTrue(footprint[0, 2])
+
+    def test_batch_matches_single(self):
+        rng = np.random.default_rng(1)
+        blockers = rng.random((15, 15)) < 0.3
+        kernel = get_blast_kernel(15, 15)
+        positions = [(1, 1), (7, 7), (14, 0), (3, 9)]
+        radii = [2, 3, 5, 1]
+        footprints = kernel.footprints(blockers, positions, radii, include_center=False)
+        for footprint, pos, rad in zip(footprints, positions, radii):
+            expected = kernel.footprint(blockers, pos, rad, include_center=False)
+            self.assertTrue(np.array_equal(footprint, expected))
+
+    def test_last_visit_order(self):
+        center = Point(4, 4)
+        last_visit = dict()
+        step = 0
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):  # every arm from center, like can_hit_enemy did
+            for i in range(3):
+                last_visit[Point(center.x + dx * i, center.y + dy * i)] = step
+                step += 1
+        cells = list(last_visit)
+        self.assertEqual(sorted(cells, key=last_visit.get), sorted(cells, key=lambda p: last_visit_order(center, p)))
+
+
+if __name__ == '__main__':
+    unittest.main()
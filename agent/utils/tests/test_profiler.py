@@ -0,0 +1,22 @@
+import unittest
+
+from utils.profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_summary_lists_skipped_stages(self):
+        profiler = Profiler()
+        with profiler.stage("parse"):
+            pass
+        profiler.skip("parse")
+        profiler.skip("place_bombs")
+        profiler.skip("place_bombs")
+        lines = profiler.summary().splitlines()
+        parse_line = next(line for line in lines if line.startswith("parse "))
+        self.assertEqual(("parse", "1", "1"), tuple(parse_line.split()[i] for i in (0, 1, -1)))
+        self.assertIn("place_bombs 0 - - - 2", lines)
+
+
+if __name__ == '__main__':
+    unittest.main()